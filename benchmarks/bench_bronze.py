@@ -0,0 +1,166 @@
+"""
+Benchmark da etapa bronze (JSON bruto -> DataFrame normalizado).
+
+Gera um prospects.json e um applicants.json sintéticos com a mesma estrutura dos
+dados da Decision e mede tempo e o pico de RSS acrescentado de cada implementação em um
+processo separado, para que o pico de memória de uma não contamine a outra.
+
+Uso:
+    python benchmarks/bench_bronze.py --registros 20000
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import resource
+import tempfile
+import time
+
+import pandas as pd
+
+
+def normalizar_legado(df, cols_normalize=None, explode_col=None):
+    """Implementação anterior de convert_json_to_df, mantida como referência."""
+    if cols_normalize:
+        for col in cols_normalize:
+            df[pd.json_normalize(df[col]).columns] = pd.json_normalize(df[col])
+            df = df.drop(columns=col)
+
+    if explode_col:
+        df = df.explode(column=explode_col)
+        df = pd.concat(
+            [
+                df.reset_index(drop=True),
+                pd.json_normalize(df[explode_col]).reset_index(drop=True),
+            ],
+            axis=1,
+        )
+        df.drop(columns=explode_col, inplace=True)
+    for col in df.columns:
+        if df[col].dtype == "object":
+            df[col] = df[col].replace("", pd.NA)
+    return df
+
+
+def gerar_dados(diretorio, n_registros, seed=42):
+    rnd = random.Random(seed)
+    situacoes = ["Prospect", "Encaminhado ao Requisitante", "Contratado pela Decision"]
+    prospects = {
+        str(1000 + i): {
+            "titulo": f"Vaga {i} - Desenvolvedor",
+            "modalidade": rnd.choice(["", "CLT", "PJ"]),
+            "prospects": [
+                {
+                    "nome": f"Candidato {i}-{j}",
+                    "codigo": str(rnd.randint(1, 10**6)),
+                    "situacao_candidado": rnd.choice(situacoes),
+                    "data_candidatura": "10-03-2021",
+                    "ultima_atualizacao": "12-03-2021",
+                    "comentario": rnd.choice(["", "Aguardando retorno do cliente."]),
+                    "recrutador": "Recrutador",
+                }
+                for j in range(rnd.randint(0, 8))
+            ],
+        }
+        for i in range(n_registros)
+    }
+    applicants = {
+        str(30000 + i): {
+            "infos_basicas": {
+                "telefone": "(11) 99999-0000",
+                "objetivo_profissional": "Analista de dados",
+                "data_criacao": "10-11-2021 07:29:49",
+                "codigo_profissional": str(30000 + i),
+            },
+            "informacoes_pessoais": {
+                "data_nascimento": "01-01-1990",
+                "sexo": rnd.choice(["Masculino", "Feminino", ""]),
+            },
+            "informacoes_profissionais": {
+                "titulo_profissional": "Engenheiro de Software",
+                "remuneracao": rnd.choice(["2.000,00", "1,234.56", ""]),
+            },
+            "formacao_e_idiomas": {
+                "nivel_academico": "Ensino Superior Completo",
+                "ano_conclusao": "2015",
+            },
+            "cv_pt": "experiência em python, sql e cloud " * rnd.randint(5, 50),
+        }
+        for i in range(n_registros)
+    }
+    caminhos = {}
+    for nome, dados in (("prospects", prospects), ("applicants", applicants)):
+        caminhos[nome] = os.path.join(diretorio, f"{nome}.json")
+        with open(caminhos[nome], "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=4)
+    return caminhos
+
+
+CASOS = {
+    "prospects": dict(index_col="cod_vaga", explode_col="prospects"),
+    "applicants": dict(
+        index_col="cod_applicant",
+        cols_normalize=[
+            "infos_basicas",
+            "informacoes_pessoais",
+            "informacoes_profissionais",
+            "formacao_e_idiomas",
+        ],
+    ),
+}
+
+
+def _executar(modo, path, saida, kwargs, fila):
+    from mle_datathon.data_processing.ingestion import (
+        normalizar_registros,
+        stream_json_to_parquet,
+    )
+
+    # O pacote importa bibliotecas pesadas; mede-se apenas o que a etapa acrescenta
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    if modo == "streaming":
+        stream_json_to_parquet(path, saida, **kwargs)
+    else:
+        index_col = kwargs["index_col"]
+        df = pd.read_json(path).T.reset_index().rename(columns={"index": index_col})
+        normalizar = normalizar_legado if modo == "legado" else normalizar_registros
+        df = normalizar(df, kwargs.get("cols_normalize"), kwargs.get("explode_col"))
+        df.to_parquet(saida, index=False)
+    duracao = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    fila.put((duracao, pico / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--registros", type=int, default=20000)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminhos = gerar_dados(diretorio, args.registros)
+        print(
+            f"{'tabela':<12}{'modo':<12}{'MB json':>10}{'tempo (s)':>12}{'pico RSS extra (MB)':>22}"
+        )
+        for tabela, kwargs in CASOS.items():
+            tamanho = os.path.getsize(caminhos[tabela]) / 1024**2
+            for modo in ("legado", "single_pass", "streaming"):
+                fila = ctx.Queue()
+                saida = os.path.join(diretorio, f"{tabela}_{modo}.parquet")
+                processo = ctx.Process(
+                    target=_executar,
+                    args=(modo, caminhos[tabela], saida, kwargs, fila),
+                )
+                processo.start()
+                duracao, pico = fila.get()
+                processo.join()
+                print(
+                    f"{tabela:<12}{modo:<12}{tamanho:>10.1f}{duracao:>12.2f}{pico:>22.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
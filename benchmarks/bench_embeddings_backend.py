@@ -0,0 +1,209 @@
+"""
+Benchmark dos backends do modelo de embeddings (``embeddings.backend``).
+
+Codifica uma amostra dos campos de texto do dataset de modelagem com o modelo
+original em PyTorch (fp32) e com o modelo ONNX quantizado em int8, medindo
+textos por segundo, e compara as features agregadas (``emb_mean``, ``emb_std``,
+``emb_min``, ``emb_max``) e o cosseno entre os embeddings dos dois backends.
+Sem o dataset, usa textos sintéticos. O backend ``onnx_int8`` requer
+``sentence-transformers[onnx]``; na primeira execução o modelo é exportado para
+``embeddings.onnx_path``.
+
+Sem acesso ao Hugging Face, ``--modelo-aleatorio`` usa a arquitetura do
+MiniLM-L12 com pesos aleatórios (ver ``bench_embeddings_batching.py``), exportada
+com ``torch.onnx`` e quantizada com ``quantize_dynamic`` do ONNX Runtime (pesos
+int8, ativações quantizadas dinamicamente), que requer apenas ``onnxruntime``.
+A latência é a da arquitetura real; a paridade, com pesos aleatórios, só indica
+a ordem de grandeza do erro de quantização.
+
+Uso:
+    python benchmarks/bench_embeddings_backend.py --amostra 2000
+    python benchmarks/bench_embeddings_backend.py --amostra 400 --modelo-aleatorio
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from mle_datathon.data_processing.modelo_embeddings import (
+    obter_modelo_embeddings,
+    paridade_features_agregadas,
+)
+from mle_datathon.utils import get_abs_path, load_config
+
+CAMPOS_TEXTO = [
+    "principais_atividades",
+    "competencia_tecnicas_e_comportamentais",
+    "demais_observacoes",
+    "comentario",
+]
+TEXTOS = [
+    "Experiência em Python, SQL e AWS",
+    "Gestão de projetos de implantação SAP em nível avançado",
+    "Formação em Análise e Desenvolvimento de Sistemas",
+    "Remoto",
+    "Conhecimento em Java, Spring Boot, microsserviços e mensageria com Kafka",
+]
+
+
+def carregar_textos(amostra, seed=42):
+    local_path = os.getcwd()
+    config = load_config(local_path)
+    path = get_abs_path(local_path, config["paths"]["dataset_modelagem"])
+    if os.path.exists(path):
+        df = pd.read_parquet(path, columns=CAMPOS_TEXTO)
+        textos = pd.concat([df[c].astype(object) for c in CAMPOS_TEXTO])
+        textos = textos.dropna().astype(str).drop_duplicates()
+        return textos.sample(min(amostra, len(textos)), random_state=seed).tolist()
+    print(f"{path} não encontrado; usando textos sintéticos.")
+    rnd = random.Random(seed)
+    return [
+        " ".join(rnd.choice(TEXTOS) for _ in range(rnd.randint(1, 12)))
+        for _ in range(amostra)
+    ]
+
+
+class ModeloOnnx:
+    """``encode`` no formato do SentenceTransformer sobre uma sessão do ONNX Runtime."""
+
+    def __init__(self, path, tokenizer, max_seq_length):
+        import onnxruntime
+
+        self.sessao = onnxruntime.InferenceSession(
+            path, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+
+    def encode(
+        self, textos, batch_size=32, normalize_embeddings=False, **kwargs
+    ) -> np.ndarray:
+        # Como o SentenceTransformer, ordena por comprimento para reduzir o padding
+        ordem = np.argsort([-len(texto) for texto in textos], kind="stable")
+        embeddings = np.empty((len(textos), 384), dtype=np.float32)
+        for inicio in range(0, len(textos), batch_size):
+            lote = ordem[inicio : inicio + batch_size]
+            tokens = self.tokenizer(
+                [textos[i] for i in lote],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            entradas = {
+                nome: tokens[nome].astype(np.int64)
+                for nome in ("input_ids", "attention_mask")
+            }
+            embeddings[lote] = self.sessao.run(None, entradas)[0]
+        if normalize_embeddings:
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings
+
+
+def exportar_onnx_int8(modelo, diretorio):
+    """Exporta transformer + mean pooling para ONNX e quantiza os pesos em int8."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    class TransformerPooling(torch.nn.Module):
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask):
+            estados = self.transformer(
+                input_ids=input_ids, attention_mask=attention_mask
+            ).last_hidden_state
+            mascara = attention_mask.unsqueeze(-1).to(estados.dtype)
+            return (estados * mascara).sum(1) / mascara.sum(1).clamp(min=1e-9)
+
+    fp32 = os.path.join(diretorio, "model.onnx")
+    int8 = os.path.join(diretorio, "model_qint8.onnx")
+    exemplo = modelo.tokenizer(
+        ["experiência em python", "java"], padding=True, return_tensors="pt"
+    )
+    eixos = {0: "lote", 1: "tokens"}
+    torch.onnx.export(
+        TransformerPooling(modelo[0].auto_model.eval()),
+        (exemplo["input_ids"], exemplo["attention_mask"]),
+        fp32,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["embedding"],
+        dynamic_axes={"input_ids": eixos, "attention_mask": eixos},
+        opset_version=17,
+        dynamo=False,
+    )
+    quantize_dynamic(fp32, int8, weight_type=QuantType.QInt8)
+    return {
+        nome: ModeloOnnx(path, modelo.tokenizer, modelo.max_seq_length)
+        for nome, path in (("onnx_fp32", fp32), ("onnx_int8", int8))
+    }
+
+
+def medir(modelo, textos, repeticoes):
+    modelo.encode(textos[:32], show_progress_bar=False)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        modelo.encode(textos, batch_size=128, show_progress_bar=False)
+        tempos.append(time.perf_counter() - inicio)
+    return len(textos) / min(tempos)
+
+
+def comparar(textos, modelos, repeticoes):
+    print(f"{'backend':<12}{'textos/s':>12}")
+    for backend, modelo in modelos.items():
+        print(f"{backend:<12}{medir(modelo, textos, repeticoes):>12.1f}")
+
+    referencia = modelos["torch"]
+    ref = referencia.encode(textos, normalize_embeddings=True, show_progress_bar=False)
+    for backend, modelo in modelos.items():
+        if backend == "torch":
+            continue
+        print(f"\nParidade das features agregadas ({backend} vs torch):")
+        print(paridade_features_agregadas(textos, referencia, modelo))
+        cand = modelo.encode(textos, normalize_embeddings=True)
+        cosseno = (ref * cand).sum(axis=1)
+        print(
+            f"Cosseno entre os embeddings: mínimo {np.min(cosseno):.4f}, "
+            f"médio {np.mean(cosseno):.4f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--amostra", type=int, default=2000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--modelo-aleatorio", action="store_true")
+    args = parser.parse_args()
+
+    if not args.modelo_aleatorio:
+        textos = carregar_textos(args.amostra)
+        modelos = {
+            backend: obter_modelo_embeddings(backend=backend)
+            for backend in ("torch", "onnx_int8")
+        }
+        comparar(textos, modelos, args.repeticoes)
+        return
+
+    from bench_embeddings_batching import carregar_textos as textos_por_campo
+    from bench_embeddings_batching import modelo_aleatorio
+
+    # Comprimentos de cada campo, com as palavras do vocabulário do modelo
+    por_campo, _ = textos_por_campo(
+        max(args.amostra // len(CAMPOS_TEXTO), 1), campos=CAMPOS_TEXTO
+    )
+    textos = [texto for lista in por_campo.values() for texto in lista]
+    with tempfile.TemporaryDirectory() as diretorio:
+        modelo = modelo_aleatorio(diretorio)
+        modelos = {"torch": modelo, **exportar_onnx_int8(modelo, diretorio)}
+        comparar(textos, modelos, args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark dos lotes de embeddings: ``batch_size`` fixo vs orçamento de tokens.
+
+Codifica cada campo de texto (como ``transform`` faz, um campo por vez, só os
+textos distintos) com lotes fixos de 128 textos e com
+``codificar_por_comprimento`` em alguns orçamentos de tokens
+(``embeddings.max_tokens_per_batch``), medindo o tempo e conferindo que os
+embeddings são os mesmos. Os textos vêm das tabelas da camada silver: o
+``cv_pt`` dos candidatos, os campos da vaga e o comentário e o título do
+prospect, com os comprimentos reais de cada campo. Um campo cuja tabela não
+existe usa textos sintéticos, e a coluna ``origem`` da saída indica qual foi
+usado: só os campos ``silver`` servem para escolher o orçamento.
+
+Sem acesso ao Hugging Face, ``--modelo-aleatorio`` monta um modelo com a mesma
+arquitetura do MiniLM-L12 (12 camadas, dimensão 384, até 128 tokens) e pesos
+aleatórios, com um tokenizador por palavras: o custo por token é o do modelo
+real, então a comparação entre os lotes continua válida.
+
+Uso:
+    python benchmarks/bench_embeddings_batching.py --amostra 500
+    python benchmarks/bench_embeddings_batching.py --amostra 300 --modelo-aleatorio
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from mle_datathon.data_processing.modelo_embeddings import (
+    MODELO_EMBEDDINGS,
+    codificar_por_comprimento,
+    comprimentos_tokens,
+)
+from mle_datathon.utils import get_abs_path, load_config
+
+# Tabela da camada silver de cada campo e faixa de palavras por texto nos dados
+# sintéticos, usados quando a tabela não existe
+CAMPOS_TEXTO = {
+    "cv_pt": ("applicants_silver", (150, 1200)),
+    "principais_atividades": ("vagas_silver", (20, 250)),
+    "competencia_tecnicas_e_comportamentais": ("vagas_silver", (10, 150)),
+    "demais_observacoes": ("vagas_silver", (0, 40)),
+    "titulo_vaga": ("vagas_silver", (2, 8)),
+    "comentario": ("prospects_silver", (0, 15)),
+    "titulo": ("prospects_silver", (0, 8)),
+}
+PALAVRAS = (
+    "experiência em python sql aws gestão de projetos implantação sap java spring "
+    "kafka análise desenvolvimento sistemas dados nuvem equipe cliente inglês "
+    "avançado conhecimento ferramentas requisitos suporte infraestrutura"
+).split()
+ORCAMENTOS = [2048, 4096, 8192, 16384]
+
+
+def carregar_textos(amostra, seed=42, campos=None):
+    """
+    Amostra de textos distintos de cada campo, com a origem de cada um.
+
+    Returns:
+        Campo -> lista de textos e campo -> ``silver`` ou ``sintético``
+    """
+    local_path = os.getcwd()
+    config = load_config(local_path)
+    campos = list(CAMPOS_TEXTO) if campos is None else campos
+    rnd = random.Random(seed)
+    textos, origens = {}, {}
+    for campo in campos:
+        tabela, (minimo, maximo) = CAMPOS_TEXTO[campo]
+        path = get_abs_path(local_path, config["paths"][tabela])
+        if os.path.exists(path):
+            serie = pd.read_parquet(path, columns=[campo])[campo]
+            textos[campo] = (
+                serie.astype(object)
+                .fillna("")
+                .astype(str)
+                .drop_duplicates()
+                .sample(frac=1, random_state=seed)
+                .head(amostra)
+                .tolist()
+            )
+            origens[campo] = "silver"
+            continue
+        print(f"{path} não encontrado; usando textos sintéticos em {campo}.")
+        textos[campo] = [
+            " ".join(rnd.choices(PALAVRAS, k=rnd.randint(minimo, maximo)))
+            for _ in range(amostra)
+        ]
+        origens[campo] = "sintético"
+    return textos, origens
+
+
+def modelo_aleatorio(diretorio):
+    """SentenceTransformer com a arquitetura do MiniLM-L12 e pesos aleatórios."""
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Pooling, Transformer
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import BertConfig, BertModel, PreTrainedTokenizerFast
+
+    especiais = ["[PAD]", "[UNK]", "[CLS]", "[SEP]"]
+    vocab = {token: i for i, token in enumerate(especiais + PALAVRAS)}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)]
+    )
+    PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        pad_token="[PAD]",
+        unk_token="[UNK]",
+        cls_token="[CLS]",
+        sep_token="[SEP]",
+    ).save_pretrained(diretorio)
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=384,
+        num_hidden_layers=12,
+        num_attention_heads=12,
+        intermediate_size=1536,
+    )
+    BertModel(config).save_pretrained(diretorio)
+    transformer = Transformer(diretorio, max_seq_length=128)
+    pooling = Pooling(384, "mean")
+    return SentenceTransformer(modules=[transformer, pooling], device="cpu")
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--amostra", type=int, default=500)
+    parser.add_argument("--modelo-aleatorio", action="store_true")
+    args = parser.parse_args()
+
+    textos, origens = carregar_textos(args.amostra)
+    with tempfile.TemporaryDirectory() as diretorio:
+        if args.modelo_aleatorio:
+            modelo = modelo_aleatorio(diretorio)
+        else:
+            from sentence_transformers import SentenceTransformer
+
+            modelo = SentenceTransformer(MODELO_EMBEDDINGS, device="cpu")
+        modelo.encode(["aquecimento"], show_progress_bar=False)
+
+        execucoes = {"fixo (128 textos)": None}
+        execucoes.update({f"{orcamento} tokens": orcamento for orcamento in ORCAMENTOS})
+        tempos = {nome: 0.0 for nome in execucoes}
+        print(
+            f"{'campo':<40}{'origem':>10}{'tokens medios':>14}{'truncados':>10}", end=""
+        )
+        print("".join(f"{nome:>18}" for nome in execucoes))
+        for campo, lista in textos.items():
+            comprimentos = comprimentos_tokens(modelo, lista)
+            truncados = (comprimentos >= modelo.max_seq_length).mean()
+            print(f"{campo:<40}{origens[campo]:>10}", end="")
+            print(f"{comprimentos.mean():>14.1f}{truncados:>10.0%}", end="")
+            referencia = None
+            for nome, orcamento in execucoes.items():
+                if orcamento is None:
+                    duracao, embeddings = medir(
+                        lambda: modelo.encode(
+                            lista,
+                            batch_size=128,
+                            show_progress_bar=False,
+                            normalize_embeddings=True,
+                        )
+                    )
+                    referencia = embeddings
+                else:
+                    duracao, embeddings = medir(
+                        lambda: codificar_por_comprimento(modelo, lista, orcamento)
+                    )
+                    np.testing.assert_allclose(embeddings, referencia, atol=1e-5)
+                tempos[nome] += duracao
+                print(f"{duracao:>17.2f}s", end="")
+            print()
+        print(f"{'total':<74}", end="")
+        print("".join(f"{tempo:>17.2f}s" for tempo in tempos.values()))
+
+
+if __name__ == "__main__":
+    main()
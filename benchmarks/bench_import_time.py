@@ -0,0 +1,56 @@
+"""
+Benchmark do tempo de import dos módulos do pacote.
+
+Importa cada módulo em um processo novo, medindo o tempo total do import
+(incluindo os pacotes pai) e listando quais dependências pesadas ficaram
+carregadas. Para ver de onde vem o tempo de um módulo, use
+``python -X importtime -c "import <modulo>"``.
+
+Uso:
+    python benchmarks/bench_import_time.py --repeticoes 3
+"""
+
+import argparse
+import subprocess
+import sys
+
+MODULOS = [
+    "mle_datathon.utils",
+    "mle_datathon.data_processing",
+    "mle_datathon.data_processing.preprocess_data",
+    "mle_datathon.data_processing.feature_engineering",
+    "mle_datathon.model",
+    "mle_datathon.model.registry",
+    "main",
+]
+PESADOS = ["nltk", "torch", "sentence_transformers", "xgboost", "mlflow", "sklearn"]
+
+
+def medir_import(modulo):
+    codigo = (
+        "import importlib, sys, time; inicio = time.perf_counter(); "
+        f"importlib.import_module({modulo!r}); "
+        "print(time.perf_counter() - inicio); "
+        f"print(','.join(m for m in {PESADOS!r} if m in sys.modules))"
+    )
+    processo = subprocess.run(
+        [sys.executable, "-c", codigo], capture_output=True, text=True, check=True
+    )
+    tempo, carregados = processo.stdout.splitlines()[-2:]
+    return float(tempo), carregados
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'modulo':<50}{'import (s)':>12}  carregados")
+    for modulo in MODULOS:
+        medidas = [medir_import(modulo) for _ in range(args.repeticoes)]
+        tempo = min(t for t, _ in medidas)
+        print(f"{modulo:<50}{tempo:>12.2f}  {medidas[0][1] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
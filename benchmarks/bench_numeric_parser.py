@@ -0,0 +1,85 @@
+"""
+Benchmark da conversão de números em texto da camada silver.
+
+Compara ``pd.to_numeric(df[col].apply(limpar_numeros))`` com
+``limpar_numeros_coluna`` em uma coluna sintética no formato de ``remuneracao``,
+com valores no formato americano, brasileiro, inteiros e textos livres,
+conferindo que as duas saídas são idênticas.
+
+Uso:
+    python benchmarks/bench_numeric_parser.py --linhas 200000
+"""
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from mle_datathon.data_processing.preprocess_data import (
+    limpar_numeros,
+    limpar_numeros_coluna,
+)
+
+# Proporção de textos que não seguem nenhum dos três formatos
+CENARIOS = {"formatados": 0.0, "10% livres": 0.1}
+LIVRES = ["R$ 5.000,00", "a combinar", "5 mil", "CLT 3000"]
+
+
+def gerar_coluna(n_linhas, proporcao_livres, seed=42):
+    rnd = random.Random(seed)
+    valores = []
+    for _ in range(n_linhas):
+        sorteio = rnd.random()
+        if sorteio < proporcao_livres:
+            valores.append(rnd.choice(LIVRES))
+        elif sorteio < proporcao_livres + 0.1:
+            valores.append(None)
+        else:
+            valor = rnd.randint(1000, 30000) + rnd.randint(0, 99) / 100
+            valores.append(
+                rnd.choice(
+                    [
+                        f"{valor:,.2f}",
+                        f"{valor:,.2f}".replace(",", "_")
+                        .replace(".", ",")
+                        .replace("_", "."),
+                        str(int(valor)),
+                    ]
+                )
+            )
+    return pd.Series(valores)
+
+
+def medir(func, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=200000)
+    args = parser.parse_args()
+
+    print(
+        f"{'cenario':<14}{'apply (s)':>12}{'vetorizado (s)':>16}{'linhas/s':>14}{'ganho':>8}"
+    )
+    for nome, proporcao in CENARIOS.items():
+        serie = gerar_coluna(args.linhas, proporcao)
+        t_apply, esperado = medir(
+            lambda: pd.to_numeric(serie.apply(limpar_numeros), errors="coerce")
+        )
+        t_vetor, resultado = medir(lambda: limpar_numeros_coluna(serie))
+        pd.testing.assert_series_equal(resultado, esperado)
+        print(
+            f"{nome:<14}{t_apply:>12.2f}{t_vetor:>16.2f}"
+            f"{len(serie) / t_vetor:>14,.0f}{t_apply / t_vetor:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark do pré-processamento completo com cada backend (``preprocess.backend``).
+
+Gera applicants.json, vagas.json e prospects.json sintéticos com as colunas que
+``execute_preprocess`` trata e roda a cadeia bronze -> silver -> gold com o
+backend pandas (com as tabelas em sequência e com ``preprocess.table_workers``
+processos) e com o Polars, cada um em um processo separado, medindo tempo e o
+pico de RSS acrescentado (somado ao maior pico entre os processos filhos, quando
+há). As saídas das execuções são comparadas no final.
+
+Uso:
+    python benchmarks/bench_preprocess_backends.py --registros 40000 --table-workers 3
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import resource
+import tempfile
+import time
+
+import pandas as pd
+
+DATAS = ["10-11-2021 07:29:49", "01-13-2021", "2021-03-10", "31/12/2023", "", "0"]
+NUMEROS = ["1,234.56", "2.000,00", "3500", "R$ 5.000,00", "", "a combinar"]
+SITUACOES = [
+    "Contratado pela Decision",
+    "Prospect",
+    "Não Aprovado pelo Cliente",
+    "Desistiu",
+    "Encaminhado ao Requisitante",
+]
+TEXTOS = [
+    "Experiência em Python, SQL e AWS;",
+    "Gestão de projetos/implantação SAP — nível avançado!",
+    "Formação: Análise e Desenvolvimento de Sistemas.",
+    "",
+]
+
+SAIDAS = [
+    "applicants_silver",
+    "vagas_silver",
+    "prospects_silver",
+    "dataset_consolidado",
+    "dataset_modelagem",
+]
+
+
+def gerar_dados(diretorio, n_registros, seed=42):
+    rnd = random.Random(seed)
+    texto = lambda n: " ".join(rnd.choice(TEXTOS) for _ in range(n))  # noqa: E731
+    applicants = {
+        str(100000 + i): {
+            "infos_basicas": {
+                "objetivo_profissional": rnd.choice(["Analista de Dados", "Dev", ""]),
+                "data_criacao": rnd.choice(DATAS),
+                "codigo_profissional": str(100000 + i),
+                "fonte_indicacao": rnd.choice(["Site", "Indicação", "LinkedIn"]),
+            },
+            "informacoes_pessoais": {
+                "data_nascimento": rnd.choice(DATAS),
+                "sexo": rnd.choice(["Masculino", "Feminino", ""]),
+            },
+            "informacoes_profissionais": {
+                "titulo_profissional": rnd.choice(["Engenheiro", "Cientista", ""]),
+                "area_atuacao": rnd.choice(["TI - Dados", "TI - Dev", "Adm"]),
+                "remuneracao": rnd.choice(NUMEROS),
+                "data_atualizacao": rnd.choice(DATAS),
+            },
+            "formacao_e_idiomas": {
+                "nivel_academico": rnd.choice(["Superior Completo", "Mestrado"]),
+                "cursos": rnd.choice(["Curso AWS", "Curso de Python, SQL", ""]),
+                "ano_conclusao": rnd.choice(["2015", "0", "1999", "abc", ""]),
+            },
+            "cv_pt": texto(rnd.randint(5, 40)),
+        }
+        for i in range(n_registros)
+    }
+    n_vagas = max(n_registros // 4, 1)
+    vagas = {
+        str(1000 + i): {
+            "informacoes_basicas": {
+                "titulo_vaga": rnd.choice(["Dev Java", "Analista SAP", "Cientista"]),
+                "tipo_contratacao": rnd.choice(["CLT Full", "PJ/Autônomo"]),
+                "cliente": rnd.choice(["A", "B", "C"]),
+                "limite_esperado_para_contratacao": rnd.choice(DATAS),
+            },
+            "perfil_vaga": {
+                "nivel_academico": rnd.choice(["Superior Completo", "Técnico"]),
+                "areas_atuacao": rnd.choice(["TI - Dados", "TI - SAP"]),
+                "principais_atividades": texto(rnd.randint(1, 5)),
+                "competencia_tecnicas_e_comportamentais": texto(rnd.randint(1, 5)),
+                "demais_observacoes": rnd.choice(["Remoto", "", "Híbrido"]),
+                "equipamentos_necessarios": rnd.choice(["Notebook", "Nenhum"]),
+                "habilidades_comportamentais_necessarias": rnd.choice(
+                    ["Proatividade", "Comunicação"]
+                ),
+                "data_inicial": rnd.choice(DATAS),
+                "data_final": rnd.choice(DATAS),
+            },
+            "beneficios": {"valor_venda": rnd.choice(["100,00", "200", ""])},
+        }
+        for i in range(n_vagas)
+    }
+    prospects = {
+        str(1000 + i): {
+            "titulo": rnd.choice(["Dev Java", "Analista SAP"]),
+            "prospects": [
+                {
+                    "nome": f"Candidato {i}-{j}",
+                    "codigo": str(100000 + rnd.randrange(n_registros)),
+                    "situacao_candidado": rnd.choice(SITUACOES),
+                    "data_candidatura": rnd.choice(DATAS),
+                    "comentario": rnd.choice(["", "Aguardando retorno", "ok"]),
+                }
+                for j in range(rnd.randint(0, 8))
+            ],
+        }
+        for i in range(n_vagas)
+    }
+    caminhos = {}
+    for nome, dados in (
+        ("applicants", applicants),
+        ("vagas", vagas),
+        ("prospects", prospects),
+    ):
+        caminhos[f"{nome}_json"] = os.path.join(diretorio, f"{nome}.json")
+        with open(caminhos[f"{nome}_json"], "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False)
+    return caminhos
+
+
+EXECUCOES = {
+    "pandas": ("pandas", 1),
+    "pandas-tabelas": ("pandas", None),
+    "polars": ("polars", 1),
+}
+
+
+def _executar(backend, table_workers, paths, fila):
+    from mle_datathon.data_processing import polars_backend, preprocess_data  # noqa: F401
+
+    # get_abs_path junta os caminhos à raiz do projeto
+    preprocess_data.config["paths"] = {
+        k: os.path.relpath(v, preprocess_data.local_path) for k, v in paths.items()
+    }
+    preprocess_data.config["preprocess"]["backend"] = backend
+    preprocess_data.config["preprocess"]["table_workers"] = table_workers
+
+    # Os dois backends já importados; mede-se apenas o que a execução acrescenta
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    preprocess_data.execute_preprocess()
+    duracao = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    pico += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    fila.put((duracao, pico / 1024))
+
+
+def _normalizar(df):
+    df = df.astype(object)
+    return df.where(df.notna(), None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--registros", type=int, default=40000)
+    parser.add_argument("--table-workers", type=int, default=3)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as diretorio:
+        entradas = gerar_dados(diretorio, args.registros)
+        saidas = {}
+        print(f"{'execucao':<16}{'tempo (s)':>12}{'pico RSS extra (MB)':>22}")
+        for execucao, (backend, table_workers) in EXECUCOES.items():
+            destino = os.path.join(diretorio, execucao)
+            os.makedirs(destino)
+            paths = dict(entradas)
+            for tabela in ("applicants", "vagas", "prospects"):
+                for camada in ("bronze", "silver"):
+                    chave = f"{tabela}_{camada}"
+                    paths[chave] = os.path.join(destino, f"{chave}.parquet")
+            for chave in ("dataset_consolidado", "dataset_modelagem"):
+                paths[chave] = os.path.join(destino, f"{chave}.parquet")
+            saidas[execucao] = paths
+
+            fila = ctx.Queue()
+            processo = ctx.Process(
+                target=_executar,
+                args=(backend, table_workers or args.table_workers, paths, fila),
+            )
+            processo.start()
+            duracao, pico = fila.get()
+            processo.join()
+            print(f"{execucao:<16}{duracao:>12.2f}{pico:>22.0f}")
+
+        for execucao in ("pandas-tabelas", "polars"):
+            for chave in SAIDAS:
+                pd.testing.assert_frame_equal(
+                    _normalizar(pd.read_parquet(saidas["pandas"][chave])),
+                    _normalizar(pd.read_parquet(saidas[execucao][chave])),
+                )
+        print("Saídas idênticas em todas as execuções.")
+
+
+if __name__ == "__main__":
+    main()
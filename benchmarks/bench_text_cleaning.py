@@ -0,0 +1,106 @@
+"""
+Benchmark da limpeza das colunas de texto da camada silver.
+
+Compara ``df[col].apply(limpar_texto)`` com ``limpar_textos`` e com o caminho de
+``clean_data`` (``limpar_textos`` sobre os valores distintos, via
+``aplicar_por_valores_unicos``) em colunas sintéticas no formato de ``cv_pt``
+(textos longos, quase todos distintos) e ``titulo`` (textos curtos montados a
+partir de cargos, áreas e níveis, que se repetem entre as linhas), conferindo
+que as saídas são idênticas.
+
+Uso:
+    python benchmarks/bench_text_cleaning.py --linhas 5000
+"""
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from mle_datathon.data_processing.preprocess_data import (
+    aplicar_por_valores_unicos,
+    limpar_texto,
+    stop_words,
+)
+from mle_datathon.data_processing.text_cleaning import limpar_textos
+
+FRASES = [
+    "Experiência em desenvolvimento Python, SQL e AWS;",
+    "atuação/gestão de projetos de dados e implantação de ERP SAP.",
+    "Formação: Análise e Desenvolvimento de Sistemas (2015).",
+    "Conhecimentos em Java, .NET, Oracle — nível avançado!",
+    "Responsável pela coordenação da equipe de infraestrutura.",
+    "Inglês intermediário, espanhol básico.",
+]
+CARGOS = ["Analista", "Desenvolvedor", "Consultor", "Arquiteto", "Gerente de Projetos"]
+AREAS = ["SAP FI/CO", "Java", "Python — Dados", "Infraestrutura", ".NET", "Suporte"]
+NIVEIS = ["Júnior", "Pleno", "Sênior", "Especialista"]
+
+
+def gerar_coluna(n_linhas, min_frases, max_frases, seed=42):
+    rnd = random.Random(seed)
+    return pd.Series(
+        [
+            " ".join(
+                rnd.choice(FRASES) for _ in range(rnd.randint(min_frases, max_frases))
+            )
+            if rnd.random() > 0.05
+            else None
+            for _ in range(n_linhas)
+        ]
+    )
+
+
+def gerar_titulos(n_linhas, seed=42):
+    rnd = random.Random(seed)
+    return pd.Series(
+        [
+            f"{rnd.choice(CARGOS)} {rnd.choice(AREAS)} {rnd.choice(NIVEIS)}"
+            if rnd.random() > 0.05
+            else None
+            for _ in range(n_linhas)
+        ]
+    )
+
+
+def medir(func, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=5000)
+    args = parser.parse_args()
+
+    colunas = {
+        "cv_pt": gerar_coluna(args.linhas, 20, 200),
+        "titulo": gerar_titulos(args.linhas),
+    }
+    print(
+        f"{'coluna':<10}{'apply (s)':>12}{'vetorizado (s)':>16}{'ganho':>8}"
+        f"{'clean_data (s)':>16}{'ganho':>8}"
+    )
+    for nome, serie in colunas.items():
+        t_apply, esperado = medir(lambda: serie.apply(limpar_texto))
+        t_vetor, resultado = medir(lambda: limpar_textos(serie, stop_words))
+        assert resultado.tolist() == esperado.tolist()
+        t_memo, resultado = medir(
+            lambda: aplicar_por_valores_unicos(
+                serie, lambda s: limpar_textos(s, stop_words)
+            )
+        )
+        assert resultado.tolist() == esperado.tolist()
+        print(
+            f"{nome:<10}{t_apply:>12.3f}{t_vetor:>16.3f}{t_apply / t_vetor:>7.1f}x"
+            f"{t_memo:>16.3f}{t_apply / t_memo:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import sys
 import os
+import threading
 import pandas as pd
 import streamlit as st
 import pickle
@@ -28,6 +29,9 @@ try:
         clean_features_data,
         transform_new_data,
     )
+    from mle_datathon.data_processing.modelo_embeddings import (
+        aquecer_modelo_embeddings,
+    )
 except ImportError as e:
     st.error(
         f"Erro ao importar módulos do projeto: {e}. Verifique a estrutura de pastas e o PYTHONPATH."
@@ -59,11 +63,44 @@ PATH_VAGAS_SILVER = os.path.join(
 PATH_ENCODERS_GOLD = os.path.join(
     project_root, "Datathon Decision/4_gold", "encoders"
 )  # Exemplo
+PATH_FEATURES_VAGAS = os.path.join(
+    project_root, "Datathon Decision/4_gold", "features_vagas.parquet"
+)
 API_URL = "http://localhost:8000/api/v1/model/predict"
 
 # --- Funções Auxiliares ---
 
 
+@st.cache_resource
+def iniciar_modelo_embeddings():
+    # O modelo de embeddings é compartilhado pelo processo; carregá-lo em segundo
+    # plano na subida tira o carregamento da primeira previsão
+    thread = threading.Thread(target=aquecer_modelo_embeddings, daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource(max_entries=1)
+def _ler_features_vagas(path, versao):
+    # versao (mtime e tamanho do arquivo) faz parte da chave do cache: quando o
+    # passo vaga_features regrava a tabela, a próxima previsão lê a nova
+    return pd.read_parquet(path)
+
+
+def carregar_features_vagas():
+    # Tabela do passo vaga_features; sem ela a inferência calcula também as
+    # features da vaga a cada previsão
+    if not os.path.exists(PATH_FEATURES_VAGAS):
+        logger.warning(
+            f"Features das vagas não encontradas: {PATH_FEATURES_VAGAS}. Elas serão calculadas a cada previsão."
+        )
+        return None
+    estado = os.stat(PATH_FEATURES_VAGAS)
+    return _ler_features_vagas(
+        PATH_FEATURES_VAGAS, (estado.st_mtime_ns, estado.st_size)
+    )
+
+
 @st.cache_data  # Usar _ aqui para indicar que a função não recebe argumentos variáveis para cache
 def carregar_recursos_aplicacao_hardcoded():
     logger.info("Carregando recursos da aplicação (valores hardcoded)...")
@@ -115,7 +152,9 @@ def preparar_dados_para_payload(
 
     try:
         caso_transformado = transform_new_data(
-            caso_merged.copy(), encoders_path=encoders_path_param
+            caso_merged.copy(),
+            encoders_path=encoders_path_param,
+            features_vagas=carregar_features_vagas(),
         )
         caso_limpo_com_features = clean_features_data(caso_transformado.copy())
 
@@ -216,6 +255,7 @@ def calcular_indice_adequacao(probabilidade_sucesso):
 
 
 # --- Inicialização da Aplicação Streamlit ---
+iniciar_modelo_embeddings()
 dados_carregados, df_prospects, df_vagas, api_url_loaded, encoders_path_loaded = (
     carregar_recursos_aplicacao_hardcoded()
 )
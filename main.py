@@ -1,56 +1,130 @@
 import argparse
 import os
-from mle_datathon.utils import set_log
-from mle_datathon.model import train, tune, ModelRegistry
-from mle_datathon.data_processing import execute_preprocess, feature_engineering
+from functools import lru_cache
+from mle_datathon.utils import get_abs_path, load_config, set_log
+from mle_datathon.utils.dag import Etapa, ExecutorDAG
 
-
-import mlflow
+# mle_datathon.model importa xgboost e sklearn só quando um passo de modelo roda
+from mle_datathon import model
 
 tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "http://127.0.0.1:5000")
 
 logger = set_log("main")
-mr = ModelRegistry(tracking_uri)
+
+# Etapas com cache: cada uma só roda de novo quando mudam os arquivos que lê, as
+# seções do config que usa ou o código dos seus módulos
+ETAPAS = [
+    Etapa(
+        nome="preprocess",
+        funcao="mle_datathon.data_processing.preprocess_data:execute_preprocess",
+        entradas=["applicants_json", "prospects_json", "vagas_json"],
+        saidas=[
+            "applicants_bronze",
+            "prospects_bronze",
+            "vagas_bronze",
+            "applicants_silver",
+            "prospects_silver",
+            "vagas_silver",
+            "dataset_consolidado",
+            "dataset_modelagem",
+        ],
+        # Só existem no modo incremental; o próprio passo lê as da execução
+        # anterior, por isso não entram nas entradas
+        saidas_opcionais=["applicants_hashes", "prospects_hashes", "vagas_hashes"],
+        secoes_config=["preprocess"],
+        modulos=[
+            "mle_datathon.data_processing.preprocess_data",
+            "mle_datathon.data_processing.ingestion",
+            "mle_datathon.data_processing.text_cleaning",
+            "mle_datathon.data_processing.profiling",
+            "mle_datathon.data_processing.incremental",
+            "mle_datathon.data_processing.compactacao",
+            "mle_datathon.data_processing.polars_backend",
+        ],
+    ),
+    Etapa(
+        nome="feature_engineering",
+        funcao="mle_datathon.data_processing.feature_engineering:feature_engineering",
+        entradas=["dataset_modelagem", "dataset_consolidado"],
+        saidas=["dataset_features", "encoders", "embeddings_store"],
+        secoes_config=["embeddings"],
+        modulos=[
+            "mle_datathon.data_processing.feature_engineering",
+            "mle_datathon.data_processing.profiling",
+            "mle_datathon.data_processing.modelo_embeddings",
+            "mle_datathon.data_processing.store_embeddings",
+        ],
+    ),
+    Etapa(
+        nome="vaga_features",
+        funcao="mle_datathon.data_processing.feature_engineering:features_vagas",
+        entradas=["vagas_silver", "encoders"],
+        saidas=["features_vagas"],
+        secoes_config=["embeddings"],
+        modulos=[
+            "mle_datathon.data_processing.feature_engineering",
+            "mle_datathon.data_processing.modelo_embeddings",
+        ],
+    ),
+    Etapa(
+        nome="train_model",
+        funcao="mle_datathon.model.train_model:train",
+        entradas=["dataset_features"],
+        saidas=["modelo_treinado"],
+        secoes_config=["model"],
+        modulos=["mle_datathon.model.train_model"],
+    ),
+]
+
+
+@lru_cache(maxsize=None)
+def registry():
+    return model.ModelRegistry(tracking_uri)
 
 
 def list_registered_models():
-    logger.info(f"Modelos Registrados:\n{mr.list_registered_models()}")
+    logger.info(f"Modelos Registrados:\n{registry().list_registered_models()}")
 
 
 def purge_registered_models():
-    mr.purge_registered_models()
+    registry().purge_registered_models()
     logger.info("Modelos registrados removidos com sucesso!")
 
 
-def run_steps(steps):
+def executor_dag():
+    local_path = os.getcwd()
+    config = load_config(local_path)
+    cache_path = get_abs_path(local_path, config["pipeline"]["cache_path"])
+    return ExecutorDAG(ETAPAS, config, local_path, cache_path)
+
+
+def run_steps(steps, force=False):
     """
     Executa os passos especificados no pipeline.
+
+    Os passos do DAG (preprocess, feature_engineering, vaga_features e
+    train_model) rodam na ordem das dependências e são pulados quando nada do
+    que leem mudou desde a última execução, a menos que ``force`` seja
+    verdadeiro.
     """
 
     if "full_pipeline" in steps:
         logger.info("Iniciando pipeline completo")
-        execute_preprocess()
-        feature_engineering()
-        train()
-        return
-
-    if "preprocess" in steps:
-        logger.info("Iniciando preprocessamento")
-        execute_preprocess()
-    if "feature_engineering" in steps:
-        logger.info("Iniciando engenharia de features")
-        feature_engineering()
-    if "train_model" in steps:
-        logger.info("Iniciando treinamento do modelo")
-        train()
+        steps = [etapa.nome for etapa in ETAPAS]
+
+    etapas = [etapa.nome for etapa in ETAPAS if etapa.nome in steps]
+    if etapas:
+        executor_dag().executar(etapas, forcar=force)
     if "tune" in steps:
         logger.info("Iniciando ajuste do modelo")
-        tune()
+        model.tune()
     if "list_registered_models" in steps:
         list_registered_models()
 
 
-def main(steps):
+def main(steps, force=False):
+    import mlflow
+
     # Set up MLflow tracking URI
     mlflow.set_tracking_uri(tracking_uri)
 
@@ -62,7 +136,7 @@ def main(steps):
     # Enable system metrics logging
     mlflow.enable_system_metrics_logging()
 
-    run_steps(steps)
+    run_steps(steps, force=force)
 
 
 if __name__ == "__main__":
@@ -74,5 +148,10 @@ if __name__ == "__main__":
             "full_pipeline",
         ],
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Executa os passos mesmo quando o cache indica que estão atualizados",
+    )
     args = parser.parse_args()
-    main(args.steps)
+    main(args.steps, force=args.force)
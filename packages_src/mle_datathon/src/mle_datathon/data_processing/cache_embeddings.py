@@ -0,0 +1,295 @@
+"""
+Cache persistente dos embeddings de textos.
+
+Os vetores ficam em um ``.npy`` aberto como memory map, com uma linha por texto,
+e o índice (hash do texto -> linha, com o instante do último uso) em um parquet
+ao lado. A chave é o hash do nome do modelo com o texto normalizado, de modo que
+uma nova execução do pipeline ou uma nova inferência com textos já vistos custa
+uma consulta ao índice em vez de uma passada pelo transformer. O cache guarda no
+máximo ``max_itens`` textos; ao encher, os usados há mais tempo são descartados.
+
+O mesmo diretório é usado pelo pipeline e pelo front-end ao mesmo tempo. Os
+textos novos ficam em memória até ``salvar``, que trava o diretório (``flock``),
+relê o índice gravado por outros processos, grava os vetores nas linhas livres e
+substitui o índice de uma vez; as leituras usam a trava compartilhada.
+"""
+
+import fcntl
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mle_datathon.utils import get_abs_path, load_config, set_log
+
+logger = set_log("cache_embeddings")
+
+_ESPACOS = re.compile(r"\s+")
+
+# Um cache aberto por diretório e modelo, reaproveitado entre as inferências
+_CACHES: Dict[tuple, "CacheEmbeddings"] = {}
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Forma canônica do texto usada na chave do cache.
+
+    Junta espaços repetidos e aplica NFKC, para que variações do mesmo texto
+    ocupem uma única linha. O modelo recebe sempre o texto original.
+    """
+    return _ESPACOS.sub(" ", unicodedata.normalize("NFKC", texto)).strip()
+
+
+def _chave(modelo: str, texto: str) -> bytes:
+    conteudo = f"{modelo}\0{texto}".encode("utf-8")
+    return hashlib.blake2b(conteudo, digest_size=16).digest()
+
+
+class CacheEmbeddings:
+    def __init__(self, diretorio: str, modelo: str, max_itens: int = 500000):
+        self.diretorio = diretorio
+        self.modelo = modelo
+        self.max_itens = max_itens
+        self._vetores_path = os.path.join(diretorio, "vetores.npy")
+        self._indice_path = os.path.join(diretorio, "indice.parquet")
+        self._trava_path = os.path.join(diretorio, ".lock")
+        self._vetores = None
+        self._versao_indice = None
+        self._limpar_linhas()
+        self._relogio = 0
+        # Embeddings calculados e chaves consultadas desde o último ``salvar``
+        self._novos: Dict[bytes, np.ndarray] = {}
+        self._usados: Dict[bytes, None] = {}
+        # O cache é compartilhado pelas threads do front-end
+        self._lock = threading.Lock()
+        with self._trava(fcntl.LOCK_SH):
+            self._recarregar()
+
+    def __len__(self) -> int:
+        return len(self._linhas) + sum(c not in self._linhas for c in self._novos)
+
+    def _limpar_linhas(self) -> None:
+        self._linhas: Dict[bytes, int] = {}
+        self._chaves: List[bytes] = [None] * self.max_itens
+        # Último uso de cada linha do arquivo de vetores; -1 marca linha livre
+        self._uso = np.full(self.max_itens, -1, dtype=np.int64)
+
+    @contextmanager
+    def _trava(self, modo: int):
+        """Trava entre processos sobre o diretório do cache."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        with open(self._trava_path, "a") as arquivo:
+            fcntl.flock(arquivo, modo)
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+    def _estado_indice(self) -> tuple:
+        if not os.path.exists(self._indice_path):
+            return None
+        info = os.stat(self._indice_path)
+        return info.st_ino, info.st_mtime_ns, info.st_size
+
+    def _recarregar(self) -> None:
+        """Relê índice e vetores se outro processo os regravou. Requer a trava."""
+        estado = self._estado_indice()
+        if estado == self._versao_indice:
+            return
+        self._versao_indice = estado
+        self._vetores = None
+        self._limpar_linhas()
+        if estado is None or not os.path.exists(self._vetores_path):
+            return
+        vetores = np.load(self._vetores_path, mmap_mode="r+")
+        tabela = pq.read_table(self._indice_path)
+        meta = tabela.schema.metadata or {}
+        if (
+            meta.get(b"modelo") != self.modelo.encode()
+            or vetores.shape[0] != self.max_itens
+        ):
+            logger.info(
+                f"[Cache] {self.diretorio} de outro modelo ou tamanho; ignorado."
+            )
+            return
+        self._vetores = vetores
+        self._relogio = max(self._relogio, int(meta[b"relogio"]))
+        linhas = tabela.column("linha").to_numpy()
+        self._uso[linhas] = tabela.column("uso").to_numpy()
+        for chave, linha in zip(tabela.column("chave").to_pylist(), linhas):
+            self._linhas[chave] = int(linha)
+            self._chaves[linha] = chave
+
+    def _criar_vetores(self, dimensao: int) -> None:
+        # O arquivo é esparso: só as linhas gravadas ocupam disco. É criado ao
+        # lado e trocado de uma vez, para não truncar o arquivo mapeado por
+        # outros processos
+        temporario = f"{self._vetores_path}.{os.getpid()}.tmp"
+        vetores = np.lib.format.open_memmap(
+            temporario,
+            mode="w+",
+            dtype=np.float32,
+            shape=(self.max_itens, dimensao),
+        )
+        os.replace(temporario, self._vetores_path)
+        self._vetores = vetores
+        # As linhas do arquivo anterior não valem para o novo
+        self._limpar_linhas()
+
+    def _linhas_livres(self, quantidade: int) -> np.ndarray:
+        livres = np.flatnonzero(self._uso < 0)
+        if len(livres) >= quantidade:
+            return livres[:quantidade]
+        # Descarta as linhas usadas há mais tempo
+        faltam = quantidade - len(livres)
+        ocupadas = np.flatnonzero(self._uso >= 0)
+        antigas = ocupadas[np.argpartition(self._uso[ocupadas], faltam - 1)[:faltam]]
+        for linha in antigas:
+            del self._linhas[self._chaves[linha]]
+            self._chaves[linha] = None
+        self._uso[antigas] = -1
+        logger.info(f"[Cache] {faltam} embeddings descartados (LRU).")
+        return np.concatenate([livres, antigas])
+
+    def _guardar(self, chaves: List[bytes], vetores: np.ndarray) -> None:
+        if len(chaves) > self.max_itens:
+            chaves, vetores = chaves[-self.max_itens :], vetores[-self.max_itens :]
+        if self._vetores is None or self._vetores.shape[1] != vetores.shape[1]:
+            self._criar_vetores(vetores.shape[1])
+        linhas = self._linhas_livres(len(chaves))
+        self._vetores[linhas] = vetores
+        self._uso[linhas] = self._relogio
+        for chave, linha in zip(chaves, linhas):
+            self._linhas[chave] = int(linha)
+            self._chaves[linha] = chave
+        self._vetores.flush()
+
+    def _gravar_indice(self) -> None:
+        linhas = np.flatnonzero(self._uso >= 0)
+        tabela = pa.table(
+            {
+                "chave": pa.array([self._chaves[i] for i in linhas], pa.binary(16)),
+                "linha": pa.array(linhas, pa.int64()),
+                "uso": pa.array(self._uso[linhas], pa.int64()),
+            }
+        )
+        tabela = tabela.replace_schema_metadata(
+            {"modelo": self.modelo, "relogio": str(self._relogio)}
+        )
+        temporario = f"{self._indice_path}.{os.getpid()}.tmp"
+        pq.write_table(tabela, temporario)
+        os.replace(temporario, self._indice_path)
+        self._versao_indice = self._estado_indice()
+
+    def salvar(self) -> None:
+        """
+        Grava em disco os embeddings novos e o último uso das chaves consultadas.
+
+        Chamado uma vez ao fim de cada etapa ou inferência; sem nada pendente não
+        toca no disco.
+        """
+        with self._lock:
+            if not self._novos and not self._usados:
+                return
+            with self._trava(fcntl.LOCK_EX):
+                self._recarregar()
+                self._relogio += 1
+                usadas = [self._linhas[c] for c in self._usados if c in self._linhas]
+                self._uso[usadas] = self._relogio
+                # Textos gravados por outro processo desde a consulta já estão lá
+                chaves = [c for c in self._novos if c not in self._linhas]
+                if chaves:
+                    vetores = np.stack([self._novos[c] for c in chaves])
+                    self._guardar(chaves, vetores)
+                self._gravar_indice()
+            logger.info(f"[Cache] {len(chaves)} embeddings novos gravados.")
+            self._novos.clear()
+            self._usados.clear()
+
+    def codificar(
+        self, textos: List[str], encode: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Embeddings dos textos, calculando só os que não estão no cache.
+
+        Os embeddings calculados ficam disponíveis para as próximas chamadas e
+        só vão para o disco em ``salvar``.
+
+        Args:
+            textos: Textos a serem codificados
+            encode: Função que recebe uma lista de textos e devolve a matriz de
+                embeddings, chamada uma vez com os textos ausentes do cache
+
+        Returns:
+            Matriz float32 com uma linha por texto, na ordem de ``textos``
+        """
+        if not textos:
+            return np.asarray(encode([]), dtype=np.float32)
+        with self._lock:
+            return self._codificar(textos, encode)
+
+    def _codificar(
+        self, textos: List[str], encode: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        chaves = [_chave(self.modelo, normalizar_texto(texto)) for texto in textos]
+        with self._trava(fcntl.LOCK_SH):
+            self._recarregar()
+            linhas = np.array([self._linhas.get(c, -1) for c in chaves], dtype=np.int64)
+            encontrados = linhas >= 0
+            if encontrados.any():
+                gravados = np.array(self._vetores[linhas[encontrados]])
+        self._usados.update(dict.fromkeys(c for c, e in zip(chaves, encontrados) if e))
+
+        # Textos repetidos na mesma chamada são codificados uma vez, com o
+        # primeiro texto original de cada chave
+        ausentes = {}
+        for i in np.flatnonzero(~encontrados):
+            if chaves[i] not in self._novos:
+                ausentes.setdefault(chaves[i], textos[i])
+        logger.info(
+            f"[Cache] {int(encontrados.sum())} de {len(textos)} textos no cache; "
+            f"{len(ausentes)} textos distintos a codificar"
+        )
+        if ausentes:
+            novos = np.asarray(encode(list(ausentes.values())), dtype=np.float32)
+            self._novos.update(zip(ausentes, novos))
+
+        outros = np.flatnonzero(~encontrados)
+        vetores = [self._novos[chaves[i]] for i in outros]
+        dimensao = gravados.shape[1] if encontrados.any() else vetores[0].shape[0]
+        resultado = np.empty((len(textos), dimensao), dtype=np.float32)
+        if encontrados.any():
+            resultado[encontrados] = gravados
+        if len(outros):
+            resultado[outros] = np.stack(vetores)
+        return resultado
+
+
+def carregar_cache_embeddings(modelo: str, config: dict = None) -> CacheEmbeddings:
+    """
+    Abre o cache configurado em ``embeddings.cache_path`` para o modelo.
+
+    Returns:
+        Cache do modelo, ou None se o cache estiver desativado no config
+    """
+    local_path = os.getcwd()
+    if config is None:
+        config = load_config(local_path)
+    embeddings_cfg = config.get("embeddings", {})
+    if not embeddings_cfg.get("cache_path"):
+        return None
+    diretorio = os.path.join(
+        get_abs_path(local_path, embeddings_cfg["cache_path"]),
+        re.sub(r"[^\w.-]", "_", modelo),
+    )
+    max_itens = embeddings_cfg.get("cache_max_items", 500000)
+    if (diretorio, max_itens) not in _CACHES:
+        _CACHES[(diretorio, max_itens)] = CacheEmbeddings(diretorio, modelo, max_itens)
+    return _CACHES[(diretorio, max_itens)]
@@ -0,0 +1,72 @@
+"""
+Compactação dos tipos das colunas das camadas silver e gold.
+
+Depois da limpeza, todas as colunas de texto ficam como ``object`` (strings
+Python) e os números em 64 bits. Colunas de texto com poucos valores distintos
+(``nivel_academico``, ``tipo_contratacao``, ``situacao_candidado``...) viram
+categorias, gravadas no parquet com dictionary encoding; os textos livres viram
+strings Arrow; inteiros e floats são reduzidos ao menor tipo que representa
+todos os valores sem perda.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# large_string volta do parquet com o mesmo dtype; string[pyarrow] voltaria
+# como string[python], de volta a objetos Python
+STRING_ARROW = pd.ArrowDtype(pa.large_string())
+
+
+def _menor_float(serie: pd.Series) -> pd.Series:
+    # Só reduz para float32 se todos os valores voltam iguais para float64
+    reduzida = serie.astype(np.float32)
+    if np.array_equal(
+        reduzida.to_numpy(dtype=np.float64), serie.to_numpy(), equal_nan=True
+    ):
+        return reduzida
+    return serie
+
+
+def _texto(serie: pd.Series) -> bool:
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return pd.api.types.infer_dtype(serie.cat.categories) == "string"
+    if serie.dtype == object:
+        return pd.api.types.infer_dtype(serie, skipna=True) == "string"
+    return serie.dtype == STRING_ARROW
+
+
+def compactar_dtypes(
+    df: pd.DataFrame, max_fracao_categorias: float = 0.5
+) -> pd.DataFrame:
+    """
+    Converte as colunas para os tipos mais compactos sem perda de informação.
+
+    Args:
+        df: DataFrame das camadas silver ou gold
+        max_fracao_categorias: Colunas de texto com no máximo essa fração de
+            valores distintos por linha viram ``category``; as demais viram
+            strings Arrow
+
+    Returns:
+        DataFrame com os mesmos valores e tipos compactos
+    """
+    colunas = {}
+    for col in df.columns:
+        serie = df[col]
+        if _texto(serie):
+            # Colunas que já vieram compactadas, como as da silver após a junção
+            # da camada gold, são reavaliadas com a contagem da tabela nova
+            unicos = serie.nunique(dropna=True)
+            if unicos > max_fracao_categorias * len(serie):
+                serie = serie.astype(STRING_ARROW)
+            elif isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.cat.remove_unused_categories()
+            else:
+                serie = serie.astype("category")
+        elif serie.dtype.kind in "iu":
+            serie = pd.to_numeric(serie, downcast="integer")
+        elif serie.dtype == np.float64:
+            serie = _menor_float(serie)
+        colunas[col] = serie
+    return pd.DataFrame(colunas, index=df.index)
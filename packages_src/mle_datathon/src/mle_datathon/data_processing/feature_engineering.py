@@ -3,18 +3,44 @@ Feature engineering pipeline for datathon-mle.
 Loads all paths and parameters from config.yaml for reproducibility.
 """
 
+import numpy as np
 import pandas as pd
-from typing import Any, List
-from tqdm import tqdm
-from sentence_transformers import SentenceTransformer, util
-from rapidfuzz import fuzz
-from sklearn.preprocessing import OneHotEncoder
+from typing import Any, List, Tuple
+from rapidfuzz import fuzz, process
 import joblib
 import os
+from mle_datathon.data_processing.cache_embeddings import (
+    CacheEmbeddings,
+    carregar_cache_embeddings,
+)
+from mle_datathon.data_processing.modelo_embeddings import (
+    carregar_config_embeddings,
+    codificar_por_comprimento,
+    encerrar_pools,
+    identificador_modelo,
+    obter_modelo_embeddings,
+    obter_pool_embeddings,
+)
+from mle_datathon.data_processing.profiling import perfil_colunas
+from mle_datathon.data_processing.store_embeddings import (
+    ENTIDADES_CAMPOS,
+    StoreEmbeddings,
+)
 from mle_datathon.utils import get_abs_path, load_config, set_log
 
 logger = set_log("feature_engineering")
 
+CAMPOS_TEXTO = [
+    "principais_atividades",
+    "competencia_tecnicas_e_comportamentais",
+    "demais_observacoes",
+    "comentario",
+]
+# Campos que dependem só da vaga, pré-calculados por ``features_vagas``
+CAMPOS_TEXTO_VAGA = [
+    campo for campo in CAMPOS_TEXTO if ENTIDADES_CAMPOS[campo] == "cod_vaga"
+]
+
 
 def clean_features_data(df):
     colunas_remover = [
@@ -76,16 +102,17 @@ def coluna_valida(df: pd.DataFrame, col: str) -> bool:
     """Check if a column is valid for feature creation."""
     if col not in df.columns:
         return False
-    missing = df[col].isnull().mean()
+    perfil = perfil_colunas(df[[col]])
+    missing = perfil.at[col, "taxa_nulos"]
     if missing > 0.5:
         logger.info(
             f'[SKIP] Coluna "{col}" com {missing:.0%} missing, feature não criada.'
         )
         return False
-    vc = df[col].value_counts(normalize=True, dropna=True)
-    if not vc.empty and vc.iloc[0] > 0.9:
+    frequencia_top = perfil.at[col, "frequencia_top"]
+    if frequencia_top > 0.9:
         logger.info(
-            f'[SKIP] Coluna "{col}" com valor dominante ({vc.index[0]}) em {vc.iloc[0]:.0%}, feature não criada.'
+            f'[SKIP] Coluna "{col}" com valor dominante ({perfil.at[col, "valor_top"]}) em {frequencia_top:.0%}, feature não criada.'
         )
         return False
     return True
@@ -119,11 +146,46 @@ def conta_cursos(texto):
 
 
 class TextFeatureGenerator:
-    def __init__(self):
-        logger.info("[Init] Carregando modelo de embeddings...")
-        self.embedding_model = SentenceTransformer(
-            "paraphrase-multilingual-MiniLM-L12-v2"
-        )
+    def __init__(
+        self,
+        embedding_model=None,
+        cache: CacheEmbeddings = None,
+        max_tokens_lote: int = None,
+        workers: int = None,
+        registrar_embeddings: bool = False,
+    ):
+        """
+        Args:
+            embedding_model: Modelo com o ``encode`` do SentenceTransformer; se
+                omitido, usa o modelo compartilhado pelo processo, no backend
+                de ``embeddings.backend``
+            cache: Cache persistente dos embeddings; sem ele todos os textos
+                passam pelo modelo
+            max_tokens_lote: Orçamento de tokens por lote do modelo; se omitido,
+                usa ``embeddings.max_tokens_per_batch`` (null mantém o
+                ``batch_size`` fixo)
+            workers: Processos que codificam os textos com o modelo
+                compartilhado; se omitido, usa ``embeddings.workers``. Não se
+                aplica a um ``embedding_model`` passado explicitamente
+            registrar_embeddings: Guarda em ``embeddings_campos`` os embeddings
+                de cada campo codificado, para gravá-los no store de embeddings
+        """
+        embeddings_cfg = carregar_config_embeddings()
+        if workers is None:
+            workers = embeddings_cfg.get("workers", 1)
+        self.pool = None
+        if embedding_model is None and workers > 1:
+            self.pool = obter_pool_embeddings(
+                workers, embeddings_cfg.get("threads_per_worker")
+            )
+        elif embedding_model is None:
+            embedding_model = obter_modelo_embeddings()
+        self.embedding_model = embedding_model
+        self.cache = cache
+        if max_tokens_lote is None:
+            max_tokens_lote = embeddings_cfg.get("max_tokens_per_batch")
+        self.max_tokens_lote = max_tokens_lote
+        self.embeddings_campos = {} if registrar_embeddings else None
 
     def tamanho_texto(self, texto: Any) -> int:
         if pd.isnull(texto):
@@ -135,20 +197,20 @@ class TextFeatureGenerator:
             return 0
         return len(str(texto).split())
 
+    def _registrar(self, campo: str, codigos: np.ndarray, embeddings: np.ndarray):
+        if self.embeddings_campos is not None and campo:
+            self.embeddings_campos[campo] = (codigos, embeddings)
+
     def gerar_embeddings_agregados(
-        self, textos: List[str], batch_size: int = 128
+        self, textos: List[str], batch_size: int = 128, campo: str = None
     ) -> pd.DataFrame:
         logger.info(f"[Embeddings] Iniciando geração para {len(textos)} textos...")
 
-        embeddings = self.embedding_model.encode(
-            textos,
-            batch_size=batch_size,
-            show_progress_bar=True,
-            convert_to_numpy=True,
-            normalize_embeddings=True,
-        )
+        codigos, embeddings = self.codificar_unicos(textos, batch_size=batch_size)
+        self._registrar(campo, codigos, embeddings)
 
         logger.info("[Embeddings] Geração finalizada. Criando features agregadas...")
+        # As estatísticas são calculadas por texto distinto e repetidas nas linhas
         df_emb = pd.DataFrame(
             {
                 "emb_mean": embeddings.mean(axis=1),
@@ -158,18 +220,21 @@ class TextFeatureGenerator:
             }
         )
 
-        return df_emb
+        return df_emb.iloc[codigos].reset_index(drop=True)
 
     def transform(self, df: pd.DataFrame, campos_texto: List[str]) -> pd.DataFrame:
         for campo in campos_texto:
             if campo in df.columns:
                 logger.info(f"[{campo}] Criando features de tamanho e palavras...")
-                df[f"{campo}_nchar"] = df[campo].apply(self.tamanho_texto)
-                df[f"{campo}_nwords"] = df[campo].apply(self.n_palavras)
+                # Colunas category aplicariam as funções às categorias e
+                # devolveriam category; como object o resultado é numérico
+                textos = df[campo].astype(object)
+                df[f"{campo}_nchar"] = textos.apply(self.tamanho_texto)
+                df[f"{campo}_nwords"] = textos.apply(self.n_palavras)
 
                 logger.info(f"[{campo}] Criando embeddings agregados...")
-                textos = df[campo].fillna("").astype(str).tolist()
-                df_emb = self.gerar_embeddings_agregados(textos)
+                textos = textos.fillna("").astype(str).tolist()
+                df_emb = self.gerar_embeddings_agregados(textos, campo=campo)
                 df_emb.columns = [f"{campo}_{col}" for col in df_emb.columns]
 
                 df = pd.concat([df, df_emb], axis=1)
@@ -177,44 +242,145 @@ class TextFeatureGenerator:
 
         return df
 
-    def gerar_embeddings(self, textos: pd.Series):
-        textos = textos.fillna("").astype(str).tolist()
-        return self.embedding_model.encode(
-            textos, convert_to_tensor=True, normalize_embeddings=True
+    def codificar_unicos(
+        self, textos: List[str], batch_size: int = 128, show_progress_bar=True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Embeddings normalizados dos textos distintos, consultando o cache se houver.
+
+        Campos da vaga se repetem em todos os prospects da mesma ``cod_vaga``;
+        cada texto passa pelo modelo uma única vez.
+
+        Returns:
+            Tupla com a posição de cada texto entre os distintos e a matriz de
+            embeddings dos distintos; ``embeddings[codigos]`` volta às linhas
+        """
+        codigos, unicos = pd.factorize(pd.Series(textos, dtype=object))
+        logger.info(
+            f"[Dedup] {len(textos)} textos, {len(unicos)} distintos "
+            f"({len(unicos) / max(len(textos), 1):.1%} a codificar)"
+        )
+        unicos = unicos.tolist()
+
+        def encode(textos):
+            if self.pool is not None:
+                return self.pool.codificar(textos, self.max_tokens_lote, batch_size)
+            if self.max_tokens_lote:
+                return codificar_por_comprimento(
+                    self.embedding_model,
+                    textos,
+                    self.max_tokens_lote,
+                    show_progress_bar=show_progress_bar,
+                )
+            return self.embedding_model.encode(
+                textos,
+                batch_size=batch_size,
+                show_progress_bar=show_progress_bar,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+
+        if self.cache is None:
+            return codigos, encode(unicos)
+        return codigos, self.cache.codificar(unicos, encode)
+
+    def salvar_cache(self) -> None:
+        """Grava em disco os embeddings calculados desde o último salvamento."""
+        if self.cache is not None:
+            self.cache.salvar()
+
+    def codificar(
+        self, textos: List[str], batch_size: int = 128, show_progress_bar=True
+    ) -> np.ndarray:
+        """Embeddings normalizados dos textos, um por linha de ``textos``."""
+        codigos, embeddings = self.codificar_unicos(
+            textos, batch_size=batch_size, show_progress_bar=show_progress_bar
         )
+        return embeddings[codigos]
+
+    def similaridade_embeddings_pares(
+        self, textos1: pd.Series, textos2: pd.Series
+    ) -> np.ndarray:
+        """
+        Cosseno entre os embeddings dos textos de cada linha das duas colunas.
+
+        Os textos distintos das duas colunas são codificados juntos, uma vez, e
+        como os embeddings já são normalizados o cosseno de cada par distinto é
+        o produto escalar das duas linhas.
+
+        Returns:
+            Array float32 com a similaridade de cada linha; nulos contam como ""
+        """
+        textos = pd.concat([textos1, textos2], ignore_index=True)
+        textos = textos.astype(object).fillna("").astype(str).tolist()
+        codigos, embeddings = self.codificar_unicos(textos, show_progress_bar=False)
+        codigos1, codigos2 = codigos[: len(textos1)], codigos[len(textos1) :]
+        self._registrar(textos1.name, codigos1, embeddings)
+        self._registrar(textos2.name, codigos2, embeddings)
+
+        # Cada par distinto vira um inteiro, e o produto é calculado uma vez por par
+        pares, unicos = pd.factorize(
+            codigos1.astype(np.int64) * len(embeddings) + codigos2
+        )
+        i, j = np.divmod(unicos, len(embeddings))
+        return np.einsum("ij,ij->i", embeddings[i], embeddings[j])[pares]
 
     def similaridade_string(self, t1, t2):
         if pd.isnull(t1) or pd.isnull(t2):
             return 0
         return fuzz.token_sort_ratio(str(t1), str(t2)) / 100
 
+    def similaridade_string_pares(
+        self, textos1: pd.Series, textos2: pd.Series, workers: int = -1
+    ) -> np.ndarray:
+        """
+        ``similaridade_string`` de cada linha das duas colunas, em lote.
+
+        Cada par distinto de textos é comparado uma vez pelo ``cpdist`` do
+        rapidfuzz, que roda em C em ``workers`` threads (-1 usa todos os núcleos).
+
+        Returns:
+            Array com a similaridade de cada linha, 0 onde algum texto é nulo
+        """
+        textos1 = textos1.astype(object).reset_index(drop=True)
+        textos2 = textos2.astype(object).reset_index(drop=True)
+        validos = (textos1.notna() & textos2.notna()).to_numpy()
+        similaridades = np.zeros(len(textos1))
+        if not validos.any():
+            return similaridades
+
+        pares = pd.MultiIndex.from_arrays(
+            [textos1[validos].astype(str), textos2[validos].astype(str)]
+        )
+        codigos, unicos = pd.factorize(pares)
+        logger.info(f"[String Similarity] {len(pares)} pares, {len(unicos)} distintos")
+        scores = process.cpdist(
+            unicos.get_level_values(0),
+            unicos.get_level_values(1),
+            scorer=fuzz.token_sort_ratio,
+            dtype=np.float64,
+            workers=workers,
+        )
+        similaridades[validos] = scores[codigos] / 100
+        return similaridades
+
     def adicionar_similaridade_titulo_vaga(
-        self, df: pd.DataFrame, col1="titulo", col2="titulo_vaga", batch_size=1000
+        self, df: pd.DataFrame, col1="titulo", col2="titulo_vaga"
     ) -> pd.DataFrame:
         if col1 in df.columns and col2 in df.columns:
-            # String similarity calculation remains the same
-            tqdm.pandas(desc="[String Similarity]")
-            df["titulo_sim_ratio"] = df.progress_apply(
-                lambda row: self.similaridade_string(row[col1], row[col2]), axis=1
-            )
-
-            tqdm.write("[Embeddings] Gerando embeddings dos títulos...")
-            similarities = []
+            df["titulo_sim_ratio"] = self.similaridade_string_pares(df[col1], df[col2])
 
-            for i in tqdm(range(0, len(df), batch_size), desc="Processing batches"):
-                batch_df = df.iloc[i : i + batch_size]
-                emb1 = self.gerar_embeddings(batch_df[col1].fillna("").astype(str))
-                emb2 = self.gerar_embeddings(batch_df[col2].fillna("").astype(str))
-
-                batch_similarities = util.cos_sim(emb1, emb2).diagonal().cpu().numpy()
-                similarities.extend(batch_similarities)
-
-            df["sim_titulo_vs_vaga"] = similarities
+            logger.info("[Embeddings] Gerando similaridade dos títulos...")
+            df["sim_titulo_vs_vaga"] = self.similaridade_embeddings_pares(
+                df[col1], df[col2]
+            )
 
         return df
 
 
-def cria_features(df, save_encoders=False, encoders_path=None):
+def cria_features(df, save_encoders=False, encoders_path=None, store=None, df_ids=None):
+    from sklearn.preprocessing import OneHotEncoder
+
     # Dictionary to store encoders
     encoders = {}
 
@@ -244,17 +410,20 @@ def cria_features(df, save_encoders=False, encoders_path=None):
     encoders["tipo_contratacao"] = tipo_contr_encoder
     logger.info("[OK] One-hot de tipo_contratacao criado.")
 
-    campos_texto = [
-        "principais_atividades",
-        "competencia_tecnicas_e_comportamentais",
-        "demais_observacoes",
-        "comentario",
-    ]
-
-    feature_generator = TextFeatureGenerator()
-    df = feature_generator.transform(df, campos_texto)
+    feature_generator = TextFeatureGenerator(
+        cache=carregar_cache_embeddings(identificador_modelo()),
+        registrar_embeddings=store is not None,
+    )
+    df = feature_generator.transform(df, CAMPOS_TEXTO)
 
     df = feature_generator.adicionar_similaridade_titulo_vaga(df)
+    feature_generator.salvar_cache()
+
+    # Embeddings completos de cada campo, por vaga e por prospect
+    if store is not None:
+        store.gravar_campos(
+            feature_generator.embeddings_campos, df_ids, identificador_modelo()
+        )
 
     # Save encoders if requested
     if save_encoders and encoders_path:
@@ -276,12 +445,18 @@ def feature_engineering() -> None:
         paths[k] = get_abs_path(local_path, paths[k])
 
     df = pd.read_parquet(paths["dataset_modelagem"])
+    # O dataset de modelagem não tem os ids; o consolidado tem as mesmas linhas
+    df_ids = pd.read_parquet(
+        paths["dataset_consolidado"], columns=["cod_vaga", "codigo"]
+    )
 
-    # Create encoders directory if it doesn't exist
-    encoders_path = os.path.join(
-        os.path.dirname(paths["dataset_modelagem"]), "encoders"
+    df = cria_features(
+        df,
+        save_encoders=True,
+        encoders_path=paths["encoders"],
+        store=StoreEmbeddings(paths["embeddings_store"]),
+        df_ids=df_ids,
     )
-    df = cria_features(df, save_encoders=True, encoders_path=encoders_path)
 
     df = df.drop(
         columns=[
@@ -306,19 +481,11 @@ def feature_engineering() -> None:
 
     df.to_parquet(paths["dataset_features"], index=False)
     logger.info(f"Dataset com features salvos em {paths['dataset_features']}")
+    encerrar_pools()
 
 
-def transform_new_data(df: pd.DataFrame, encoders_path: str) -> pd.DataFrame:
-    """
-    Transforma novos dados usando os encoders salvos.
-
-    Args:
-        df: DataFrame com os dados a serem transformados
-        encoders_path: Caminho para o diretório onde os encoders estão salvos
-
-    Returns:
-        DataFrame com as features transformadas
-    """
+def aplicar_encoders(df: pd.DataFrame, encoders_path: str) -> pd.DataFrame:
+    """One-hot de nivel_academico e tipo_contratacao com os encoders salvos."""
     logger.info("[Inferência] Carregando encoders salvos...")
 
     # Carrega os encoders salvos
@@ -349,18 +516,101 @@ def transform_new_data(df: pd.DataFrame, encoders_path: str) -> pd.DataFrame:
     )
 
     # Combina com o dataframe original
-    df = pd.concat([df, df_nivel_acad, df_tipo_contr], axis=1)
+    return pd.concat([df, df_nivel_acad, df_tipo_contr], axis=1)
+
+
+def gerar_features_vagas(df_vagas: pd.DataFrame, encoders_path: str) -> pd.DataFrame:
+    """
+    Features de ``transform_new_data`` que dependem só da vaga.
+
+    São os one-hots de nivel_academico e tipo_contratacao e as features de
+    tamanho e de embeddings dos campos de texto da vaga. Os títulos das vagas
+    também passam pelo modelo para que, com o cache de embeddings ativo, a
+    similaridade de títulos da inferência só codifique o título do prospect.
+
+    Args:
+        df_vagas: Camada silver de vagas
+        encoders_path: Diretório com os encoders salvos no feature engineering
+
+    Returns:
+        DataFrame indexado por ``cod_vaga`` (como texto) com uma linha por vaga
+    """
+    df_vagas = df_vagas.drop_duplicates("cod_vaga").reset_index(drop=True)
+    colunas = set(df_vagas.columns)
+
+    df = aplicar_encoders(df_vagas, encoders_path)
+    feature_generator = TextFeatureGenerator(
+        cache=carregar_cache_embeddings(identificador_modelo())
+    )
+    df = feature_generator.transform(df, CAMPOS_TEXTO_VAGA)
+    if feature_generator.cache is not None and "titulo_vaga" in df.columns:
+        titulos = df["titulo_vaga"].astype(object).fillna("").astype(str).tolist()
+        feature_generator.codificar_unicos(titulos, show_progress_bar=False)
+    feature_generator.salvar_cache()
+
+    features = df[[col for col in df.columns if col not in colunas]]
+    return features.set_axis(
+        pd.Index(df_vagas["cod_vaga"].astype(str), name="cod_vaga")
+    )
 
-    # Aplica as transformações de texto
-    campos_texto = [
-        "principais_atividades",
-        "competencia_tecnicas_e_comportamentais",
-        "demais_observacoes",
-        "comentario",
-    ]
 
-    feature_generator = TextFeatureGenerator()
-    df = feature_generator.transform(df, campos_texto)
+def features_vagas() -> None:
+    """Pré-calcula as features de cada vaga para a inferência."""
+    local_path = os.getcwd()
+    config = load_config(local_path)
+
+    paths = config["paths"]
+    for k in paths:
+        paths[k] = get_abs_path(local_path, paths[k])
+
+    df_vagas = pd.read_parquet(paths["vagas_silver"])
+    tabela = gerar_features_vagas(df_vagas, paths["encoders"])
+
+    tabela.to_parquet(paths["features_vagas"])
+    logger.info(f"Features de {len(tabela)} vagas salvas em {paths['features_vagas']}")
+    encerrar_pools()
+
+
+def transform_new_data(
+    df: pd.DataFrame, encoders_path: str, features_vagas: pd.DataFrame = None
+) -> pd.DataFrame:
+    """
+    Transforma novos dados usando os encoders salvos.
+
+    Args:
+        df: DataFrame com os dados a serem transformados
+        encoders_path: Caminho para o diretório onde os encoders estão salvos
+        features_vagas: Tabela de ``gerar_features_vagas``; se todas as vagas de
+            ``df`` estiverem nela, as features da vaga são lidas da tabela e só
+            as do prospect são calculadas
+
+    Returns:
+        DataFrame com as features transformadas
+    """
+    feature_generator = TextFeatureGenerator(
+        cache=carregar_cache_embeddings(identificador_modelo())
+    )
+
+    if features_vagas is not None and "cod_vaga" in df.columns:
+        cod_vaga = df["cod_vaga"].astype(str)
+        if cod_vaga.isin(features_vagas.index).all():
+            logger.info("[Inferência] Usando as features pré-calculadas da vaga...")
+            vaga = features_vagas.loc[cod_vaga.to_numpy()].set_axis(df.index)
+            df = pd.concat([df, vaga], axis=1)
+            campos_prospect = [c for c in CAMPOS_TEXTO if c not in CAMPOS_TEXTO_VAGA]
+            df = feature_generator.transform(df, campos_prospect)
+            df = feature_generator.adicionar_similaridade_titulo_vaga(df)
+            feature_generator.salvar_cache()
+            return df
+        logger.info(
+            "[Inferência] Vaga fora da tabela de features; calculando todas as features"
+        )
+
+    df = aplicar_encoders(df, encoders_path)
+
+    # Aplica as transformações de texto
+    df = feature_generator.transform(df, CAMPOS_TEXTO)
     df = feature_generator.adicionar_similaridade_titulo_vaga(df)
+    feature_generator.salvar_cache()
 
     return df
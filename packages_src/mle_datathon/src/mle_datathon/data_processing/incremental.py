@@ -0,0 +1,272 @@
+"""
+Atualização incremental das camadas bronze e silver (``preprocess.incremental``).
+
+Cada linha da camada bronze recebe uma impressão digital: o hash do registro
+bruto que a originou (para prospects, o registro da vaga sem a lista mais o
+item do candidato). Os hashes ficam em um parquet ao lado da camada silver, na
+mesma ordem das linhas. Em uma nova execução, as linhas cujo hash já existe são
+reaproveitadas das camadas gravadas e só os registros novos ou alterados são
+normalizados e limpos, de modo que o custo acompanha o tamanho da mudança.
+"""
+
+import hashlib
+import json
+import os
+from collections import deque
+from typing import Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mle_datathon.data_processing.ingestion import (
+    conformar_tabela,
+    itens_explode,
+    iter_json_records,
+    normalizar_registros,
+    registros_para_df,
+    serializar_aninhados,
+    unificar_schemas,
+)
+from mle_datathon.utils import set_log
+
+logger = set_log("incremental")
+
+_VERSAO_META = b"versao"
+
+
+def caminho_hashes(silver_path: str) -> str:
+    """
+    Caminho padrão do parquet de hashes que acompanha uma tabela silver, usado
+    quando o config não define ``paths.<tabela>_hashes``.
+    """
+    return f"{os.path.splitext(silver_path)[0]}.hashes.parquet"
+
+
+def _hash(*partes: Any) -> str:
+    conteudo = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(conteudo.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def versao_opcoes(**opcoes: Any) -> str:
+    """Identifica as opções de normalização e limpeza de uma tabela."""
+    return _hash(opcoes)
+
+
+def hashes_registro(
+    chave: str, registro: Any, explode_col: str = None
+) -> List[Tuple[str, str]]:
+    """
+    Chave e hash de cada linha bronze gerada por um registro bruto.
+
+    Sem ``explode_col`` o registro gera uma linha, identificada pela chave do
+    JSON (``cod_applicant``, ``cod_vaga``). Com ``explode_col`` gera uma linha
+    por item da lista, identificada por ``<chave>/<codigo>``, seguindo a mesma
+    regra de ``normalizar_registros`` para listas vazias.
+    """
+    if not explode_col:
+        return [(str(chave), _hash(chave, registro))]
+    pai = {k: v for k, v in registro.items() if k != explode_col}
+    linhas = []
+    for item in itens_explode(registro.get(explode_col)):
+        codigo = item.get("codigo") if isinstance(item, dict) else None
+        linhas.append((f"{chave}/{codigo or ''}", _hash(chave, pai, item)))
+    return linhas
+
+
+def calcular_hashes(path: str, explode_col: str = None) -> pd.DataFrame:
+    """Hashes de todas as linhas de um JSON bruto, na ordem da camada bronze."""
+    linhas = [
+        linha
+        for chave, registro in iter_json_records(path)
+        for linha in hashes_registro(chave, registro, explode_col)
+    ]
+    return pd.DataFrame(linhas, columns=["chave", "hash"], dtype=object)
+
+
+def salvar_hashes(hashes: pd.DataFrame, path: str, versao: str) -> None:
+    tabela = pa.Table.from_pandas(hashes, preserve_index=False)
+    tabela = tabela.replace_schema_metadata(
+        {**(tabela.schema.metadata or {}), _VERSAO_META: versao.encode()}
+    )
+    pq.write_table(tabela, path)
+
+
+def ler_hashes(path: str, versao: str) -> pd.DataFrame:
+    """
+    Lê os hashes gravados na última execução.
+
+    Returns:
+        DataFrame com ``chave`` e ``hash``, ou None se o arquivo não existe ou foi
+        gravado com outras opções de limpeza (``versao``), casos em que a tabela
+        precisa de uma carga completa
+    """
+    if not os.path.exists(path):
+        return None
+    tabela = pq.read_table(path)
+    if (tabela.schema.metadata or {}).get(_VERSAO_META) != versao.encode():
+        logger.info(f"[Incremental] {path} gravado com outras opções; carga completa.")
+        return None
+    return tabela.to_pandas()
+
+
+def separar_delta(
+    path: str,
+    anteriores: pd.DataFrame,
+    index_col: str,
+    cols_normalize: list = None,
+    explode_col: str = None,
+    batch_size: int = 5000,
+) -> Tuple[pd.DataFrame, np.ndarray, pd.DataFrame]:
+    """
+    Compara o JSON bruto com os hashes da última execução.
+
+    Args:
+        path: Caminho do JSON bruto
+        anteriores: Hashes gravados na última execução
+        index_col: Nome da coluna que recebe o id de cada registro
+        cols_normalize: Colunas com objetos aninhados a serem expandidos
+        explode_col: Coluna com lista de objetos a ser explodida em linhas
+        batch_size: Registros alterados normalizados por vez
+
+    Returns:
+        Tupla com os hashes atuais, a posição anterior de cada linha atual (-1
+        para linhas novas ou alteradas) e as linhas bronze novas ou alteradas,
+        já normalizadas, na ordem do arquivo
+    """
+    disponiveis = {}
+    for posicao, linha in enumerate(zip(anteriores["chave"], anteriores["hash"])):
+        disponiveis.setdefault(linha, deque()).append(posicao)
+
+    def normalizar(lote, mascara):
+        df = normalizar_registros(
+            registros_para_df(lote, index_col), cols_normalize, explode_col
+        )
+        return df[mascara]
+
+    linhas, origem, delta = [], [], []
+    lote, mascara = [], []
+    for chave, registro in iter_json_records(path):
+        novas = []
+        for linha in hashes_registro(chave, registro, explode_col):
+            fila = disponiveis.get(linha)
+            origem.append(fila.popleft() if fila else -1)
+            novas.append(origem[-1] < 0)
+            linhas.append(linha)
+        # Um registro com alguma linha alterada é normalizado inteiro e só as
+        # linhas alteradas seguem para a limpeza
+        if any(novas):
+            lote.append((chave, registro))
+            mascara.extend(novas)
+            if len(lote) >= batch_size:
+                delta.append(normalizar(lote, mascara))
+                lote, mascara = [], []
+    if lote:
+        delta.append(normalizar(lote, mascara))
+
+    hashes = pd.DataFrame(linhas, columns=["chave", "hash"], dtype=object)
+    delta = pd.concat(delta, ignore_index=True) if delta else pd.DataFrame()
+    return hashes, np.asarray(origem, dtype=np.intp), delta
+
+
+def _permutacao(origem: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # As linhas reaproveitadas vêm antes das novas na concatenação; a permutação
+    # devolve cada uma à sua posição atual
+    reaproveitadas = np.flatnonzero(origem >= 0)
+    ordem = np.concatenate([reaproveitadas, np.flatnonzero(origem < 0)])
+    return origem[reaproveitadas], np.argsort(ordem, kind="stable")
+
+
+def mesclar_bronze(
+    bronze_path: str, delta: pd.DataFrame, origem: np.ndarray
+) -> pd.DataFrame:
+    """
+    Regrava a camada bronze com as linhas reaproveitadas e as novas.
+
+    Returns:
+        Linhas novas ou alteradas como ficaram gravadas, com o schema unificado
+        da tabela inteira, prontas para a limpeza
+    """
+    posicoes, permutacao = _permutacao(origem)
+    bronze = pq.read_table(bronze_path)
+    tabelas = [bronze.take(posicoes)]
+    if len(delta):
+        # Sem o modo streaming, a bronze guarda listas e objetos como listas e
+        # structs; o delta segue o mesmo formato e só as outras colunas viram
+        # texto JSON
+        aninhadas = [
+            field.name
+            for field in bronze.schema
+            if pa.types.is_nested(field.type) and field.name in delta.columns
+        ]
+        planas = delta.columns.difference(aninhadas, sort=False)
+        delta[planas] = serializar_aninhados(delta[planas].copy())
+        tabela_delta = pa.Table.from_pandas(delta, preserve_index=False)
+        for nome in aninhadas:
+            # Mesmo tipo da bronze (o nome do campo filho das listas varia com
+            # a origem). Se a conversão perde dados, como um campo novo em um
+            # objeto, a coluna inteira vira texto em conformar_tabela
+            posicao = tabela_delta.schema.get_field_index(nome)
+            original = tabela_delta.column(posicao)
+            try:
+                coluna = original.cast(bronze.schema.field(nome).type)
+                if not coluna.cast(original.type).equals(original):
+                    continue
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                continue
+            tabela_delta = tabela_delta.set_column(posicao, nome, coluna)
+        tabelas.append(tabela_delta)
+    schema = unificar_schemas([t.schema for t in tabelas])
+    tabela = pa.concat_tables([conformar_tabela(t, schema) for t in tabelas])
+    tabela = tabela.take(permutacao)
+    pq.write_table(tabela, bronze_path)
+    return tabela.take(np.flatnonzero(origem < 0)).to_pandas()
+
+
+def _texto_json(valor: Any) -> bool:
+    return isinstance(valor, str) and valor[:1] in ("[", "{")
+
+
+def _json_em_coluna_aninhada(delta: pd.Series, silver: pd.Series) -> bool:
+    # Uma lista ou objeto que mudou de tipo entre as cargas vira texto JSON na
+    # bronze; na silver, a coluna segue com os valores aninhados
+    return delta.map(_texto_json).any() and (
+        silver.map(lambda v: isinstance(v, (dict, list, np.ndarray))).any()
+    )
+
+
+def _alinhar_dtypes(delta: pd.DataFrame, silver: pd.DataFrame) -> pd.DataFrame:
+    # Um lote pequeno pode não ter nenhuma data ou número válido em uma coluna e
+    # sair como texto "desconhecido"; os tipos seguem os da carga completa
+    delta = delta.reindex(columns=silver.columns)
+    for col, dtype in silver.dtypes.items():
+        if dtype == object and _json_em_coluna_aninhada(delta[col], silver[col]):
+            delta[col] = delta[col].map(
+                lambda v: json.loads(v) if _texto_json(v) else v
+            )
+            continue
+        if delta[col].dtype == dtype:
+            continue
+        valores = delta[col].mask(delta[col].eq("desconhecido"))
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            delta[col] = pd.to_datetime(valores, errors="coerce").astype(dtype)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            # Sem voltar ao tipo da silver, que pode ter sido compactado para
+            # um tipo que não comporta os valores novos
+            delta[col] = pd.to_numeric(valores, errors="coerce")
+        else:
+            delta[col] = delta[col].astype(object).fillna("desconhecido")
+    return delta
+
+
+def mesclar_silver(
+    silver: pd.DataFrame, delta: pd.DataFrame, origem: np.ndarray
+) -> pd.DataFrame:
+    """Junta as linhas silver reaproveitadas e as recém-limpas na ordem atual."""
+    posicoes, permutacao = _permutacao(origem)
+    partes = [silver.iloc[posicoes]]
+    if len(delta):
+        partes.append(_alinhar_dtypes(delta, silver))
+    df = pd.concat(partes, ignore_index=True)
+    return df.iloc[permutacao].reset_index(drop=True)
@@ -0,0 +1,318 @@
+"""
+Ingestão em streaming dos JSONs brutos (applicants, prospects e vagas).
+
+Os arquivos brutos são um único objeto ``{id: registro}``. Em vez de carregar o
+objeto inteiro com ``pd.read_json`` e transpor, os registros são lidos de forma
+incremental e gravados na camada bronze em lotes de tamanho limitado, de modo
+que o uso de memória não depende do tamanho do arquivo.
+
+O parquet gravado é o mesmo de ``convert_json_to_df`` seguido de ``to_parquet``,
+exceto em três casos, por isso o modo é opcional (``preprocess.streaming``):
+
+- valores aninhados que não foram normalizados (listas e objetos) viram texto
+  JSON, em vez de colunas de listas ou structs do Arrow;
+- uma coluna com números em alguns lotes e textos em outros vira texto (no
+  caminho em memória o ``to_parquet`` falha), e inteiros misturados com floats
+  viram float64;
+- colunas que só aparecem a partir de um lote posterior ficam no fim do schema.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from itertools import chain
+from typing import Any, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mle_datathon.utils import set_log
+
+logger = set_log("ingestion")
+
+_decoder = json.JSONDecoder()
+_ESPACOS = " \t\n\r"
+
+
+def iter_json_records(path: str, read_size: int = 1 << 20) -> Iterator[Tuple[str, Any]]:
+    """
+    Percorre incrementalmente o objeto JSON de nível superior de um arquivo.
+
+    Args:
+        path: Caminho do arquivo JSON no formato ``{id: registro}``
+        read_size: Quantidade de caracteres lidos do disco por vez
+
+    Returns:
+        Iterador de tuplas ``(id, registro)`` na ordem do arquivo
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buffer, pos, eof = "", 0, False
+
+        def ler_mais() -> bool:
+            nonlocal buffer, pos, eof
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def proximo_caractere() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _ESPACOS:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not ler_mais():
+                    return ""
+
+        def decodificar() -> Any:
+            nonlocal pos
+            while True:
+                try:
+                    valor, fim = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if not ler_mais():
+                        raise
+                    continue
+                # Um número no fim do buffer pode ter sido lido pela metade
+                if fim == len(buffer) and not eof and ler_mais():
+                    continue
+                pos = fim
+                return valor
+
+        if proximo_caractere() != "{":
+            raise ValueError(f"{path} não contém um objeto JSON no nível superior.")
+        pos += 1
+        if proximo_caractere() == "}":
+            return
+
+        while True:
+            chave = decodificar()
+            if proximo_caractere() != ":":
+                raise ValueError(f"JSON inválido em {path}: esperado ':' após {chave}.")
+            pos += 1
+            proximo_caractere()
+            yield chave, decodificar()
+
+            separador = proximo_caractere()
+            pos += 1
+            if separador == "}":
+                return
+            if separador != ",":
+                raise ValueError(f"JSON inválido em {path}: esperado ',' ou '}}'.")
+            proximo_caractere()
+
+
+def iter_lotes_json(
+    path: str, batch_size: int = 5000
+) -> Iterator[List[Tuple[str, Any]]]:
+    """Agrupa os registros de ``iter_json_records`` em lotes de até ``batch_size``."""
+    lote = []
+    for item in iter_json_records(path):
+        lote.append(item)
+        if len(lote) >= batch_size:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def registros_para_df(lote: List[Tuple[str, Any]], index_col: str) -> pd.DataFrame:
+    """
+    Monta o DataFrame de um lote de registros, equivalente a ``pd.read_json(path).T``.
+
+    As chaves numéricas são convertidas para inteiro, como faz o ``read_json``.
+    """
+    chaves, registros = zip(*lote)
+    df = pd.DataFrame.from_records(list(registros))
+    chaves = pd.Series(chaves, dtype="object")
+    try:
+        chaves = pd.to_numeric(chaves)
+    except (ValueError, TypeError):
+        pass
+    df.insert(0, index_col, chaves.to_numpy())
+    return df
+
+
+def itens_explode(valor: Any) -> list:
+    # Mesma regra do DataFrame.explode: lista vazia vira uma linha com NaN
+    if isinstance(valor, list):
+        return valor if valor else [np.nan]
+    return [valor]
+
+
+def _json_normalize(itens: list) -> pd.DataFrame:
+    # Registros sem objetos aninhados dispensam o achatamento recursivo do
+    # json_normalize e viram colunas direto no construtor do DataFrame.
+    registros = []
+    for item in itens:
+        if isinstance(item, dict):
+            if any(isinstance(valor, dict) for valor in item.values()):
+                return pd.json_normalize(itens)
+            registros.append(item)
+        elif item is None or item != item:
+            registros.append({})
+        else:
+            return pd.json_normalize(itens)
+    return pd.DataFrame(registros)
+
+
+def normalizar_registros(
+    df: pd.DataFrame, cols_normalize: list = None, explode_col: str = None
+) -> pd.DataFrame:
+    """
+    Expande as colunas aninhadas e a lista de ``explode_col`` em colunas planas.
+
+    Cada bloco aninhado passa uma única vez pelo ``json_normalize``. A explosão
+    de ``explode_col`` repete as colunas do registro pai a partir do tamanho de
+    cada lista e normaliza todos os itens filhos de uma vez.
+    """
+    if cols_normalize:
+        colunas = {col: df[col] for col in df.columns}
+        for col in cols_normalize:
+            normalizado = _json_normalize(colunas.pop(col).tolist())
+            normalizado.index = df.index
+            for nova_col in normalizado.columns:
+                colunas[nova_col] = normalizado[nova_col]
+        df = pd.DataFrame(colunas, index=df.index)
+
+    if explode_col:
+        itens = [itens_explode(valor) for valor in df[explode_col]]
+        tamanhos = np.fromiter(map(len, itens), dtype=np.intp, count=len(itens))
+        pais = df.drop(columns=explode_col).take(
+            np.repeat(np.arange(len(df)), tamanhos)
+        )
+        pais.index = pd.RangeIndex(len(pais))
+        filhos = _json_normalize(list(chain.from_iterable(itens)))
+        filhos.index = pais.index
+        df = pd.concat([pais, filhos], axis=1)
+
+    for col in df.columns:
+        if df[col].dtype == "object":
+            df[col] = df[col].replace("", pd.NA)
+    return df
+
+
+def serializar_aninhados(df: pd.DataFrame) -> pd.DataFrame:
+    # Valores aninhados que não foram normalizados viram texto JSON, para que
+    # todos os lotes compartilhem um schema plano.
+    for col in df.select_dtypes(include="object").columns:
+        aninhado = df[col].map(lambda v: isinstance(v, (dict, list)))
+        if aninhado.any():
+            df[col] = df[col].where(
+                ~aninhado,
+                df[col].map(lambda v: json.dumps(v, ensure_ascii=False)),
+            )
+    return df
+
+
+def unificar_schemas(schemas: List[pa.Schema]) -> pa.Schema:
+    tipos = {}
+    for schema in schemas:
+        for field in schema:
+            tipos.setdefault(field.name, set()).add(field.type)
+
+    fields = []
+    for nome, tipos_coluna in tipos.items():
+        tipos_coluna = {t for t in tipos_coluna if not pa.types.is_null(t)}
+        if len(tipos_coluna) == 1:
+            tipo = tipos_coluna.pop()
+        elif tipos_coluna and all(
+            pa.types.is_integer(t) or pa.types.is_floating(t) for t in tipos_coluna
+        ):
+            tipo = pa.float64()
+        else:
+            tipo = pa.string()
+        fields.append(pa.field(nome, tipo))
+    return pa.schema(fields)
+
+
+def _conformar_coluna(coluna: pa.ChunkedArray, tipo: pa.DataType) -> pa.ChunkedArray:
+    # O Arrow não converte listas e structs em texto; eles viram o mesmo JSON de
+    # serializar_aninhados
+    if pa.types.is_nested(coluna.type) and pa.types.is_string(tipo):
+        return pa.chunked_array(
+            [
+                pa.array(
+                    [
+                        None if v is None else json.dumps(v, ensure_ascii=False)
+                        for v in coluna.to_pylist()
+                    ],
+                    tipo,
+                )
+            ],
+            tipo,
+        )
+    return coluna.cast(tipo)
+
+
+def conformar_tabela(tabela: pa.Table, schema: pa.Schema) -> pa.Table:
+    colunas = [
+        _conformar_coluna(tabela.column(field.name), field.type)
+        if field.name in tabela.column_names
+        else pa.nulls(tabela.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(colunas, schema=schema)
+
+
+def stream_json_to_parquet(
+    path: str,
+    output_path: str,
+    index_col: str,
+    cols_normalize: list = None,
+    explode_col: str = None,
+    batch_size: int = 5000,
+) -> Tuple[int, int]:
+    """
+    Converte um JSON bruto em parquet bronze processando lotes de registros.
+
+    Cada lote é normalizado e gravado em um arquivo temporário; ao final, os
+    lotes são reescritos em um único parquet com o schema unificado de todos
+    eles. O pico de memória é limitado pelo ``batch_size``.
+
+    Args:
+        path: Caminho do JSON bruto
+        output_path: Caminho do parquet bronze de saída
+        index_col: Nome da coluna que recebe o id de cada registro
+        cols_normalize: Colunas com objetos aninhados a serem expandidos
+        explode_col: Coluna com lista de objetos a ser explodida em linhas
+        batch_size: Quantidade de registros por lote
+
+    Returns:
+        Tupla (linhas, colunas) do parquet gerado
+    """
+    diretorio_lotes = tempfile.mkdtemp(
+        prefix=".lotes_", dir=os.path.dirname(output_path) or "."
+    )
+    try:
+        arquivos, schemas = [], []
+        for i, lote in enumerate(iter_lotes_json(path, batch_size)):
+            df = registros_para_df(lote, index_col)
+            df = serializar_aninhados(
+                normalizar_registros(df, cols_normalize, explode_col)
+            )
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            arquivo = os.path.join(diretorio_lotes, f"lote_{i:05d}.parquet")
+            pq.write_table(tabela, arquivo)
+            arquivos.append(arquivo)
+            schemas.append(tabela.schema)
+            logger.info(f"[Streaming] {path}: lote {i} com {len(df)} linhas.")
+
+        schema = unificar_schemas(schemas)
+        linhas = 0
+        with pq.ParquetWriter(output_path, schema) as writer:
+            for arquivo in arquivos:
+                tabela = conformar_tabela(pq.read_table(arquivo), schema)
+                writer.write_table(tabela)
+                linhas += tabela.num_rows
+    finally:
+        shutil.rmtree(diretorio_lotes, ignore_errors=True)
+
+    return linhas, len(schema)
@@ -0,0 +1,387 @@
+"""
+Modelo de embeddings compartilhado pelo processo.
+
+Carregar o SentenceTransformer lê os pesos do disco e leva alguns segundos; com
+um único modelo por processo, ``cria_features``, ``transform_new_data`` e cada
+interação do front-end reaproveitam o modelo já carregado. O carregamento é
+protegido por um lock, de modo que threads concorrentes (sessões do Streamlit)
+esperam o mesmo carregamento em vez de repeti-lo.
+
+O backend vem de ``embeddings.backend`` no config: ``torch`` roda o modelo
+original em fp32; ``onnx_int8`` exporta o modelo para ONNX com quantização
+dinâmica int8 dos pesos (uma vez, em ``embeddings.onnx_path``) e o executa no
+ONNX Runtime, o que requer ``sentence-transformers[onnx]``.
+
+Com ``embeddings.workers`` > 1, os textos são divididos entre processos, cada um
+com uma cópia do modelo e ``embeddings.threads_per_worker`` threads do torch
+ou do ONNX Runtime.
+O processo principal não carrega o modelo nesse modo, e os pools são encerrados
+por ``encerrar_pools`` ao fim das etapas ou na saída do interpretador.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from mle_datathon.utils import get_abs_path, load_config, set_log
+
+logger = set_log("modelo_embeddings")
+
+MODELO_EMBEDDINGS = "paraphrase-multilingual-MiniLM-L12-v2"
+BACKENDS = ("torch", "onnx_int8")
+
+_MODELOS: Dict[Tuple[str, str], Any] = {}
+_POOLS: Dict[tuple, "PoolEmbeddings"] = {}
+_LOCK = threading.Lock()
+_CONFIG = None
+
+
+def carregar_config_embeddings() -> dict:
+    """Lê a seção ``embeddings`` do config.yaml no primeiro uso."""
+    global _CONFIG
+    if _CONFIG is None:
+        _CONFIG = load_config(os.getcwd()).get("embeddings", {})
+    return _CONFIG
+
+
+def backend_configurado() -> str:
+    backend = carregar_config_embeddings().get("backend", "torch")
+    if backend not in BACKENDS:
+        raise ValueError(f"embeddings.backend deve ser um de {BACKENDS}: {backend}")
+    return backend
+
+
+def identificador_modelo(nome: str = MODELO_EMBEDDINGS, backend: str = None) -> str:
+    """
+    Nome do modelo usado nas chaves do cache de embeddings.
+
+    Os vetores do modelo quantizado diferem dos originais e não podem ser
+    misturados no mesmo cache.
+    """
+    backend = backend or backend_configurado()
+    return nome if backend == "torch" else f"{nome}@{backend}"
+
+
+def _carregar_onnx_int8(nome: str, threads: int = None):
+    from sentence_transformers import (
+        SentenceTransformer,
+        export_dynamic_quantized_onnx_model,
+    )
+
+    embeddings_cfg = carregar_config_embeddings()
+    quantizacao = embeddings_cfg.get("onnx_quantization", "avx2")
+    diretorio = os.path.join(
+        get_abs_path(os.getcwd(), embeddings_cfg["onnx_path"]), nome
+    )
+    arquivo = f"onnx/model_qint8_{quantizacao}.onnx"
+    if not os.path.exists(os.path.join(diretorio, arquivo)):
+        logger.info(f"[Modelo] Exportando {nome} para ONNX int8 ({quantizacao})...")
+        modelo = SentenceTransformer(nome, backend="onnx")
+        modelo.save_pretrained(diretorio)
+        export_dynamic_quantized_onnx_model(
+            modelo, quantizacao, diretorio, file_suffix=f"qint8_{quantizacao}"
+        )
+    model_kwargs = {"file_name": arquivo, "provider": "CPUExecutionProvider"}
+    if threads:
+        # O ONNX Runtime ignora o torch.set_num_threads e as variáveis do OpenMP;
+        # sem isso cada worker abriria um thread por núcleo da máquina
+        import onnxruntime
+
+        opcoes = onnxruntime.SessionOptions()
+        opcoes.intra_op_num_threads = threads
+        model_kwargs["session_options"] = opcoes
+    return SentenceTransformer(diretorio, backend="onnx", model_kwargs=model_kwargs)
+
+
+def _carregar_modelo(nome: str, backend: str = "torch", threads: int = None):
+    # sentence_transformers carrega o torch; só é importado no primeiro uso
+    logger.info(f"[Modelo] Carregando modelo de embeddings {nome} ({backend})...")
+    if backend == "onnx_int8":
+        return _carregar_onnx_int8(nome, threads)
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(nome)
+
+
+def obter_modelo_embeddings(
+    nome: str = MODELO_EMBEDDINGS, backend: str = None, threads: int = None
+):
+    """
+    Devolve o modelo de embeddings do processo, carregando-o no primeiro uso.
+
+    Args:
+        nome: Nome do modelo no Hugging Face
+        backend: ``torch`` ou ``onnx_int8``; se omitido, usa ``embeddings.backend``
+        threads: Threads da sessão do ONNX Runtime no backend ``onnx_int8``; se
+            omitido, o ONNX Runtime usa todos os núcleos
+    """
+    backend = backend or backend_configurado()
+    modelo = _MODELOS.get((nome, backend))
+    if modelo is None:
+        with _LOCK:
+            modelo = _MODELOS.get((nome, backend))
+            if modelo is None:
+                modelo = _carregar_modelo(nome, backend, threads)
+                _MODELOS[(nome, backend)] = modelo
+    return modelo
+
+
+def paridade_features_agregadas(
+    textos: List[str], referencia, candidato
+) -> pd.DataFrame:
+    """
+    Compara as features agregadas de embeddings geradas por dois modelos.
+
+    Args:
+        textos: Textos de amostra, de preferência dos campos reais
+        referencia: Modelo de referência (backend ``torch``)
+        candidato: Modelo a ser validado (por exemplo ``onnx_int8``)
+
+    Returns:
+        DataFrame indexado pela feature (``emb_mean``, ``emb_std``...) com a
+        maior diferença absoluta e a correlação entre os dois modelos
+    """
+    from mle_datathon.data_processing.feature_engineering import TextFeatureGenerator
+
+    # Em float64, para que a correlação de features quase constantes não perca
+    # precisão
+    ref, cand = (
+        TextFeatureGenerator(modelo).gerar_embeddings_agregados(textos).astype(float)
+        for modelo in (referencia, candidato)
+    )
+    return pd.DataFrame(
+        {"max_dif_abs": (ref - cand).abs().max(), "correlacao": ref.corrwith(cand)}
+    )
+
+
+def comprimentos_tokens(modelo, textos: List[str]) -> np.ndarray:
+    """
+    Quantidade de tokens de cada texto como o modelo vai processá-lo.
+
+    Usa o tokenizador do modelo, limitado a ``max_seq_length``; modelos sem
+    tokenizador (como os de teste) contam palavras.
+    """
+    tokenizer = getattr(modelo, "tokenizer", None)
+    if tokenizer is None:
+        comprimentos = [len(texto.split()) + 2 for texto in textos]
+    else:
+        ids = tokenizer(textos, add_special_tokens=True)["input_ids"]
+        comprimentos = [len(i) for i in ids]
+    limite = getattr(modelo, "max_seq_length", None) or np.iinfo(np.int64).max
+    return np.minimum(np.asarray(comprimentos, dtype=np.int64), limite)
+
+
+def lotes_por_tokens(
+    comprimentos: np.ndarray, max_tokens_lote: int
+) -> List[np.ndarray]:
+    """
+    Agrupa os textos em lotes de comprimento parecido.
+
+    Os textos são ordenados do mais longo para o mais curto e cada lote recebe
+    tantos textos quanto cabem em ``max_tokens_lote`` tokens com o padding até o
+    mais longo do lote: poucos CVs longos por lote, muitos comentários curtos.
+
+    Returns:
+        Lista com as posições dos textos de cada lote
+    """
+    ordem = np.argsort(-comprimentos, kind="stable")
+    lotes = []
+    inicio = 0
+    while inicio < len(ordem):
+        maior = max(int(comprimentos[ordem[inicio]]), 1)
+        tamanho = max(max_tokens_lote // maior, 1)
+        lotes.append(ordem[inicio : inicio + tamanho])
+        inicio += tamanho
+    return lotes
+
+
+def codificar_por_comprimento(
+    modelo, textos: List[str], max_tokens_lote: int, show_progress_bar: bool = False
+) -> np.ndarray:
+    """
+    Embeddings normalizados dos textos, em lotes definidos por um orçamento de tokens.
+
+    Substitui o ``batch_size`` fixo do ``encode``: com 128 textos por lote, um
+    lote com um único texto longo processa todos os outros com o padding dele.
+
+    Returns:
+        Matriz com um embedding por texto, na ordem de ``textos``
+    """
+    if not textos:
+        return modelo.encode(textos, convert_to_numpy=True, normalize_embeddings=True)
+    comprimentos = comprimentos_tokens(modelo, textos)
+    lotes = lotes_por_tokens(comprimentos, max_tokens_lote)
+    logger.info(
+        f"[Lotes] {len(textos)} textos em {len(lotes)} lotes de até "
+        f"{max_tokens_lote} tokens"
+    )
+    resultado = None
+    for lote in tqdm(lotes, desc="[Lotes]", disable=not show_progress_bar):
+        embeddings = modelo.encode(
+            [textos[i] for i in lote],
+            batch_size=len(lote),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        if resultado is None:
+            resultado = np.empty((len(textos), embeddings.shape[1]), embeddings.dtype)
+        resultado[lote] = embeddings
+    return resultado
+
+
+def _inicializar_worker(nome: str, backend: str, threads: int) -> None:
+    # Limita as threads antes de carregar o modelo para os processos não
+    # disputarem os mesmos núcleos
+    for variavel in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variavel] = str(threads)
+    import torch
+
+    torch.set_num_threads(threads)
+    obter_modelo_embeddings(nome, backend, threads)
+
+
+def _codificar_fatia(
+    nome: str, backend: str, textos: List[str], max_tokens_lote: int, batch_size: int
+) -> np.ndarray:
+    modelo = obter_modelo_embeddings(nome, backend)
+    if max_tokens_lote:
+        return codificar_por_comprimento(modelo, textos, max_tokens_lote)
+    return modelo.encode(
+        textos,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+
+
+class PoolEmbeddings:
+    """
+    Processos com uma cópia do modelo de embeddings cada.
+
+    Os processos sobem no primeiro ``codificar`` e carregam o modelo uma vez;
+    o pool é reaproveitado pelos campos seguintes.
+    """
+
+    def __init__(
+        self, nome: str, backend: str, workers: int, threads_por_worker: int = None
+    ):
+        self.nome = nome
+        self.backend = backend
+        self.workers = workers
+        self.threads_por_worker = threads_por_worker or max(
+            (os.cpu_count() or 1) // workers, 1
+        )
+        # fork com os threads do torch já ativos pode travar os processos filhos
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_worker,
+            initargs=(nome, backend, self.threads_por_worker),
+        )
+
+    def codificar(
+        self, textos: List[str], max_tokens_lote: int = None, batch_size: int = 128
+    ) -> np.ndarray:
+        """
+        Embeddings normalizados dos textos, divididos entre os processos.
+
+        Cada processo recebe algumas fatias intercaladas (um texto a cada N),
+        para que todas tenham textos curtos e longos na mesma proporção. Mesmo
+        um único texto vai para um processo do pool, para que o processo
+        principal não carregue outra cópia do modelo.
+
+        Returns:
+            Matriz com um embedding por texto, na ordem de ``textos``
+        """
+        quantidade = min(len(textos), self.workers * 4)
+        if quantidade <= 1:
+            return self._executor.submit(
+                _codificar_fatia,
+                self.nome,
+                self.backend,
+                textos,
+                max_tokens_lote,
+                batch_size,
+            ).result()
+        logger.info(
+            f"[Paralelo] {len(textos)} textos em {quantidade} fatias com "
+            f"{self.workers} processos de {self.threads_por_worker} threads"
+        )
+        fatias = [np.arange(i, len(textos), quantidade) for i in range(quantidade)]
+        futuros = [
+            self._executor.submit(
+                _codificar_fatia,
+                self.nome,
+                self.backend,
+                [textos[i] for i in fatia],
+                max_tokens_lote,
+                batch_size,
+            )
+            for fatia in fatias
+        ]
+        resultado = None
+        for fatia, futuro in zip(fatias, futuros):
+            embeddings = futuro.result()
+            if resultado is None:
+                resultado = np.empty(
+                    (len(textos), embeddings.shape[1]), embeddings.dtype
+                )
+            resultado[fatia] = embeddings
+        return resultado
+
+    def encerrar(self) -> None:
+        self._executor.shutdown()
+
+
+def obter_pool_embeddings(
+    workers: int,
+    threads_por_worker: int = None,
+    nome: str = MODELO_EMBEDDINGS,
+    backend: str = None,
+) -> PoolEmbeddings:
+    """
+    Devolve o pool de processos de embeddings, criando-o no primeiro uso.
+
+    Args:
+        workers: Quantidade de processos
+        threads_por_worker: Threads do torch ou do ONNX Runtime em cada
+            processo; se omitido, divide os núcleos da máquina entre os processos
+        nome: Nome do modelo no Hugging Face
+        backend: ``torch`` ou ``onnx_int8``; se omitido, usa ``embeddings.backend``
+    """
+    chave = (nome, backend or backend_configurado(), workers, threads_por_worker)
+    with _LOCK:
+        if chave not in _POOLS:
+            _POOLS[chave] = PoolEmbeddings(*chave)
+        return _POOLS[chave]
+
+
+@atexit.register
+def encerrar_pools() -> None:
+    """Encerra os processos de todos os pools de embeddings abertos."""
+    with _LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.encerrar()
+
+
+def aquecer_modelo_embeddings(nome: str = MODELO_EMBEDDINGS) -> None:
+    """
+    Carrega o modelo e executa uma codificação curta.
+
+    A primeira chamada ao ``encode`` inicializa o tokenizador e os kernels do
+    torch; chamar esta função na subida da aplicação (por exemplo em uma thread
+    em segundo plano) tira esse custo da primeira inferência.
+    """
+    obter_modelo_embeddings(nome).encode(["aquecimento"], show_progress_bar=False)
+    logger.info(f"[Modelo] {nome} carregado e aquecido.")
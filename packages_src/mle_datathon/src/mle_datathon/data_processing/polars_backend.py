@@ -0,0 +1,380 @@
+"""
+Backend Polars do pré-processamento (``preprocess.backend: polars``).
+
+Executa a mesma cadeia bronze -> silver -> gold de ``execute_preprocess`` sobre
+planos lazy do Polars, gravando os mesmos arquivos parquet. Datas e números são
+convertidos com expressões nativas; só os valores distintos que não seguem os
+formatos conhecidos passam pelas funções de limpeza originais em Python, assim
+como os textos, que dependem do ``unidecode``.
+
+A camada bronze ainda é gerada pelo ``carregar_bronze`` do backend pandas (a
+normalização dos JSON não tem equivalente no Polars) e só então lida como plano
+lazy, de modo que o pico de memória dessa etapa é o mesmo do pandas; o Polars
+atua a partir da camada silver.
+"""
+
+import time
+from typing import Callable, List
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mle_datathon.data_processing.compactacao import STRING_ARROW
+from mle_datathon.data_processing.preprocess_data import (
+    ESPACOS_ASCII,
+    FORMATOS_DATA,
+    RE_NUMERO_BR,
+    RE_NUMERO_SIMPLES,
+    RE_NUMERO_US,
+    bronze_applicants,
+    bronze_prospects,
+    bronze_vagas,
+    carregar_bronze,
+    carregar_config,
+    carregar_stop_words,
+    colunas_remover_modelagem,
+    limpar_anos,
+    limpar_datas,
+    limpar_numeros,
+    limpar_textos,
+    limpeza_applicants,
+    limpeza_prospects,
+    limpeza_vagas,
+    local_path,
+    mapping,
+)
+from mle_datathon.utils import get_abs_path, medir_etapa, set_log
+
+logger = set_log("polars_backend")
+
+_DATA = pl.Datetime("ns")
+
+
+def _limpar_valores_unicos(
+    serie: pl.Series, limpar_coluna: Callable, dtype: pl.DataType
+) -> pl.Series:
+    """
+    Aplica uma limpeza pandas aos valores distintos da série e espalha o
+    resultado.
+    """
+    unicos = serie.drop_nulls().unique(maintain_order=True)
+    if unicos.is_empty():
+        return pl.Series(serie.name, [None] * len(serie), dtype=dtype)
+    limpos = pl.from_pandas(limpar_coluna(unicos.to_pandas())).cast(dtype)
+    return serie.replace_strict(unicos, limpos, default=None, return_dtype=dtype)
+
+
+def limpar_textos_pl(serie: pl.Series) -> pl.Series:
+    return _limpar_valores_unicos(
+        serie, lambda s: limpar_textos(s, carregar_stop_words()), pl.String
+    )
+
+
+def _completar(
+    serie: pl.Series,
+    convertidos: pl.Series,
+    validos: pl.Series,
+    limpar_valor: Callable,
+    dtype: pl.DataType,
+) -> pl.Series:
+    # Valores fora dos formatos conhecidos seguem a regra original, um por valor
+    # distinto
+    outros = ~validos & serie.is_not_null()
+    if not outros.any():
+        return convertidos
+    avulsos = _limpar_valores_unicos(
+        serie.filter(outros), lambda s: s.apply(limpar_valor), dtype
+    )
+    return convertidos.scatter(outros.arg_true(), avulsos)
+
+
+def limpar_numeros_pl(serie: pl.Series) -> pl.Series:
+    """Equivalente a ``limpar_numeros_coluna`` com expressões nativas."""
+    textos = serie.cast(pl.String).str.strip_chars(ESPACOS_ASCII)
+    texto = pl.col(textos.name)
+    us = texto.str.contains(RE_NUMERO_US)
+    br = texto.str.contains(RE_NUMERO_BR)
+    simples = texto.str.contains(RE_NUMERO_SIMPLES)
+    resultado = textos.to_frame().select(
+        pl.when(us)
+        .then(texto.str.replace_all(",", "", literal=True))
+        .when(br)
+        .then(
+            texto.str.replace_all(".", "", literal=True).str.replace_all(
+                ",", ".", literal=True
+            )
+        )
+        .when(simples)
+        .then(texto)
+        .cast(pl.Float64)
+        .alias("numero"),
+        (us | br | simples).fill_null(False).alias("valido"),
+    )
+    return _completar(
+        serie, resultado["numero"], resultado["valido"], limpar_numeros, pl.Float64
+    ).alias(serie.name)
+
+
+def limpar_anos_pl(serie: pl.Series) -> pl.Series:
+    """Equivalente a ``serie.apply(limpar_anos)`` com expressões nativas."""
+    textos = serie.cast(pl.String).str.strip_chars(ESPACOS_ASCII)
+    texto = pl.col(textos.name)
+    resultado = textos.to_frame().select(
+        texto.cast(pl.Float64, strict=False).alias("ano"),
+        texto.str.contains(r"^[+-]?[0-9]+(\.[0-9]+)?$")
+        .fill_null(False)
+        .alias("valido"),
+    )
+    anos = resultado["ano"]
+    anos = anos.set(~anos.is_between(1900, 2025).fill_null(False), None)
+    return _completar(serie, anos, resultado["valido"], limpar_anos, pl.Float64).alias(
+        serie.name
+    )
+
+
+def _limpar_data_valor(valor):
+    data = limpar_datas(valor)
+    if data is not None and data.tzinfo is not None:
+        # Colunas Datetime do Polars não misturam fusos; a data fica em UTC
+        data = data.tz_convert(None)
+    return data
+
+
+def limpar_datas_pl(serie: pl.Series) -> pl.Series:
+    """
+    Equivalente a ``limpar_datas_coluna`` com expressões nativas.
+
+    Cada forma conhecida (``dd-mm-aaaa``, ``aaaa-mm-dd``, com ou sem hora) é
+    convertida com os mesmos formatos candidatos, na mesma ordem. Datas com fuso,
+    que no backend pandas deixam a coluna como object, são convertidas para UTC.
+    """
+    textos = serie.cast(pl.String).str.strip_chars(ESPACOS_ASCII)
+    formas = textos.str.replace_all("[0-9]", "9")
+    datas = pl.Series(serie.name, [None] * len(serie), dtype=_DATA)
+    for forma in formas.unique().drop_nulls().to_list():
+        candidatos = FORMATOS_DATA.get(forma)
+        if candidatos is None:
+            continue
+        posicoes = (formas == forma).arg_true()
+        convertidas = (
+            textos.gather(posicoes)
+            .to_frame("texto")
+            .select(
+                pl.coalesce(
+                    pl.col("texto").str.strptime(_DATA, formato, strict=False)
+                    for formato in candidatos
+                )
+            )
+            .to_series()
+        )
+        datas.scatter(posicoes, convertidas)
+
+    validos = formas.is_in(list(FORMATOS_DATA)).fill_null(False)
+    datas = _completar(serie, datas, validos, _limpar_data_valor, _DATA)
+    fora_do_intervalo = ~datas.dt.year().is_between(1930, 2030).fill_null(True)
+    return datas.set(fora_do_intervalo, None).alias(serie.name)
+
+
+_LIMPEZAS_PL = {
+    "colunas_texto": (limpar_textos_pl, pl.String),
+    "colunas_data": (limpar_datas_pl, _DATA),
+    "colunas_anos": (limpar_anos_pl, pl.Float64),
+    "colunas_numeros": (limpar_numeros_pl, pl.Float64),
+}
+
+
+def colunas_a_remover(lf: pl.LazyFrame, limite_dominancia: float = 0.9) -> List[str]:
+    """
+    Colunas removidas por ``remove_colunas_dominantes`` e
+    ``remove_colunas_irrelevantes``, calculadas em uma única consulta.
+    """
+    schema = lf.collect_schema()
+    exprs = [pl.len().alias("__linhas")]
+    for col, dtype in schema.items():
+        valores = pl.col(col).fill_nan(None) if dtype.is_float() else pl.col(col)
+        exprs += [
+            valores.count().alias(f"{col}__nao_nulos"),
+            valores.drop_nulls()
+            .value_counts()
+            .struct.field("count")
+            .max()
+            .alias(f"{col}__top"),
+        ]
+    perfil = lf.select(exprs).collect().row(0, named=True)
+
+    linhas = perfil["__linhas"]
+    remover = []
+    for col in schema:
+        nao_nulos, top = perfil[f"{col}__nao_nulos"], perfil[f"{col}__top"]
+        dominante = bool(nao_nulos) and top / nao_nulos > limite_dominancia
+        if dominante or nao_nulos < linhas * 0.1:
+            remover.append(col)
+    return remover
+
+
+def clean_data_pl(lf: pl.LazyFrame, **colunas: List[str]) -> pl.DataFrame:
+    """
+    Equivalente a ``clean_data`` sobre um plano lazy.
+
+    Args:
+        lf: Tabela da camada bronze
+        **colunas: Mesmas listas de colunas aceitas por ``clean_data``
+
+    Returns:
+        Tabela da camada silver
+
+    Raises:
+        KeyError: Se uma coluna listada não existe ou foi removida pelo perfil,
+            como no ``clean_data``
+    """
+    lf = lf.drop(colunas_a_remover(lf))
+    schema = lf.collect_schema()
+    limpezas = {}
+    for tipo, lista in colunas.items():
+        for col in lista or []:
+            if col not in schema:
+                raise KeyError(col)
+            limpezas[col] = _LIMPEZAS_PL[tipo]
+    df = lf.with_columns(
+        pl.col(col).map_batches(limpar, return_dtype=dtype)
+        for col, (limpar, dtype) in limpezas.items()
+    ).collect()
+
+    # No pandas, colunas de data sem nenhuma data válida ficam object e recebem
+    # o preenchimento abaixo junto com os textos
+    vazias = [
+        col
+        for col in colunas.get("colunas_data") or []
+        if col in df.columns and df[col].null_count() == df.height
+    ]
+    df = df.with_columns(pl.col(vazias).cast(pl.String))
+    return df.with_columns(
+        pl.col(col).cast(pl.String).fill_null("desconhecido")
+        for col, dtype in df.schema.items()
+        if dtype in (pl.String, pl.Null)
+    )
+
+
+_INTEIROS = {pl.Int8: np.int8, pl.Int16: np.int16, pl.Int32: np.int32}
+
+
+def compactar_dtypes_pl(
+    df: pl.DataFrame, max_fracao_categorias: float = 0.5
+) -> pl.DataFrame:
+    """Equivalente a ``compactar_dtypes`` para as tabelas gravadas pelo Polars."""
+    conversoes = []
+    for col, dtype in df.schema.items():
+        serie = df[col]
+        if dtype == pl.String:
+            unicos = serie.drop_nulls().n_unique()
+            if unicos <= max_fracao_categorias * df.height:
+                conversoes.append(pl.col(col).cast(pl.Categorical))
+        elif dtype.is_signed_integer() and serie.null_count() < df.height:
+            minimo, maximo = serie.min(), serie.max()
+            for inteiro, tipo_numpy in _INTEIROS.items():
+                info = np.iinfo(tipo_numpy)
+                if info.min <= minimo and maximo <= info.max:
+                    conversoes.append(pl.col(col).cast(inteiro))
+                    break
+        elif dtype == pl.Float64:
+            reduzida = serie.cast(pl.Float32)
+            if reduzida.cast(pl.Float64).equals(serie):
+                conversoes.append(pl.col(col).cast(pl.Float32))
+    return df.with_columns(conversoes)
+
+
+def _gravar(df: pl.DataFrame, path: str) -> None:
+    """
+    Grava a tabela, compactada se ``preprocess.compact_dtypes`` estiver ativo.
+
+    A tabela compactada leva os metadados do pandas, para que os leitores
+    recebam os mesmos tipos do backend pandas: sem eles os textos livres, já
+    gravados como ``large_string``, voltariam do parquet como ``object``.
+    """
+    preprocess_cfg = carregar_config().get("preprocess", {})
+    if not preprocess_cfg.get("compact_dtypes", False):
+        df.write_parquet(path)
+        return
+    tabela = compactar_dtypes_pl(
+        df, preprocess_cfg.get("category_max_ratio", 0.5)
+    ).to_arrow()
+    vazia = tabela.slice(0, 0).to_pandas(
+        types_mapper={pa.large_string(): STRING_ARROW}.get
+    )
+    metadados = pa.Schema.from_pandas(vazia, preserve_index=False).metadata
+    pq.write_table(
+        tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), **metadados}),
+        path,
+    )
+
+
+def _carregar_bronze(path: str, output_path: str, **kwargs) -> pl.LazyFrame:
+    # A camada bronze é gravada pelo mesmo caminho do backend pandas, respeitando
+    # ``preprocess.streaming``, e lida de volta como plano lazy
+    carregar_bronze(path, output_path, **kwargs)
+    return pl.scan_parquet(output_path)
+
+
+def execute_preprocess_polars() -> None:
+    paths = carregar_config()["paths"]
+    inicio = time.perf_counter()
+
+    tabelas = {}
+    for nome, bronze, limpeza in (
+        ("applicants", bronze_applicants, limpeza_applicants),
+        ("vagas", bronze_vagas, limpeza_vagas),
+        ("prospects", bronze_prospects, limpeza_prospects),
+    ):
+        lf = _carregar_bronze(
+            get_abs_path(local_path, paths[f"{nome}_json"]),
+            get_abs_path(local_path, paths[f"{nome}_bronze"]),
+            **bronze,
+        )
+        logger.info(f"# --- TRATANDO COLUNAS TABELA {nome.upper()} ---")
+        silver = clean_data_pl(lf, **limpeza)
+        _gravar(silver, get_abs_path(local_path, paths[f"{nome}_silver"]))
+        logger.info(
+            f"[Polars] {nome} {silver.shape} em {time.perf_counter() - inicio:.1f}s"
+        )
+        # applicants não entra na camada gold e é liberado logo após a gravação
+        if nome != "applicants":
+            tabelas[nome] = silver
+        del silver
+    logger.info("Data preprocessing completed.")
+
+    with medir_etapa("gold", logger):
+        df = (
+            tabelas["prospects"]
+            .lazy()
+            .join(
+                tabelas["vagas"].lazy(),
+                on="cod_vaga",
+                how="left",
+                suffix="_vaga",
+                maintain_order="left",
+            )
+            .collect()
+        )
+        output_path = get_abs_path(local_path, paths["dataset_consolidado"])
+        _gravar(df, output_path)
+        logger.info(f"Dataset consolidado salvo em: {output_path}")
+
+        df = df.with_columns(
+            pl.col("situacao_candidado").replace(mapping)
+        ).with_columns(
+            (pl.col("situacao_candidado") == "aprovado").cast(pl.Int64).alias("target")
+        )
+        _gravar(
+            df.drop(colunas_remover_modelagem, strict=False),
+            get_abs_path(local_path, paths["dataset_modelagem"]),
+        )
+        logger.info(f"Dataset para modelagem salvo em {paths['dataset_modelagem']}")
+    logger.info("Distribuição da variável-alvo:")
+    logger.info(df["target"].value_counts(sort=True))
+    logger.info("Distribuição das categorias de situação do candidato:")
+    logger.info(df["situacao_candidado"].value_counts(sort=True))
+    logger.info(
+        f"[Polars] Pré-processamento concluído em {time.perf_counter() - inicio:.1f}s"
+    )
@@ -1,35 +1,86 @@
-import pandas as pd
-import numpy as np
-import nltk
-import re
+import multiprocessing
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Tuple
 
-from nltk.corpus import stopwords
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from unidecode import unidecode
-from mle_datathon.utils import get_abs_path, load_config, set_log
-
-logger = set_log("preprocess_data")
 
-try:
-    nltk.data.find("corpora/stopwords")
-    logger.info("NLTK stopwords already downloaded.")
-except LookupError:
-    logger.info("NLTK stopwords not found. Downloading...")
-    nltk.download("stopwords")
-    logger.info("NLTK stopwords downloaded successfully.")
+from mle_datathon.data_processing.compactacao import compactar_dtypes
+from mle_datathon.data_processing.incremental import (
+    calcular_hashes,
+    caminho_hashes,
+    ler_hashes,
+    mesclar_bronze,
+    mesclar_silver,
+    salvar_hashes,
+    separar_delta,
+    versao_opcoes,
+)
+from mle_datathon.data_processing.ingestion import (
+    normalizar_registros,
+    stream_json_to_parquet,
+)
+from mle_datathon.data_processing.profiling import perfil_colunas
+from mle_datathon.data_processing.text_cleaning import limpar_textos
+from mle_datathon.utils import get_abs_path, load_config, medir_etapa, set_log
 
-stop_words = set(stopwords.words("portuguese"))
+logger = set_log("preprocess_data")
 
 local_path = os.getcwd()
-config = load_config(local_path)
-
 
-def remove_colunas_dominantes(df: pd.DataFrame, limite_dominancia: float = 0.9) -> set:
-    colunas_remover = set()
-    for col in df.columns:
-        valor_mais_frequente = df[col].value_counts(normalize=True, dropna=True).max()
-        if valor_mais_frequente > limite_dominancia:
-            colunas_remover.add(col)
+_config = None
+_stop_words = None
+
+
+def carregar_config() -> dict:
+    """Lê o config.yaml da raiz do projeto no primeiro uso."""
+    global _config
+    if _config is None:
+        _config = load_config(local_path)
+    return _config
+
+
+def carregar_stop_words() -> set:
+    """Carrega as stopwords em português do NLTK, baixando-as se preciso."""
+    global _stop_words
+    if _stop_words is None:
+        import nltk
+        from nltk.corpus import stopwords
+
+        try:
+            nltk.data.find("corpora/stopwords")
+            logger.info("NLTK stopwords already downloaded.")
+        except LookupError:
+            logger.info("NLTK stopwords not found. Downloading...")
+            nltk.download("stopwords")
+            logger.info("NLTK stopwords downloaded successfully.")
+        _stop_words = set(stopwords.words("portuguese"))
+    return _stop_words
+
+
+def __getattr__(name):
+    # config e stop_words seguem acessíveis como atributos do módulo, mas só são
+    # carregados no primeiro acesso
+    if name == "config":
+        return carregar_config()
+    if name == "stop_words":
+        return carregar_stop_words()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def remove_colunas_dominantes(
+    df: pd.DataFrame, limite_dominancia: float = 0.9, perfil: pd.DataFrame = None
+) -> set:
+    if perfil is None:
+        perfil = perfil_colunas(df)
+    frequencia_top = perfil["frequencia_top"].reindex(df.columns)
+    colunas_remover = set(frequencia_top.index[frequencia_top > limite_dominancia])
     df.drop(columns=colunas_remover, inplace=True)
     return df
 
@@ -42,33 +93,54 @@ def convert_json_to_df(
         .T.reset_index(drop=False)
         .rename(columns={"index": index_col})
     )
+    return normalizar_registros(df, cols_normalize, explode_col)
 
-    if cols_normalize:
-        for col in cols_normalize:
-            df[pd.json_normalize(df[col]).columns] = pd.json_normalize(df[col])
-            df = df.drop(columns=col)
 
-    if explode_col:
-        df = df.explode(column=explode_col)
-        df = pd.concat(
-            [
-                df.reset_index(drop=True),
-                pd.json_normalize(df[explode_col]).reset_index(drop=True),
-            ],
-            axis=1,
+def carregar_bronze(
+    path: str,
+    output_path: str,
+    index_col: str,
+    cols_normalize: list = None,
+    explode_col: str = None,
+) -> pd.DataFrame:
+    """
+    Lê um JSON bruto, grava a camada bronze e devolve o DataFrame gravado.
+
+    Com ``preprocess.streaming`` ativo no config, o JSON é percorrido em lotes de
+    ``preprocess.batch_size`` registros direto para o parquet, sem materializar o
+    arquivo inteiro em memória. O modo é desativado por padrão porque grava
+    listas aninhadas e colunas de tipos mistos como texto (ver ``ingestion``).
+    """
+    preprocess_cfg = carregar_config().get("preprocess", {})
+    if preprocess_cfg.get("streaming", False):
+        stream_json_to_parquet(
+            path,
+            output_path,
+            index_col,
+            cols_normalize=cols_normalize,
+            explode_col=explode_col,
+            batch_size=preprocess_cfg.get("batch_size", 5000),
         )
-        df.drop(columns=explode_col, inplace=True)
-    for col in df.columns:
-        if df[col].dtype == "object":
-            df[col] = df[col].replace("", pd.NA)
+        return pd.read_parquet(output_path)
+
+    df = convert_json_to_df(
+        path=path,
+        index_col=index_col,
+        cols_normalize=cols_normalize,
+        explode_col=explode_col,
+    )
+    df.to_parquet(output_path, index=False)
     return df
 
 
 def remove_colunas_irrelevantes(
-    df: pd.DataFrame, limite_dominancia: float = 0.9
+    df: pd.DataFrame, limite_dominancia: float = 0.9, perfil: pd.DataFrame = None
 ) -> pd.DataFrame:
     # Remove colunas que não possuem dados relevantes, onde mais de 90% dos valores são NaN
-    df.dropna(thresh=len(df) * 0.1, axis=1, inplace=True)
+    if perfil is None:
+        perfil = perfil_colunas(df)
+    nao_nulos = perfil["nao_nulos"].reindex(df.columns)
+    df.drop(columns=nao_nulos.index[nao_nulos < len(df) * 0.1], inplace=True)
     return df
 
 
@@ -79,6 +151,7 @@ def limpar_texto(texto):
         texto = texto.replace("/", " ")
         texto = re.sub(r"[^\w\s]", "", texto)
         palavras = texto.split()
+        stop_words = carregar_stop_words()
         palavras = [palavra for palavra in palavras if palavra not in stop_words]
         texto_limpo = " ".join(palavras).strip()
         texto_limpo = re.sub(r"\s+", " ", texto_limpo)
@@ -119,6 +192,62 @@ def limpar_numeros(valor):
         return np.nan
 
 
+# Formas numéricas tratadas em bloco por limpar_numeros_coluna; qualquer outro
+# texto segue para limpar_numeros
+ESPACOS_ASCII = " \t\n\r\f\v"
+RE_NUMERO_SIMPLES = r"^[+-]?[0-9]+$"
+RE_NUMERO_US = r"^[+-]?[0-9][0-9,]*\.[0-9]+$"  # 1,234.56 ou 1234.56
+RE_NUMERO_BR = r"^[+-]?[0-9][0-9.]*,[0-9]+$"  # 2.000,00 ou 10,5
+
+
+def limpar_numeros_coluna(serie: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de ``pd.to_numeric(serie.apply(limpar_numeros))``.
+
+    Os textos da coluna são classificados por regex no formato americano
+    (``1,234.56``), brasileiro (``2.000,00``) ou inteiro simples, recebem as
+    mesmas substituições de ``limpar_numeros`` em bloco e são convertidos para
+    float de uma vez com ``pyarrow.compute``. Textos em outros formatos seguem
+    para ``limpar_numeros`` um a um, e colunas com valores que não são texto
+    usam a versão original.
+
+    Args:
+        serie: Coluna com números em texto, no formato americano ou brasileiro
+
+    Returns:
+        Série float64 com o mesmo índice da entrada
+    """
+    if pd.api.types.infer_dtype(serie, skipna=True) not in ("string", "empty"):
+        return pd.to_numeric(serie.apply(limpar_numeros), errors="coerce")
+    try:
+        textos = pa.array(serie.to_numpy(), type=pa.string(), from_pandas=True)
+    except (pa.ArrowException, UnicodeEncodeError):
+        # Textos que não são UTF-8 válido (surrogates)
+        return pd.to_numeric(serie.apply(limpar_numeros), errors="coerce")
+
+    textos = pc.utf8_trim(textos, ESPACOS_ASCII)
+    us = pc.match_substring_regex(textos, RE_NUMERO_US)
+    br = pc.match_substring_regex(textos, RE_NUMERO_BR)
+    simples = pc.match_substring_regex(textos, RE_NUMERO_SIMPLES)
+    convertidos = pc.if_else(
+        us,
+        pc.replace_substring(textos, ",", ""),
+        pc.if_else(
+            br,
+            pc.replace_substring(pc.replace_substring(textos, ".", ""), ",", "."),
+            textos,
+        ),
+    )
+    validos = pc.fill_null(pc.or_(pc.or_(us, br), simples), False)
+    resultado = pc.cast(pc.if_else(validos, convertidos, None), pa.float64())
+    resultado = resultado.to_numpy(zero_copy_only=False, writable=True)
+
+    # Textos fora dos três formatos (ex.: "R$ 1.500") seguem a regra original
+    outros = pc.and_not(pc.is_valid(textos), validos).to_numpy(zero_copy_only=False)
+    resultado[outros] = [limpar_numeros(v) for v in serie.to_numpy()[outros]]
+    return pd.Series(resultado, index=serie.index, name=serie.name)
+
+
 def limpar_datas(valor):
     if pd.isna(valor):
         return None
@@ -137,6 +266,84 @@ def limpar_datas(valor):
         return None
 
 
+def _formatos_data() -> dict:
+    # Formatos que o pd.to_datetime(..., dayfirst=True) infere para cada forma
+    # de data (dígitos trocados por "9"), na ordem em que ele os escolhe: o dia
+    # primeiro quando a data é válida assim, senão o mês primeiro.
+    formatos = {}
+    for sep in "-/.":
+        datas = {
+            f"99{sep}99{sep}9999": [f"%d{sep}%m{sep}%Y", f"%m{sep}%d{sep}%Y"],
+            f"9999{sep}99{sep}99": [f"%Y{sep}%d{sep}%m", f"%Y{sep}%m{sep}%d"],
+        }
+        for forma, candidatos in datas.items():
+            for forma_hora, formato_hora in (
+                ("", ""),
+                (" 99:99", " %H:%M"),
+                (" 99:99:99", " %H:%M:%S"),
+            ):
+                formatos[forma + forma_hora] = [f + formato_hora for f in candidatos]
+    return formatos
+
+
+FORMATOS_DATA = _formatos_data()
+_DIGITOS = str.maketrans("0123456789", "9999999999")
+
+
+def limpar_datas_coluna(serie: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de ``serie.apply(limpar_datas)``, com o mesmo resultado.
+
+    Os textos são agrupados pela forma (``dd-mm-aaaa``, ``aaaa-mm-dd``, com ou
+    sem hora) e cada grupo é convertido em uma única chamada ao
+    ``pd.to_datetime`` com formato explícito. Valores em formas desconhecidas
+    seguem para ``limpar_datas`` um a um. Sentinelas e anos fora de 1930–2030
+    viram ausentes.
+    """
+    valores = serie.to_numpy(dtype=object, na_value=None)
+    datas = pd.Series(pd.NaT, index=range(len(valores)), dtype="datetime64[ns]")
+    textos = pd.Series(
+        [v.strip() if isinstance(v, str) else None for v in valores], dtype=object
+    )
+    formas = textos.map(lambda t: t.translate(_DIGITOS), na_action="ignore")
+    # O %S aceita os segundos 60 e 61, que o limpar_datas rejeita; esses textos
+    # seguem para o limpar_datas
+    segundos_invalidos = formas.str.endswith(":99:99", na=False) & (
+        textos.str[-2:] >= "60"
+    )
+    formas[segundos_invalidos] = None
+
+    for forma, indices in textos.groupby(formas, sort=False).groups.items():
+        candidatos = FORMATOS_DATA.get(forma)
+        if candidatos is None:
+            continue
+        pendentes = textos[indices]
+        for formato in candidatos:
+            convertidas = pd.to_datetime(pendentes, format=formato, errors="coerce")
+            datas[convertidas.index] = convertidas
+            pendentes = pendentes[convertidas.isna()]
+            if pendentes.empty:
+                break
+
+    conhecidas = formas.isin(FORMATOS_DATA.keys()).to_numpy()
+    outras = [i for i, v in enumerate(valores) if not conhecidas[i] and v is not None]
+    if outras:
+        avulsas = [limpar_datas(valores[i]) for i in outras]
+        if any(getattr(d, "tzinfo", None) is not None for d in avulsas):
+            # Datas com fuso não cabem na coluna datetime64 sem fuso
+            return serie.apply(limpar_datas)
+        datas[outras] = pd.to_datetime(avulsas).to_numpy()
+
+    fora_do_intervalo = (datas.dt.year < 1930) | (datas.dt.year > 2030)
+    datas[fora_do_intervalo] = pd.NaT
+    if datas.isna().all():
+        # apply devolve uma coluna object de None quando nenhuma data é válida
+        return pd.Series(
+            [None] * len(valores), index=serie.index, name=serie.name, dtype=object
+        )
+    return datas.set_axis(serie.index).rename(serie.name)
+
+
 def limpar_anos(valor):
     if pd.isna(valor):
         return np.nan
@@ -153,25 +360,176 @@ def limpar_anos(valor):
         return np.nan
 
 
+def aplicar_por_valores_unicos(
+    serie: pd.Series, limpar_coluna: Callable, min_linhas: int = 0
+) -> pd.Series:
+    """
+    Aplica uma limpeza de coluna somente sobre os valores distintos da série.
+
+    Os valores são fatorados, ``limpar_coluna`` roda sobre a série de valores
+    únicos e o resultado é espalhado de volta para as linhas pelos códigos.
+
+    Args:
+        serie: Coluna a ser limpa
+        limpar_coluna: Função que recebe e devolve uma série
+        min_linhas: Séries menores que isso são limpas diretamente
+
+    Returns:
+        Série limpa, com o mesmo índice da entrada
+    """
+    if len(serie) == 0 or len(serie) < min_linhas:
+        return limpar_coluna(serie)
+    try:
+        codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    except TypeError:
+        # Valores não hasheáveis (listas, dicts) não podem ser fatorados
+        return limpar_coluna(serie)
+
+    logger.info(
+        f"[Memo] {serie.name}: {len(unicos)} valores distintos em {len(serie)} "
+        f"linhas (taxa de acerto {1 - len(unicos) / len(serie):.1%})"
+    )
+    limpos = limpar_coluna(pd.Series(unicos, name=serie.name))
+    return limpos.take(codigos).set_axis(serie.index)
+
+
+_LIMPEZAS = {
+    "texto": lambda s: limpar_textos(s, carregar_stop_words()),
+    "data": limpar_datas_coluna,
+    "ano": lambda s: s.apply(limpar_anos),
+    "numero": limpar_numeros_coluna,
+}
+
+
+def _limpar_coluna(tipo: str, serie: pd.Series, memo_min_rows: int) -> pd.Series:
+    return aplicar_por_valores_unicos(serie, _LIMPEZAS[tipo], memo_min_rows)
+
+
+def _juntar_fatias(
+    tipo: str, fatias: List[pd.Series], serie: pd.Series, memo_min_rows: int
+) -> pd.Series:
+    """
+    Junta as fatias de linhas de uma coluna limpas em processos separados.
+
+    Uma fatia de datas sem nenhuma data válida volta como coluna object de
+    None; junto de fatias com datas ela vira NaT, como na coluna inteira. Se
+    alguma fatia caiu no caminho de datas com fuso, a coluna é limpa de novo
+    inteira para manter o resultado da execução sequencial.
+    """
+    if tipo == "data":
+        vazias = [f.dtype == object and f.isna().all() for f in fatias]
+        if not all(v or f.dtype == "datetime64[ns]" for f, v in zip(fatias, vazias)):
+            return _limpar_coluna(tipo, serie, memo_min_rows)
+        if not all(vazias):
+            fatias = [
+                pd.Series(pd.NaT, index=f.index, name=f.name, dtype="datetime64[ns]")
+                if vazia
+                else f
+                for f, vazia in zip(fatias, vazias)
+            ]
+    return pd.concat(fatias)
+
+
+def _limpar_em_paralelo(
+    df: pd.DataFrame,
+    tarefas: List[Tuple[str, str]],
+    memo_min_rows: int,
+    workers: int,
+    chunk_rows: int,
+) -> dict:
+    """
+    Limpa as colunas em um pool de processos, em fatias de ``chunk_rows`` linhas.
+
+    Args:
+        df: DataFrame com as colunas a serem limpas
+        tarefas: Pares (coluna, tipo de limpeza)
+        memo_min_rows: Repassado para ``aplicar_por_valores_unicos`` em cada fatia
+        workers: Quantidade de processos
+        chunk_rows: Linhas por fatia
+
+    Returns:
+        Dicionário coluna -> série limpa, na ordem original das linhas
+    """
+    logger.info(
+        f"[Paralelo] {len(tarefas)} colunas em fatias de {chunk_rows} linhas "
+        f"com {workers} processos"
+    )
+    # fork com os threads do pyarrow já ativos pode travar os processos filhos
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as executor:
+        futuros = {
+            col: [
+                executor.submit(
+                    _limpar_coluna,
+                    tipo,
+                    df[col].iloc[inicio : inicio + chunk_rows],
+                    memo_min_rows,
+                )
+                for inicio in range(0, len(df), chunk_rows)
+            ]
+            for col, tipo in tarefas
+        }
+        return {
+            col: _juntar_fatias(
+                tipo, [f.result() for f in futuros[col]], df[col], memo_min_rows
+            )
+            for col, tipo in tarefas
+        }
+
+
 def clean_data(
-    df, colunas_texto=None, colunas_data=None, colunas_anos=None, colunas_numeros=None
+    df,
+    colunas_texto=None,
+    colunas_data=None,
+    colunas_anos=None,
+    colunas_numeros=None,
+    memo_min_rows=None,
+    workers=None,
+    chunk_rows=None,
+    manter_colunas=None,
 ):
     df = df.copy()  # Create a copy to avoid modifying original
-    df = remove_colunas_dominantes(df)
-    df = remove_colunas_irrelevantes(df)
-
-    if colunas_texto:
-        for col in colunas_texto:
-            df[col] = df[col].apply(limpar_texto)
-    if colunas_data:
-        for col in colunas_data:
-            df[col] = df[col].apply(limpar_datas)
-    if colunas_anos:
-        for col in colunas_anos:
-            df[col] = pd.to_numeric(df[col].apply(limpar_anos), errors="coerce")
-    if colunas_numeros:
-        for col in colunas_numeros:
-            df[col] = pd.to_numeric(df[col].apply(limpar_numeros), errors="coerce")
+    config_preprocess = carregar_config().get("preprocess", {})
+    if manter_colunas is None:
+        perfil = perfil_colunas(df, amostra=config_preprocess.get("profile_sample"))
+        df = remove_colunas_dominantes(df, perfil=perfil)
+        df = remove_colunas_irrelevantes(df, perfil=perfil)
+    else:
+        # Modo incremental: as colunas são as da última carga completa, e não as
+        # que o perfil de um lote pequeno de registros novos manteria
+        df = df.reindex(columns=manter_colunas)
+
+    if memo_min_rows is None:
+        memo_min_rows = config_preprocess.get("memo_min_rows", 1000)
+    if workers is None:
+        workers = config_preprocess.get("workers", 1)
+    if chunk_rows is None:
+        chunk_rows = config_preprocess.get("chunk_rows", 50000)
+
+    tarefas = [
+        (col, tipo)
+        for tipo, colunas in (
+            ("texto", colunas_texto),
+            ("data", colunas_data),
+            ("ano", colunas_anos),
+            ("numero", colunas_numeros),
+        )
+        for col in colunas or []
+    ]
+    colunas = [col for col, _ in tarefas]
+    # Uma coluna listada em mais de um tipo é limpa em sequência, sobre o
+    # resultado da limpeza anterior
+    if workers > 1 and len(df) and len(set(colunas)) == len(colunas):
+        limpas = _limpar_em_paralelo(df, tarefas, memo_min_rows, workers, chunk_rows)
+    else:
+        limpas = None
+
+    for col, tipo in tarefas:
+        if limpas is None:
+            limpa = _limpar_coluna(tipo, df[col], memo_min_rows)
+        else:
+            limpa = limpas[col]
+        df[col] = pd.to_numeric(limpa, errors="coerce") if tipo == "ano" else limpa
 
     # precisa melhorar o preenchimento de valores ausentes
     colunas_cat = df.select_dtypes(include="object").columns
@@ -217,46 +575,25 @@ for s in situacao_candidato_inicial:
     mapping[s] = "inicial"
 
 
-def execute_preprocess():
-    paths = config["paths"]
-    # df_applicants
-    path_applicants = get_abs_path(local_path, paths["applicants_json"])
-    cols_applicants = [
+# Normalização de cada JSON bruto na camada bronze
+bronze_applicants = dict(
+    index_col="cod_applicant",
+    cols_normalize=[
         "infos_basicas",
         "informacoes_pessoais",
         "informacoes_profissionais",
         "formacao_e_idiomas",
-    ]
-    df_applicants = convert_json_to_df(
-        path=path_applicants, index_col="cod_applicant", cols_normalize=cols_applicants
-    )
-    df_applicants.to_parquet(
-        get_abs_path(local_path, paths["applicants_bronze"]), index=False
-    )
-    logger.info("df_applicants %s", df_applicants.shape)
-
-    # df_prospects
-    path_prospects = get_abs_path(local_path, paths["prospects_json"])
-    df_prospects = convert_json_to_df(
-        path=path_prospects, index_col="cod_vaga", explode_col="prospects"
-    )
-    df_prospects.to_parquet(
-        get_abs_path(local_path, paths["prospects_bronze"]), index=False
-    )
-    logger.info("df_prospects %s", df_prospects.shape)
-
-    # df_vagas
-    path_vagas = get_abs_path(local_path, paths["vagas_json"])
-    cols_vagas = ["informacoes_basicas", "perfil_vaga", "beneficios"]
-    df_vagas = convert_json_to_df(
-        path=path_vagas, index_col="cod_vaga", cols_normalize=cols_vagas
-    )
-    df_vagas.to_parquet(get_abs_path(local_path, paths["vagas_bronze"]), index=False)
-    logger.info("df_vagas %s", df_vagas.shape)
-
-    logger.info("# --- TRATANDO COLUNAS TABELA APPLICANTS ---")
-
-    colunas_texto_applicants = [
+    ],
+)
+bronze_prospects = dict(index_col="cod_vaga", explode_col="prospects")
+bronze_vagas = dict(
+    index_col="cod_vaga",
+    cols_normalize=["informacoes_basicas", "perfil_vaga", "beneficios"],
+)
+
+# Colunas tratadas por clean_data em cada tabela da camada silver
+limpeza_applicants = dict(
+    colunas_texto=[
         "cv_pt",
         "objetivo_profissional",
         "fonte_indicacao",
@@ -264,21 +601,13 @@ def execute_preprocess():
         "area_atuacao",
         "nivel_academico",
         "cursos",
-    ]
-    colunas_datas_applicants = ["data_criacao", "data_atualizacao", "data_nascimento"]
-    df_applicants = clean_data(
-        df_applicants,
-        colunas_texto_applicants,
-        colunas_datas_applicants,
-        ["ano_conclusao"],
-        ["remuneracao"],
-    )
-    df_applicants.to_parquet(
-        get_abs_path(local_path, paths["applicants_silver"]), index=False
-    )
-
-    logger.info("# --- TRATANDO COLUNAS TABELA VAGAS ---  ")
-    colunas_texto_vagas = [
+    ],
+    colunas_data=["data_criacao", "data_atualizacao", "data_nascimento"],
+    colunas_anos=["ano_conclusao"],
+    colunas_numeros=["remuneracao"],
+)
+limpeza_vagas = dict(
+    colunas_texto=[
         "titulo_vaga",
         "tipo_contratacao",
         "nivel_academico",
@@ -288,71 +617,245 @@ def execute_preprocess():
         "demais_observacoes",
         "equipamentos_necessarios",
         "habilidades_comportamentais_necessarias",
-    ]
-    colunas_datas_vagas = [
+    ],
+    colunas_data=[
         "limite_esperado_para_contratacao",
         "data_inicial",
         "data_final",
-    ]
-
-    df_vagas = clean_data(df_vagas, colunas_texto_vagas, colunas_datas_vagas)
-    df_vagas.to_parquet(get_abs_path(local_path, paths["vagas_silver"]), index=False)
+    ],
+)
+limpeza_prospects = dict(
+    colunas_texto=["titulo", "situacao_candidado", "comentario"],
+    colunas_data=["data_candidatura"],
+)
+
+# Remover colunas que não podem ser usadas como preditoras
+colunas_remover_modelagem = [
+    "analista_responsavel",
+    "cidade",
+    "cliente",
+    "cod_vaga",
+    "codigo",
+    "data_candidatura",
+    "data_final",
+    "data_inicial",
+    "data_requicisao",
+    "empresa_divisao",
+    "estado",
+    "limite_esperado_para_contratacao",
+    "local_trabalho",
+    "nome",
+    "recrutador",
+    "regiao",
+    "requisitante",
+    "situacao_candidado",
+    "solicitante_cliente",
+    "ultima_atualizacao",
+]
 
-    logger.info("# --- TRATANDO COLUNAS TABELA PROSPECTS ---")
 
-    colunas_texto_prospects = ["titulo", "situacao_candidado", "comentario"]
-    colunas_datas_prospects = ["data_candidatura"]
-    df_prospects = clean_data(
-        df_prospects, colunas_texto_prospects, colunas_datas_prospects
+def _compactar(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica ``compactar_dtypes`` se ``preprocess.compact_dtypes`` estiver ativo."""
+    preprocess_cfg = carregar_config().get("preprocess", {})
+    if not preprocess_cfg.get("compact_dtypes", False):
+        return df
+    return compactar_dtypes(df, preprocess_cfg.get("category_max_ratio", 0.5))
+
+
+def atualizar_camadas(nome: str, bronze: dict, limpeza: dict) -> pd.DataFrame:
+    """
+    Grava as camadas bronze e silver de uma tabela e devolve a silver.
+
+    Com ``preprocess.incremental`` ativo e os hashes da última execução
+    disponíveis, só os registros novos ou alterados do JSON são normalizados e
+    limpos, e as colunas da silver são as da última carga completa. Sem os
+    hashes, ou se as opções da tabela mudaram, a tabela é reconstruída inteira.
+
+    Args:
+        nome: Nome da tabela nas chaves de ``paths`` do config
+        bronze: Opções de ``carregar_bronze``
+        limpeza: Opções de ``clean_data``
+
+    Returns:
+        DataFrame da camada silver
+    """
+    paths = carregar_config()["paths"]
+    preprocess_cfg = carregar_config().get("preprocess", {})
+    path = get_abs_path(local_path, paths[f"{nome}_json"])
+    bronze_path = get_abs_path(local_path, paths[f"{nome}_bronze"])
+    silver_path = get_abs_path(local_path, paths[f"{nome}_silver"])
+    incremental = preprocess_cfg.get("incremental", False)
+    hashes_path = (
+        get_abs_path(local_path, paths[f"{nome}_hashes"])
+        if f"{nome}_hashes" in paths
+        else caminho_hashes(silver_path)
     )
-    df_prospects.to_parquet(
-        get_abs_path(local_path, paths["prospects_silver"]), index=False
+    versao = versao_opcoes(bronze=bronze, limpeza=limpeza)
+
+    anteriores = None
+    if incremental and os.path.exists(bronze_path) and os.path.exists(silver_path):
+        anteriores = ler_hashes(hashes_path, versao)
+
+    if anteriores is None:
+        df = carregar_bronze(path=path, output_path=bronze_path, **bronze)
+        logger.info(f"df_{nome} %s", df.shape)
+        logger.info(f"# --- TRATANDO COLUNAS TABELA {nome.upper()} ---")
+        df = _compactar(clean_data(df, **limpeza))
+        df.to_parquet(silver_path, index=False)
+        if incremental:
+            hashes = calcular_hashes(path, bronze.get("explode_col"))
+            salvar_hashes(hashes, hashes_path, versao)
+        return df
+
+    hashes, origem, delta = separar_delta(
+        path,
+        anteriores,
+        batch_size=preprocess_cfg.get("batch_size", 5000),
+        **bronze,
     )
-    logger.info("Data preprocessing completed.")
+    reaproveitadas = int((origem >= 0).sum())
+    logger.info(
+        f"[Incremental] {nome}: {reaproveitadas} linhas reaproveitadas, "
+        f"{len(delta)} novas ou alteradas, "
+        f"{len(anteriores) - reaproveitadas} removidas"
+    )
+    silver = pd.read_parquet(silver_path)
+    if len(delta) == 0 and np.array_equal(origem, np.arange(len(anteriores))):
+        return silver
+
+    delta = mesclar_bronze(bronze_path, delta, origem)
+    if len(delta):
+        logger.info(f"# --- TRATANDO COLUNAS TABELA {nome.upper()} (INCREMENTAL) ---")
+        delta = clean_data(delta, **limpeza, manter_colunas=list(silver.columns))
+    silver = _compactar(mesclar_silver(silver, delta, origem))
+    silver.to_parquet(silver_path, index=False)
+    salvar_hashes(hashes, hashes_path, versao)
+    return silver
+
+
+def gerar_camada_gold(
+    df_prospects: pd.DataFrame,
+    df_vagas: pd.DataFrame,
+    consolidado_path: str,
+    modelagem_path: str,
+) -> pa.Table:
+    """
+    Gera e grava o dataset consolidado e o dataset de modelagem.
+
+    Os dois arquivos saem da mesma tabela em memória: o de modelagem é a tabela
+    consolidada sem as colunas de ``colunas_remover_modelagem`` e com a
+    ``target``, montada sem copiar as colunas. As duas gravações rodam em
+    paralelo, sem reler o consolidado do disco.
+
+    Args:
+        df_prospects: Camada silver de prospects
+        df_vagas: Camada silver de vagas
+        consolidado_path: Caminho do dataset consolidado
+        modelagem_path: Caminho do dataset de modelagem
+
+    Returns:
+        Tabela Arrow do dataset de modelagem
+    """
+    with medir_etapa("gold", logger):
+        df = df_prospects.merge(
+            df_vagas, on="cod_vaga", how="left", suffixes=("", "_vaga")
+        )
+        df = _compactar(df)
+        situacao = df["situacao_candidado"].astype(object).replace(mapping)
 
-    df = df_prospects.merge(df_vagas, on="cod_vaga", how="left", suffixes=("", "_vaga"))
+        # Definindo a target
+        target = _compactar((situacao == "aprovado").astype(int).to_frame("target"))
+        target = target["target"]
 
-    output_path = get_abs_path(local_path, paths["dataset_consolidado"])
-    df.to_parquet(output_path, index=False)
-    logger.info(f"Dataset consolidado salvo em: {output_path}")
-
-    df = pd.read_parquet(get_abs_path(local_path, paths["dataset_consolidado"]))
-    df["situacao_candidado"] = df["situacao_candidado"].replace(mapping)
-
-    # Definindo a target
-    df["target"] = (df["situacao_candidado"] == "aprovado").astype(int)
-
-    # Remover colunas que não podem ser usadas como preditoras
-    colunas_remover = [
-        "analista_responsavel",
-        "cidade",
-        "cliente",
-        "cod_vaga",
-        "codigo",
-        "data_candidatura",
-        "data_final",
-        "data_inicial",
-        "data_requicisao",
-        "empresa_divisao",
-        "estado",
-        "limite_esperado_para_contratacao",
-        "local_trabalho",
-        "nome",
-        "recrutador",
-        "regiao",
-        "requisitante",
-        "situacao_candidado",
-        "solicitante_cliente",
-        "ultima_atualizacao",
-    ]
-    df_model = df.drop(columns=[col for col in colunas_remover if col in df.columns])
+        consolidado = pa.Table.from_pandas(df, preserve_index=False)
+        del df
+        modelagem = consolidado.drop_columns(
+            [
+                col
+                for col in colunas_remover_modelagem
+                if col in consolidado.column_names
+            ]
+        ).append_column("target", pa.Array.from_pandas(target))
+
+        # A escrita do parquet libera o GIL
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            gravacoes = [
+                executor.submit(pq.write_table, consolidado, consolidado_path),
+                executor.submit(pq.write_table, modelagem, modelagem_path),
+            ]
+            for gravacao in gravacoes:
+                gravacao.result()
+        logger.info(f"Dataset consolidado salvo em: {consolidado_path}")
+        logger.info(f"Dataset para modelagem salvo em {modelagem_path}")
 
-    # Salva o dataset de modelagem usando caminho absoluto
-    df_model.to_parquet(
-        get_abs_path(local_path, paths["dataset_modelagem"]), index=False
-    )
-    logger.info(f"Dataset para modelagem salvo em {paths['dataset_modelagem']}")
     logger.info("Distribuição da variável-alvo:")
-    logger.info(df["target"].value_counts())
+    logger.info(target.value_counts())
     logger.info("Distribuição das categorias de situação do candidato:")
-    logger.info(df["situacao_candidado"].value_counts())
+    logger.info(situacao.value_counts())
+    return modelagem
+
+
+_TABELAS = {
+    "applicants": (bronze_applicants, limpeza_applicants),
+    "vagas": (bronze_vagas, limpeza_vagas),
+    "prospects": (bronze_prospects, limpeza_prospects),
+}
+
+
+def _atualizar_tabela(config: dict, nome: str, devolver: bool = True) -> pd.DataFrame:
+    """
+    Executa ``atualizar_camadas`` de uma tabela em um processo do pool.
+
+    O config vem do processo principal, que pode tê-lo alterado depois de lido
+    do disco. A silver de applicants não é usada na camada gold e não volta ao
+    processo principal (``devolver=False``).
+    """
+    global _config
+    _config = config
+    bronze, limpeza = _TABELAS[nome]
+    df = atualizar_camadas(nome, bronze, limpeza)
+    return df if devolver else None
+
+
+def execute_preprocess():
+    preprocess_cfg = carregar_config().get("preprocess", {})
+    if preprocess_cfg.get("backend", "pandas") == "polars":
+        from mle_datathon.data_processing.polars_backend import (
+            execute_preprocess_polars,
+        )
+
+        return execute_preprocess_polars()
+
+    paths = carregar_config()["paths"]
+    consolidado_path = get_abs_path(local_path, paths["dataset_consolidado"])
+    modelagem_path = get_abs_path(local_path, paths["dataset_modelagem"])
+    table_workers = min(preprocess_cfg.get("table_workers", 1), len(_TABELAS))
+
+    if table_workers <= 1:
+        # applicants não entra na camada gold; a silver gravada basta
+        atualizar_camadas("applicants", *_TABELAS["applicants"])
+        df_vagas = atualizar_camadas("vagas", *_TABELAS["vagas"])
+        df_prospects = atualizar_camadas("prospects", *_TABELAS["prospects"])
+        logger.info("Data preprocessing completed.")
+        gerar_camada_gold(df_prospects, df_vagas, consolidado_path, modelagem_path)
+        return
+
+    # As três tabelas são independentes até a junção de prospects com vagas:
+    # cada uma é lida, limpa e gravada em um processo. applicants, a maior, é
+    # submetida primeiro e só é esperada depois da camada gold
+    logger.info(f"[Paralelo] {len(_TABELAS)} tabelas com {table_workers} processos")
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=table_workers, mp_context=contexto
+    ) as executor:
+        futuros = {
+            nome: executor.submit(
+                _atualizar_tabela, carregar_config(), nome, nome != "applicants"
+            )
+            for nome in _TABELAS
+        }
+        df_vagas = futuros["vagas"].result()
+        df_prospects = futuros["prospects"].result()
+        gerar_camada_gold(df_prospects, df_vagas, consolidado_path, modelagem_path)
+        futuros["applicants"].result()
+    logger.info("Data preprocessing completed.")
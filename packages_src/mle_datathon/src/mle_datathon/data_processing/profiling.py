@@ -0,0 +1,87 @@
+"""
+Perfil das colunas de um DataFrame.
+
+Calcula em uma única passada por coluna a taxa de nulos, a frequência do valor
+mais comum e a cardinalidade, usados tanto na remoção de colunas da camada
+silver quanto na validação de colunas da engenharia de features.
+"""
+
+import math
+
+import pandas as pd
+
+from mle_datathon.utils import set_log
+
+logger = set_log("profiling")
+
+
+def _perfil_coluna(serie: pd.Series) -> dict:
+    contagens = serie.value_counts(dropna=True)
+    # Colunas category listam também as categorias sem nenhuma linha
+    contagens = contagens[contagens > 0]
+    nao_nulos = int(contagens.sum())
+    return {
+        "nao_nulos": nao_nulos,
+        "taxa_nulos": (len(serie) - nao_nulos) / len(serie)
+        if len(serie)
+        else float("nan"),
+        "frequencia_top": contagens.iloc[0] / nao_nulos if nao_nulos else float("nan"),
+        "valor_top": contagens.index[0] if nao_nulos else None,
+        "cardinalidade": len(contagens),
+    }
+
+
+def perfil_colunas(
+    df: pd.DataFrame,
+    amostra: int = None,
+    confianca: float = 0.95,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Calcula o perfil de todas as colunas do DataFrame.
+
+    Com ``amostra``, o perfil é calculado sobre no máximo essa quantidade de
+    linhas sorteadas. Pela desigualdade DKW, com probabilidade ``confianca`` a
+    frequência estimada de qualquer valor (e portanto a do valor mais comum)
+    difere da real em no máximo ``margem_erro``; a cardinalidade da amostra é
+    apenas um limite inferior.
+
+    Args:
+        df: DataFrame a ser perfilado
+        amostra: Quantidade máxima de linhas usadas; ``None`` usa todas
+        confianca: Nível de confiança da margem de erro
+        seed: Semente do sorteio da amostra
+
+    Returns:
+        DataFrame indexado pelo nome da coluna com ``nao_nulos`` (na escala do
+        DataFrame inteiro), ``taxa_nulos``, ``frequencia_top``, ``valor_top``,
+        ``cardinalidade`` e ``margem_erro``
+    """
+    dados = df
+    if amostra is not None and len(df) > amostra:
+        dados = df.sample(n=amostra, random_state=seed)
+
+    perfil = pd.DataFrame(
+        [_perfil_coluna(dados[col]) for col in dados.columns],
+        index=dados.columns,
+        columns=[
+            "nao_nulos",
+            "taxa_nulos",
+            "frequencia_top",
+            "valor_top",
+            "cardinalidade",
+        ],
+    )
+    if len(dados) < len(df):
+        epsilon = math.sqrt(math.log(2 / (1 - confianca)) / 2)
+        perfil["margem_erro"] = 2 * epsilon / perfil["nao_nulos"].clip(lower=1) ** 0.5
+        perfil["nao_nulos"] = (
+            (perfil["nao_nulos"] * len(df) / len(dados)).round().astype(int)
+        )
+        logger.info(
+            f"[Perfil] {len(df.columns)} colunas perfiladas em amostra de "
+            f"{len(dados)} de {len(df)} linhas"
+        )
+    else:
+        perfil["margem_erro"] = 0.0
+    return perfil
@@ -0,0 +1,236 @@
+"""
+Armazenamento dos embeddings completos de cada campo de texto.
+
+As features do modelo guardam só quatro estatísticas dos embeddings de cada
+campo; o store guarda o vetor inteiro de cada entidade (``cod_vaga`` para os
+campos da vaga, o par ``cod_vaga``/``codigo`` para os do prospect), para que
+novos experimentos, o treino e a inferência leiam os embeddings sem carregar o
+transformer. Cada campo tem um ``.npy`` com uma linha por entidade, em ordem de
+id, aberto como memory map, e um índice id -> linha em parquet ao lado.
+
+Cada gravação de um campo vai para um diretório novo (``<campo>/<versão>/``), e
+o arquivo ``<campo>/ATUAL`` aponta para a versão em uso. Trocar esse ponteiro
+com um único ``os.replace`` publica vetores e índice juntos, de modo que um
+leitor nunca combina o ``.npy`` de uma gravação com o índice de outra.
+"""
+
+import os
+import shutil
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from mle_datathon.utils import get_abs_path, load_config, set_log
+
+logger = set_log("store_embeddings")
+
+# Entidade dona de cada campo de texto do dataset de modelagem
+ENTIDADES_CAMPOS = {
+    "principais_atividades": "cod_vaga",
+    "competencia_tecnicas_e_comportamentais": "cod_vaga",
+    "demais_observacoes": "cod_vaga",
+    "titulo_vaga": "cod_vaga",
+    "comentario": "prospect",
+    "titulo": "prospect",
+}
+
+_STORES: Dict[str, "StoreEmbeddings"] = {}
+
+_PONTEIRO = "ATUAL"
+# Versões mantidas por campo: a atual e a anterior, ainda aberta por leitores
+# que a carregaram antes da troca
+_VERSOES_MANTIDAS = 2
+
+
+def ids_entidade(df: pd.DataFrame, entidade: str) -> pd.Series:
+    """
+    Id de cada linha para a entidade: ``cod_vaga`` ou ``"<cod_vaga>:<codigo>"``.
+    """
+    cod_vaga = df["cod_vaga"].astype(str)
+    if entidade == "cod_vaga":
+        return cod_vaga
+    return cod_vaga + ":" + df["codigo"].astype(str)
+
+
+class StoreEmbeddings:
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self._matrizes: Dict[str, np.ndarray] = {}
+        self._indices: Dict[str, pd.Index] = {}
+        self._versoes: Dict[str, str] = {}
+
+    def _ponteiro(self, campo: str) -> str:
+        return os.path.join(self.diretorio, campo, _PONTEIRO)
+
+    def _caminhos(self, campo: str) -> Tuple[str, str]:
+        """Vetores e índice da versão do campo lida por esta instância."""
+        if campo not in self._versoes:
+            with open(self._ponteiro(campo), "r") as f:
+                self._versoes[campo] = f.read().strip()
+        base = os.path.join(self.diretorio, campo, self._versoes[campo])
+        return os.path.join(base, "vetores.npy"), os.path.join(base, "indice.parquet")
+
+    def campos(self) -> List[str]:
+        """Campos gravados no store."""
+        if not os.path.isdir(self.diretorio):
+            return []
+        return sorted(
+            campo
+            for campo in os.listdir(self.diretorio)
+            if os.path.exists(self._ponteiro(campo))
+        )
+
+    def gravar(
+        self,
+        campo: str,
+        ids: pd.Series,
+        codigos: np.ndarray,
+        embeddings: np.ndarray,
+        modelo: str,
+        entidade: str,
+    ) -> None:
+        """
+        Grava os embeddings de um campo, substituindo os anteriores.
+
+        Args:
+            campo: Nome do campo de texto
+            ids: Id da entidade de cada linha
+            codigos: Posição do texto de cada linha em ``embeddings``
+            embeddings: Embeddings dos textos distintos do campo
+            modelo: Identificador do modelo que gerou os embeddings
+            entidade: ``cod_vaga`` ou ``prospect``
+
+        Ids repetidos (a mesma vaga em vários prospects) ficam com o texto da
+        primeira linha.
+        """
+        unicos, primeiras = np.unique(np.asarray(ids, dtype=str), return_index=True)
+        versao = f"{time.time_ns()}-{os.getpid()}"
+        base = os.path.join(self.diretorio, campo, versao)
+        os.makedirs(base)
+
+        matriz = np.lib.format.open_memmap(
+            os.path.join(base, "vetores.npy"),
+            mode="w+",
+            dtype=np.float32,
+            shape=(len(unicos), embeddings.shape[1]),
+        )
+        matriz[:] = embeddings[codigos[primeiras]]
+        matriz.flush()
+        del matriz
+
+        tabela = pa.table(
+            {
+                "id": pa.array(unicos, pa.string()),
+                "linha": pa.array(np.arange(len(unicos)), pa.int64()),
+            }
+        ).replace_schema_metadata({"modelo": modelo, "entidade": entidade})
+        pq.write_table(tabela, os.path.join(base, "indice.parquet"))
+
+        # Publica a versão nova de uma vez
+        temporario = f"{self._ponteiro(campo)}.{os.getpid()}.tmp"
+        with open(temporario, "w") as f:
+            f.write(versao)
+        os.replace(temporario, self._ponteiro(campo))
+        self._remover_versoes_antigas(campo)
+
+        self._matrizes.pop(campo, None)
+        self._indices.pop(campo, None)
+        self._versoes[campo] = versao
+        logger.info(f"[Store] {campo}: {len(unicos)} {entidade} gravados")
+
+    def _remover_versoes_antigas(self, campo: str) -> None:
+        diretorio = os.path.join(self.diretorio, campo)
+        versoes = sorted(
+            (nome for nome in os.listdir(diretorio) if nome != _PONTEIRO),
+            key=lambda nome: int(nome.split("-")[0]) if nome[0].isdigit() else -1,
+        )
+        for nome in versoes[:-_VERSOES_MANTIDAS]:
+            caminho = os.path.join(diretorio, nome)
+            if os.path.isdir(caminho):
+                shutil.rmtree(caminho, ignore_errors=True)
+
+    def gravar_campos(
+        self,
+        embeddings_campos: Dict[str, Tuple[np.ndarray, np.ndarray]],
+        df_ids: pd.DataFrame,
+        modelo: str,
+    ) -> None:
+        """
+        Grava os campos de ``ENTIDADES_CAMPOS`` registrados pelo
+        ``TextFeatureGenerator``.
+
+        Args:
+            embeddings_campos: Campo -> (códigos, embeddings dos textos distintos)
+            df_ids: ``cod_vaga`` e ``codigo`` de cada linha, na ordem do dataset
+            modelo: Identificador do modelo que gerou os embeddings
+        """
+        for campo, (codigos, embeddings) in embeddings_campos.items():
+            entidade = ENTIDADES_CAMPOS.get(campo)
+            if entidade is None:
+                continue
+            if len(codigos) != len(df_ids):
+                raise ValueError(
+                    f"{campo}: {len(codigos)} linhas de embeddings para "
+                    f"{len(df_ids)} ids"
+                )
+            ids = ids_entidade(df_ids, entidade)
+            self.gravar(campo, ids, codigos, embeddings, modelo, entidade)
+
+    def matriz(self, campo: str) -> np.ndarray:
+        """
+        Todos os embeddings do campo como memory map somente leitura.
+
+        Fatias contíguas (``matriz[inicio:fim]``) são lidas do disco sob demanda,
+        sem cópia. A instância continua lendo a versão do campo que abriu
+        primeiro, mesmo que outro processo publique uma nova.
+        """
+        if campo not in self._matrizes:
+            vetores_path, _ = self._caminhos(campo)
+            self._matrizes[campo] = np.load(vetores_path, mmap_mode="r")
+        return self._matrizes[campo]
+
+    def indice(self, campo: str) -> pd.Index:
+        """Ids do campo, na ordem das linhas de ``matriz``."""
+        if campo not in self._indices:
+            _, indice_path = self._caminhos(campo)
+            ids = pq.read_table(indice_path, columns=["id"]).column("id")
+            self._indices[campo] = pd.Index(ids.to_pylist(), dtype=object)
+        return self._indices[campo]
+
+    def metadados(self, campo: str) -> Dict[str, str]:
+        """Modelo e entidade com que o campo foi gravado."""
+        _, indice_path = self._caminhos(campo)
+        meta = pq.read_schema(indice_path).metadata or {}
+        return {chave.decode(): valor.decode() for chave, valor in meta.items()}
+
+    def linhas(self, campo: str, ids) -> np.ndarray:
+        """Linha de cada id em ``matriz``, ou -1 para ids fora do store."""
+        return self.indice(campo).get_indexer(pd.Index(ids).astype(str))
+
+    def obter(self, campo: str, ids) -> np.ndarray:
+        """
+        Embeddings das entidades, na ordem de ``ids``.
+
+        Raises:
+            KeyError: Se algum id não está no store
+        """
+        linhas = self.linhas(campo, ids)
+        if (linhas < 0).any():
+            ausentes = pd.Index(ids)[linhas < 0].tolist()
+            raise KeyError(f"{campo}: ids ausentes do store: {ausentes[:5]}")
+        return self.matriz(campo)[linhas]
+
+
+def carregar_store_embeddings(config: dict = None) -> StoreEmbeddings:
+    """Abre o store de ``paths.embeddings_store``, uma vez por processo."""
+    local_path = os.getcwd()
+    if config is None:
+        config = load_config(local_path)
+    diretorio = get_abs_path(local_path, config["paths"]["embeddings_store"])
+    if diretorio not in _STORES:
+        _STORES[diretorio] = StoreEmbeddings(diretorio)
+    return _STORES[diretorio]
@@ -0,0 +1,107 @@
+"""
+Limpeza vetorizada de colunas de texto.
+
+Produz exatamente o mesmo resultado de ``limpar_texto`` aplicado célula a célula,
+mas processa a coluna em lotes: as células de um lote são concatenadas com um
+separador e cada etapa (remoção de acentos, minúsculas, pontuação, divisão em
+palavras e stopwords) roda uma única vez sobre o texto do lote inteiro.
+"""
+
+import re
+from itertools import filterfalse
+from typing import FrozenSet, Iterable
+
+import pandas as pd
+from unidecode import unidecode
+
+# Não é letra nem espaço, então sobrevive a todas as etapas como uma palavra
+# própria entre as células. Na limpeza original ele seria removido junto com a
+# pontuação, por isso pode ser retirado dos textos antes de concatenar.
+_SEPARADOR = "\x00"
+
+# Após o unidecode o texto é ASCII, então minúsculas, troca de "/" por espaço e
+# remoção do que não é letra, dígito ou espaço (``[^\w\s]``) cabem em um único
+# bytes.translate.
+_ASCII = bytes(range(128))
+_TABELA_ASCII = bytes.maketrans(
+    _ASCII, _ASCII.decode("ascii").lower().replace("/", " ").encode("ascii")
+)
+_PONTUACAO_ASCII = bytes(
+    c
+    for c in range(128)
+    if chr(c) not in ("/", _SEPARADOR) and not re.match(r"[\w\s]", chr(c))
+)
+
+# unidecode troca cada caractere de forma independente, então basta substituir
+# cada caractere não ASCII distinto do lote pela sua transliteração.
+_TRANSLITERACOES = {}
+_MAX_SUBSTITUICOES = 64
+
+
+def remover_acentos(texto: str) -> str:
+    """Equivalente a ``unidecode(texto)`` para textos longos."""
+    if texto.isascii():
+        return texto
+    # Descartar os bytes ASCII do UTF-8 deixa apenas os caracteres não ASCII
+    nao_ascii = texto.encode("utf-8", "surrogatepass").translate(None, _ASCII)
+    caracteres = set(nao_ascii.decode("utf-8", "surrogatepass"))
+    for c in caracteres - _TRANSLITERACOES.keys():
+        _TRANSLITERACOES[c] = unidecode(c)
+    if len(caracteres) > _MAX_SUBSTITUICOES:
+        return texto.translate({ord(c): _TRANSLITERACOES[c] for c in caracteres})
+    for c in caracteres:
+        texto = texto.replace(c, _TRANSLITERACOES[c])
+    return texto
+
+
+def _limpar_lote(textos: list, stop_words: FrozenSet[str]) -> list:
+    texto = f" {_SEPARADOR} ".join(textos)
+    # Contar os separadores no texto do lote evita um replace por célula no caso
+    # comum em que nenhuma célula contém o separador
+    if texto.count(_SEPARADOR) != len(textos) - 1:
+        texto = f" {_SEPARADOR} ".join(t.replace(_SEPARADOR, "") for t in textos)
+    texto = remover_acentos(texto)
+    texto = (
+        texto.encode("ascii").translate(_TABELA_ASCII, _PONTUACAO_ASCII).decode("ascii")
+    )
+    texto = " ".join(filterfalse(stop_words.__contains__, texto.split()))
+    return [parte.strip() for parte in texto.split(_SEPARADOR)]
+
+
+def limpar_textos(
+    serie: pd.Series, stop_words: Iterable[str], caracteres_lote: int = 50_000
+) -> pd.Series:
+    """
+    Limpa uma coluna de texto inteira, com o mesmo resultado de ``limpar_texto``.
+
+    Args:
+        serie: Coluna a ser limpa; valores que não são ``str`` viram ``None``
+        stop_words: Palavras removidas do texto
+        caracteres_lote: Quantidade aproximada de caracteres concatenados por
+            vez. O lote é medido em caracteres, e não em células, para que o
+            texto de cada lote caiba no cache do processador tanto em colunas
+            longas (``cv_pt``) quanto curtas (``titulo``)
+
+    Returns:
+        Série com os textos limpos, com o mesmo índice da entrada
+    """
+    stop_words = frozenset(stop_words)
+    valores = serie.to_numpy(dtype=object, na_value=None)
+    resultado = [None] * len(valores)
+
+    lote, textos, caracteres = [], [], 0
+    for i, valor in enumerate(valores):
+        if not isinstance(valor, str):
+            continue
+        lote.append(i)
+        textos.append(valor)
+        caracteres += len(valor)
+        if caracteres >= caracteres_lote:
+            for j, limpo in zip(lote, _limpar_lote(textos, stop_words)):
+                resultado[j] = limpo
+            lote, textos, caracteres = [], [], 0
+    if lote:
+        for j, limpo in zip(lote, _limpar_lote(textos, stop_words)):
+            resultado[j] = limpo
+
+    return pd.Series(resultado, index=serie.index, name=serie.name, dtype=object)
@@ -1,3 +1,19 @@
-from mle_datathon.model.train_model import train
-from mle_datathon.model.tune_model import tune
-from mle_datathon.model.registry import ModelRegistry
+import importlib
+
+# Os módulos (e dependências como xgboost e mlflow) só são importados no
+# primeiro acesso a cada nome
+_EXPORTS = {
+    "train": "mle_datathon.model.train_model",
+    "tune": "mle_datathon.model.tune_model",
+    "ModelRegistry": "mle_datathon.model.registry",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    valor = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = valor
+    return valor
@@ -1,2 +1,2 @@
-from mle_datathon.utils.utils import get_abs_path, load_config
+from mle_datathon.utils.utils import get_abs_path, load_config, medir_etapa
 from mle_datathon.utils.logger import set_log
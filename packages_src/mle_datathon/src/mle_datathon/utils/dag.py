@@ -0,0 +1,229 @@
+"""
+Execução das etapas do pipeline como um DAG com cache por conteúdo.
+
+Cada etapa declara suas entradas e saídas (chaves de ``paths`` no config, para
+arquivos ou diretórios), as seções do config que lê e os módulos com o seu
+código. A assinatura da etapa é o hash desse conteúdo; se ela é igual à da última
+execução e as saídas continuam como foram gravadas, a etapa é pulada. Como as entradas são comparadas pelo
+conteúdo, uma etapa que regrava arquivos idênticos não invalida as seguintes.
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Union
+
+from mle_datathon.utils.logger import set_log
+from mle_datathon.utils.utils import get_abs_path, medir_etapa
+
+logger = set_log("dag")
+
+_JANELA_MTIME_NS = 2_000_000_000
+
+
+@dataclass
+class Etapa:
+    """
+    Etapa do pipeline.
+
+    Attributes:
+        nome: Nome da etapa, usado em ``--steps``
+        funcao: Função sem argumentos ou ``"modulo:funcao"``, importada só
+            quando a etapa é executada
+        entradas: Chaves de ``paths`` lidas pela etapa
+        saidas: Chaves de ``paths`` gravadas pela etapa
+        saidas_opcionais: Chaves de ``paths`` gravadas só em alguns modos da
+            etapa; uma saída opcional ausente não invalida o cache, mas uma
+            que foi apagada ou alterada desde a última execução invalida
+        secoes_config: Seções do config que alteram o resultado da etapa
+        modulos: Módulos cujo código alterado invalida o cache da etapa
+    """
+
+    nome: str
+    funcao: Union[Callable[[], None], str]
+    entradas: List[str] = field(default_factory=list)
+    saidas: List[str] = field(default_factory=list)
+    saidas_opcionais: List[str] = field(default_factory=list)
+    secoes_config: List[str] = field(default_factory=list)
+    modulos: List[str] = field(default_factory=list)
+
+    def executar(self) -> None:
+        funcao = self.funcao
+        if isinstance(funcao, str):
+            modulo, nome = funcao.split(":")
+            funcao = getattr(importlib.import_module(modulo), nome)
+        funcao()
+
+
+class ExecutorDAG:
+    def __init__(
+        self, etapas: List[Etapa], config: dict, local_path: str, cache_path: str
+    ):
+        self.etapas = {etapa.nome: etapa for etapa in etapas}
+        self.config = config
+        self.local_path = local_path
+        self.cache_path = cache_path
+        self._cache = self._ler_cache()
+
+    def _ler_cache(self) -> dict:
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path, "r") as f:
+                return json.load(f)
+        return {"arquivos": {}, "etapas": {}}
+
+    def _gravar_cache(self) -> None:
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        temporario = f"{self.cache_path}.tmp"
+        with open(temporario, "w") as f:
+            json.dump(self._cache, f, indent=2, sort_keys=True)
+        os.replace(temporario, self.cache_path)
+
+    def _caminho(self, chave: str) -> str:
+        return get_abs_path(self.local_path, self.config["paths"][chave])
+
+    def hash_arquivo(self, caminho: str) -> str:
+        """
+        Hash do conteúdo de um arquivo, ou None se ele não existe.
+
+        Para um diretório, o hash cobre o caminho relativo e o conteúdo de cada
+        arquivo dentro dele.
+
+        O hash fica no cache junto do tamanho e do mtime do arquivo e só é
+        recalculado quando um dos dois muda, para não reler os JSONs brutos a
+        cada execução. Arquivos alterados há menos de ``_JANELA_MTIME_NS`` não
+        entram no cache: uma nova gravação do mesmo tamanho dentro da resolução
+        do relógio do sistema de arquivos manteria o mesmo mtime.
+        """
+        if not os.path.exists(caminho):
+            return None
+        if os.path.isdir(caminho):
+            return self._hash_diretorio(caminho)
+        info = os.stat(caminho)
+        registro = self._cache["arquivos"].get(caminho)
+        if (
+            registro
+            and registro["tamanho"] == info.st_size
+            and registro["mtime_ns"] == info.st_mtime_ns
+        ):
+            return registro["hash"]
+        conteudo = hashlib.sha256()
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                conteudo.update(bloco)
+        if time.time_ns() - info.st_mtime_ns > _JANELA_MTIME_NS:
+            self._cache["arquivos"][caminho] = {
+                "tamanho": info.st_size,
+                "mtime_ns": info.st_mtime_ns,
+                "hash": conteudo.hexdigest(),
+            }
+        else:
+            self._cache["arquivos"].pop(caminho, None)
+        return conteudo.hexdigest()
+
+    def _hash_diretorio(self, diretorio: str) -> str:
+        conteudo = hashlib.sha256()
+        arquivos = sorted(
+            os.path.join(raiz, nome)
+            for raiz, _, nomes in os.walk(diretorio)
+            for nome in nomes
+        )
+        for arquivo in arquivos:
+            relativo = os.path.relpath(arquivo, diretorio)
+            conteudo.update(f"{relativo}\0{self.hash_arquivo(arquivo)}\0".encode())
+        return conteudo.hexdigest()
+
+    def assinatura(self, etapa: Etapa) -> str:
+        """Hash das entradas, das seções do config e do código da etapa."""
+        partes = {
+            "entradas": {
+                chave: self.hash_arquivo(self._caminho(chave))
+                for chave in etapa.entradas
+            },
+            "config": {secao: self.config.get(secao) for secao in etapa.secoes_config},
+            "codigo": {
+                modulo: self.hash_arquivo(importlib.util.find_spec(modulo).origin)
+                for modulo in etapa.modulos
+            },
+            "saidas": [
+                self.config["paths"][chave]
+                for chave in etapa.saidas + etapa.saidas_opcionais
+            ],
+        }
+        texto = json.dumps(partes, sort_keys=True, default=str)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _saidas(self, etapa: Etapa) -> Dict[str, str]:
+        return {
+            chave: self.hash_arquivo(self._caminho(chave))
+            for chave in etapa.saidas + etapa.saidas_opcionais
+        }
+
+    def atualizada(self, etapa: Etapa, assinatura: str) -> bool:
+        """Indica se a última execução da etapa ainda vale para as entradas atuais."""
+        registro = self._cache["etapas"].get(etapa.nome)
+        if registro is None or registro["assinatura"] != assinatura:
+            return False
+        saidas = self._saidas(etapa)
+        obrigatorias = [saidas[chave] for chave in etapa.saidas]
+        return None not in obrigatorias and saidas == registro["saidas"]
+
+    def ordenar(self, nomes: List[str]) -> List[Etapa]:
+        """
+        Ordena as etapas pedidas de modo que cada uma venha depois das etapas
+        que gravam as suas entradas, mantendo a ordem de declaração nos empates.
+        """
+        pendentes = [etapa for nome, etapa in self.etapas.items() if nome in nomes]
+        ordem = []
+        while pendentes:
+            for etapa in pendentes:
+                produtoras = [
+                    outra
+                    for outra in pendentes
+                    if outra is not etapa
+                    and set(outra.saidas + outra.saidas_opcionais) & set(etapa.entradas)
+                ]
+                if not produtoras:
+                    break
+            else:
+                raise ValueError(f"Ciclo entre as etapas {[e.nome for e in pendentes]}")
+            pendentes.remove(etapa)
+            ordem.append(etapa)
+        return ordem
+
+    def executar(self, nomes: List[str], forcar: bool = False) -> Dict[str, str]:
+        """
+        Executa as etapas pedidas na ordem do DAG, pulando as atualizadas.
+
+        Args:
+            nomes: Nomes das etapas a executar
+            forcar: Executa as etapas mesmo com o cache atualizado
+
+        Returns:
+            Dicionário etapa -> ``"executada"`` ou ``"pulada"``
+        """
+        desconhecidas = set(nomes) - set(self.etapas)
+        if desconhecidas:
+            raise ValueError(f"Etapas desconhecidas: {sorted(desconhecidas)}")
+
+        resultado = {}
+        for etapa in self.ordenar(nomes):
+            assinatura = self.assinatura(etapa)
+            if not forcar and self.atualizada(etapa, assinatura):
+                logger.info(f"[DAG] {etapa.nome}: entradas sem alteração, pulando")
+                resultado[etapa.nome] = "pulada"
+                continue
+
+            logger.info(f"[DAG] {etapa.nome}: executando")
+            with medir_etapa(etapa.nome, logger):
+                etapa.executar()
+            self._cache["etapas"][etapa.nome] = {
+                "assinatura": assinatura,
+                "saidas": self._saidas(etapa),
+            }
+            self._gravar_cache()
+            resultado[etapa.nome] = "executada"
+        return resultado
@@ -1,5 +1,14 @@
+import sys
+import time
+from contextlib import contextmanager
+
 import yaml
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 
 def get_abs_path(local_path: str, rel_path: str) -> str:
     """Retorna o caminho absoluto a partir da raiz do projeto."""
@@ -10,3 +19,46 @@ def load_config(config_path):
     config_path = f"{config_path}/config.yaml"
     with open(config_path, "r") as f:
         return yaml.safe_load(f)
+
+
+def pico_rss_mb() -> float:
+    """Maior RSS atingido pelo processo até agora, em MB (0 se indisponível)."""
+    if resource is None:
+        return 0.0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KB no Linux
+    return pico / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+@contextmanager
+def medir_etapa(nome: str, logger=None):
+    """
+    Mede o tempo de parede e o pico de memória de uma etapa do pipeline.
+
+    O pico é o ``ru_maxrss`` do processo, que nunca diminui: ``acrescimo_pico_mb``
+    é quanto a etapa elevou o maior RSS já atingido, e fica zero quando ela
+    coube abaixo do pico das etapas anteriores.
+
+    Args:
+        nome: Nome da etapa nos logs
+        logger: Logger que recebe o resumo ao final da etapa
+
+    Returns:
+        Dicionário preenchido ao final com ``segundos``, ``pico_rss_mb`` e
+        ``acrescimo_pico_mb``
+    """
+    medidas = {"etapa": nome}
+    pico_inicial = pico_rss_mb()
+    inicio = time.perf_counter()
+    try:
+        yield medidas
+    finally:
+        medidas["segundos"] = time.perf_counter() - inicio
+        medidas["pico_rss_mb"] = pico_rss_mb()
+        medidas["acrescimo_pico_mb"] = medidas["pico_rss_mb"] - pico_inicial
+        if logger is not None:
+            logger.info(
+                f"[Etapa] {nome}: {medidas['segundos']:.2f}s, pico de RSS "
+                f"{medidas['pico_rss_mb']:.0f} MB "
+                f"(+{medidas['acrescimo_pico_mb']:.0f} MB)"
+            )
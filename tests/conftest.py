@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+
+class ModeloFalso:
+    """Deterministic stand-in for SentenceTransformer that records encoded texts"""
+
+    def __init__(self):
+        self.codificados = []
+
+    def encode(self, textos, **kwargs):
+        self.codificados.extend(textos)
+        vetores = np.array(
+            [[len(t), t.count("a"), sum(map(ord, t)) % 97] for t in textos],
+            dtype=np.float32,
+        ).reshape(len(textos), 3)
+        normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+        return vetores / np.where(normas == 0, 1, normas)
+
+
+@pytest.fixture
+def modelo_falso():
+    return ModeloFalso()
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from mle_datathon.data_processing.cache_embeddings import CacheEmbeddings
+from mle_datathon.data_processing.feature_engineering import TextFeatureGenerator
+
+
+def test_cache_encodes_each_text_once_and_persists(tmp_path, modelo_falso):
+    modelo = modelo_falso
+    cache = CacheEmbeddings(str(tmp_path), "falso", max_itens=10)
+
+    primeira = cache.codificar(["dados", "java  sap", "dados"], modelo.encode)
+    # The normalized text is only the key: the model gets the original text
+    assert modelo.codificados == ["dados", "java  sap"]
+    np.testing.assert_array_equal(
+        primeira, modelo.encode(["dados", "java  sap", "dados"])
+    )
+
+    # Nothing reaches the disk until salvar; then a new instance reads it back
+    assert len(CacheEmbeddings(str(tmp_path), "falso", max_itens=10)) == 0
+    cache.salvar()
+    modelo.codificados.clear()
+    reaberto = CacheEmbeddings(str(tmp_path), "falso", max_itens=10)
+    segunda = reaberto.codificar(["java sap", "python", "dados "], modelo.encode)
+    assert modelo.codificados == ["python"]
+    np.testing.assert_array_equal(segunda[0], primeira[1])
+    np.testing.assert_array_equal(segunda[2], primeira[0])
+
+    # Another model does not reuse the vectors
+    assert len(CacheEmbeddings(str(tmp_path), "outro", max_itens=10)) == 0
+
+
+def test_cache_evicts_least_recently_used(tmp_path, modelo_falso):
+    modelo = modelo_falso
+    cache = CacheEmbeddings(str(tmp_path), "falso", max_itens=3)
+    for textos in (["a", "b", "c"], ["a"], ["d"]):
+        cache.codificar(textos, modelo.encode)
+        cache.salvar()
+
+    # "b" was the least recently used entry
+    modelo.codificados.clear()
+    resultado = cache.codificar(["a", "c", "d"], modelo.encode)
+    assert len(cache) == 3
+    assert modelo.codificados == []
+    np.testing.assert_array_equal(resultado, modelo.encode(["a", "c", "d"]))
+    cache.codificar(["b"], modelo.encode)
+    assert modelo.codificados == ["a", "c", "d", "b"]
+
+
+def test_text_feature_generator_with_cache_matches_without(tmp_path, modelo_falso):
+    df = pd.DataFrame({"texto": ["Python e SQL", None, "Gestão SAP", "Python e SQL"]})
+    modelo = modelo_falso
+    esperado = TextFeatureGenerator(modelo).transform(df.copy(), ["texto"])
+
+    modelo.codificados.clear()
+    cache = CacheEmbeddings(str(tmp_path), "falso")
+    gerador = TextFeatureGenerator(modelo, cache=cache)
+    pd.testing.assert_frame_equal(gerador.transform(df.copy(), ["texto"]), esperado)
+    pd.testing.assert_frame_equal(gerador.transform(df.copy(), ["texto"]), esperado)
+    assert sorted(modelo.codificados) == ["", "Gestão SAP", "Python e SQL"]
+
+
+def test_cache_instances_share_the_directory(tmp_path, modelo_falso):
+    """Two processes saving to the same directory keep each other's vectors"""
+    modelo = modelo_falso
+    pipeline = CacheEmbeddings(str(tmp_path), "falso", max_itens=10)
+    front = CacheEmbeddings(str(tmp_path), "falso", max_itens=10)
+
+    pipeline.codificar(["a", "b"], modelo.encode)
+    front.codificar(["b", "c"], modelo.encode)
+    pipeline.salvar()
+    front.salvar()
+
+    # Each instance reloads the index written by the other one
+    esperado = modelo.encode(["a", "b", "c"])
+    modelo.codificados.clear()
+    for cache in (pipeline, front):
+        resultado = cache.codificar(["a", "b", "c"], modelo.encode)
+        np.testing.assert_array_equal(resultado, esperado)
+    assert modelo.codificados == []
+    assert len(pipeline) == 3
+
+
+def test_cache_dimension_change_resets_rows(tmp_path, modelo_falso):
+    cache = CacheEmbeddings(str(tmp_path), "falso", max_itens=4)
+    cache.codificar(["a", "b"], modelo_falso.encode)
+    cache.salvar()
+
+    outro = CacheEmbeddings(str(tmp_path), "falso", max_itens=4)
+    outro.codificar(["c"], lambda textos: np.ones((len(textos), 5)))
+    outro.salvar()
+
+    reaberto = CacheEmbeddings(str(tmp_path), "falso", max_itens=4)
+    assert len(reaberto) == 1
+    np.testing.assert_array_equal(
+        reaberto.codificar(["c"], modelo_falso.encode), np.ones((1, 5))
+    )
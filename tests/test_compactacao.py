@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+from mle_datathon.data_processing import preprocess_data
+from mle_datathon.data_processing.compactacao import compactar_dtypes
+from mle_datathon.data_processing.polars_backend import _gravar, compactar_dtypes_pl
+
+
+def sample_df():
+    return pd.DataFrame(
+        {
+            "nivel_academico": ["superior", "mestrado", "superior", "superior"],
+            "cv_pt": ["texto a", "texto b", "texto c", None],
+            "cod_vaga": [1, 2, 3, 40000],
+            "ano_conclusao": [2015.0, np.nan, 1999.0, 2020.0],
+            "remuneracao": [1234.56, 2000.0, np.nan, 3500.0],
+            "data": pd.to_datetime(["2021-01-01", None, "2021-03-10", None]),
+        }
+    )
+
+
+def test_compactar_dtypes_keeps_values():
+    df = sample_df()
+
+    resultado = compactar_dtypes(df)
+
+    assert resultado["nivel_academico"].dtype == "category"
+    assert resultado["cv_pt"].dtype == pd.ArrowDtype(pa.large_string())
+    assert resultado["cod_vaga"].dtype == np.int32
+    assert resultado["ano_conclusao"].dtype == np.float32
+    # 1234.56 is not exact in float32, so the column stays float64
+    assert resultado["remuneracao"].dtype == np.float64
+    assert resultado["data"].dtype == "datetime64[ns]"
+    pd.testing.assert_frame_equal(
+        resultado.astype(object).where(resultado.notna(), None),
+        df.astype(object).where(df.notna(), None),
+    )
+
+
+def test_compactar_dtypes_reevaluates_categories():
+    """Columns that were compacted before get the decision of the new table"""
+    df = compactar_dtypes(pd.DataFrame({"titulo": ["a", "b", "c", "d"]}))
+    repetido = pd.concat([df] * 3, ignore_index=True)
+
+    assert df["titulo"].dtype == pd.ArrowDtype(pa.large_string())
+    assert compactar_dtypes(repetido)["titulo"].dtype == "category"
+
+
+def test_compactar_dtypes_round_trips_parquet(tmp_path):
+    resultado = compactar_dtypes(sample_df())
+    resultado.to_parquet(tmp_path / "silver.parquet", index=False)
+
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(tmp_path / "silver.parquet"), resultado
+    )
+
+
+def test_compactar_dtypes_pl_matches_pandas():
+    df = sample_df()
+
+    resultado = compactar_dtypes_pl(pl.from_pandas(df))
+
+    esperado = compactar_dtypes(df)
+    assert resultado.schema["nivel_academico"] == pl.Categorical
+    assert resultado.schema["cv_pt"] == pl.String
+    assert resultado.schema["cod_vaga"] == pl.Int32
+    assert resultado.schema["ano_conclusao"] == pl.Float32
+    assert resultado.schema["remuneracao"] == pl.Float64
+    assert resultado["ano_conclusao"].to_list()[0] == esperado["ano_conclusao"].iloc[0]
+
+
+def test_gravar_pl_reads_back_with_pandas_dtypes(tmp_path, monkeypatch):
+    """Free text written by the polars backend reads back as large_string too"""
+    monkeypatch.setitem(preprocess_data.config["preprocess"], "compact_dtypes", True)
+    df = sample_df()
+
+    _gravar(pl.from_pandas(df), str(tmp_path / "polars.parquet"))
+    compactar_dtypes(df).to_parquet(tmp_path / "pandas.parquet", index=False)
+
+    resultado = pd.read_parquet(tmp_path / "polars.parquet")
+    esperado = pd.read_parquet(tmp_path / "pandas.parquet")
+    assert resultado["cv_pt"].dtype == pd.ArrowDtype(pa.large_string())
+    assert (
+        resultado.dtypes.astype(str).to_dict() == esperado.dtypes.astype(str).to_dict()
+    )
@@ -0,0 +1,122 @@
+import pytest
+from mle_datathon.utils.dag import Etapa, ExecutorDAG
+
+
+def criar_executor(tmp_path, execucoes, config=None):
+    """Two chained steps: 'dobrar' reads entrada and writes meio, 'copiar' reads meio"""
+
+    def dobrar():
+        execucoes.append("dobrar")
+        texto = (tmp_path / "entrada.txt").read_text()
+        (tmp_path / "meio.txt").write_text(texto[: len(texto) // 2] * 2)
+
+    def copiar():
+        execucoes.append("copiar")
+        (tmp_path / "saida.txt").write_text((tmp_path / "meio.txt").read_text())
+
+    etapas = [
+        Etapa("copiar", copiar, entradas=["meio"], saidas=["saida"]),
+        Etapa(
+            "dobrar",
+            dobrar,
+            entradas=["entrada"],
+            saidas=["meio"],
+            secoes_config=["dobrar"],
+            modulos=["mle_datathon.utils.dag"],
+        ),
+    ]
+    config = config or {
+        "paths": {"entrada": "entrada.txt", "meio": "meio.txt", "saida": "saida.txt"},
+        "dobrar": {"fator": 2},
+    }
+    return ExecutorDAG(etapas, config, str(tmp_path), str(tmp_path / "cache.json"))
+
+
+def test_steps_run_in_dependency_order_and_skip_when_fresh(tmp_path):
+    (tmp_path / "entrada.txt").write_text("abab")
+    execucoes = []
+
+    resultado = criar_executor(tmp_path, execucoes).executar(["copiar", "dobrar"])
+    assert execucoes == ["dobrar", "copiar"]
+    assert resultado == {"dobrar": "executada", "copiar": "executada"}
+
+    # A new executor reads the signatures back from the cache file
+    execucoes.clear()
+    resultado = criar_executor(tmp_path, execucoes).executar(["dobrar", "copiar"])
+    assert execucoes == []
+    assert resultado == {"dobrar": "pulada", "copiar": "pulada"}
+
+    criar_executor(tmp_path, execucoes).executar(["dobrar", "copiar"], forcar=True)
+    assert execucoes == ["dobrar", "copiar"]
+
+
+def test_unchanged_output_does_not_invalidate_downstream(tmp_path):
+    (tmp_path / "entrada.txt").write_text("abab")
+    execucoes = []
+    criar_executor(tmp_path, execucoes).executar(["dobrar", "copiar"])
+
+    # Different input, same intermediate file: only the first step reruns
+    execucoes.clear()
+    (tmp_path / "entrada.txt").write_text("abcd")
+    criar_executor(tmp_path, execucoes).executar(["dobrar", "copiar"])
+    assert execucoes == ["dobrar"]
+
+    execucoes.clear()
+    (tmp_path / "entrada.txt").write_text("xyxy")
+    criar_executor(tmp_path, execucoes).executar(["dobrar", "copiar"])
+    assert execucoes == ["dobrar", "copiar"]
+
+
+def test_config_change_or_missing_output_reruns_step(tmp_path):
+    (tmp_path / "entrada.txt").write_text("abab")
+    execucoes = []
+    criar_executor(tmp_path, execucoes).executar(["dobrar", "copiar"])
+
+    execucoes.clear()
+    config = {
+        "paths": {"entrada": "entrada.txt", "meio": "meio.txt", "saida": "saida.txt"},
+        "dobrar": {"fator": 3},
+    }
+    criar_executor(tmp_path, execucoes, config).executar(["dobrar"])
+    assert execucoes == ["dobrar"]
+
+    execucoes.clear()
+    (tmp_path / "saida.txt").unlink()
+    criar_executor(tmp_path, execucoes, config).executar(["dobrar", "copiar"])
+    assert execucoes == ["copiar"]
+
+
+def test_unknown_step_raises(tmp_path):
+    with pytest.raises(ValueError, match="desconhecidas"):
+        criar_executor(tmp_path, []).executar(["treinar"])
+
+
+def test_directory_and_optional_outputs(tmp_path):
+    """Directory outputs are hashed by content; optional ones may be missing"""
+    execucoes = []
+
+    def gravar():
+        execucoes.append("gravar")
+        (tmp_path / "modelos").mkdir(exist_ok=True)
+        (tmp_path / "modelos" / "a.bin").write_text("a")
+
+    config = {"paths": {"modelos": "modelos", "hashes": "hashes.parquet"}}
+    etapas = [Etapa("gravar", gravar, saidas=["modelos"], saidas_opcionais=["hashes"])]
+
+    def executar():
+        executor = ExecutorDAG(etapas, config, str(tmp_path), str(tmp_path / "c.json"))
+        return executor.executar(["gravar"])
+
+    assert executar() == {"gravar": "executada"}
+    assert executar() == {"gravar": "pulada"}
+
+    # A file changed inside the directory invalidates the step
+    (tmp_path / "modelos" / "a.bin").write_text("b")
+    assert executar() == {"gravar": "executada"}
+
+    # An optional output written after the run, then removed, also does
+    (tmp_path / "hashes.parquet").write_text("h")
+    assert executar() == {"gravar": "executada"}
+    (tmp_path / "hashes.parquet").unlink()
+    assert executar() == {"gravar": "executada"}
+    assert executar() == {"gravar": "pulada"}
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 import pandas as pd
 from mle_datathon.data_processing.feature_engineering import (
@@ -100,3 +101,120 @@ def test_text_feature_generator_adicionar_similaridade_titulo_vaga(
     assert len(resultado["sim_titulo_vs_vaga"]) == len(df)
     # Similarities should be between 0 and 1
     assert all(0 <= x <= 1 for x in resultado["sim_titulo_vs_vaga"])
+
+
+def test_transform_encodes_each_distinct_text_once(modelo_falso):
+    textos = ["Dev Java", "Analista SAP", "Dev Java", None, "Dev Java"]
+    df = pd.DataFrame({"texto": textos})
+
+    resultado = TextFeatureGenerator(modelo_falso).transform(df, ["texto"])
+
+    assert sorted(modelo_falso.codificados) == ["", "Analista SAP", "Dev Java"]
+    # Rows with the same text get the same aggregated features as a direct encode
+    embeddings = modelo_falso.encode([t or "" for t in textos])
+    np.testing.assert_allclose(
+        resultado["texto_emb_mean"], embeddings.mean(axis=1), rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        resultado["texto_emb_std"], embeddings.std(axis=1), rtol=1e-6
+    )
+
+
+def test_similaridade_titulo_vaga_encodes_distinct_titles(modelo_falso):
+    df = pd.DataFrame(
+        {
+            "titulo": ["dev java", "analista sap", "dev java", "dev java"],
+            "titulo_vaga": ["dev java", "dev java", "analista sap", "dev java"],
+        }
+    )
+
+    resultado = TextFeatureGenerator(modelo_falso).adicionar_similaridade_titulo_vaga(
+        df
+    )
+
+    # Titles shared by both columns are encoded once
+    assert sorted(modelo_falso.codificados) == ["analista sap", "dev java"]
+    emb1 = modelo_falso.encode(df["titulo"].tolist())
+    emb2 = modelo_falso.encode(df["titulo_vaga"].tolist())
+    np.testing.assert_allclose(
+        resultado["sim_titulo_vs_vaga"], (emb1 * emb2).sum(axis=1), rtol=1e-6
+    )
+
+
+def test_similaridade_string_pares_matches_rowwise(modelo_falso):
+    gerador = TextFeatureGenerator(modelo_falso)
+    titulos = pd.Series(["dev java", "Java Dev", None, "analista sap", "dev java"])
+    vagas = pd.Series(
+        ["java dev", "dev java", "dev java", None, "java dev"], dtype="category"
+    )
+
+    resultado = gerador.similaridade_string_pares(titulos, vagas)
+
+    esperado = [gerador.similaridade_string(t, v) for t, v in zip(titulos, vagas)]
+    np.testing.assert_array_equal(resultado, esperado)
+
+
+def test_transform_new_data_with_vaga_features_matches_full_path(
+    tmp_path, monkeypatch, modelo_falso
+):
+    import importlib
+
+    import joblib
+    from sklearn.preprocessing import OneHotEncoder
+
+    from mle_datathon.data_processing import modelo_embeddings
+
+    # The package re-exports the feature_engineering() step under the module name
+    feature_engineering = importlib.import_module(
+        "mle_datathon.data_processing.feature_engineering"
+    )
+
+    monkeypatch.setattr(modelo_embeddings, "_MODELOS", {})
+    monkeypatch.setattr(
+        modelo_embeddings,
+        "_carregar_modelo",
+        lambda nome, backend, threads=None: modelo_falso,
+    )
+    monkeypatch.setattr(
+        feature_engineering, "carregar_cache_embeddings", lambda modelo: None
+    )
+
+    vagas = pd.DataFrame(
+        {
+            "cod_vaga": ["1", "2", "3"],
+            "titulo_vaga": ["dev java", "analista sap", "cientista de dados"],
+            "nivel_academico": ["Superior", "Técnico", "Superior"],
+            "tipo_contratacao": ["CLT", "PJ", "CLT"],
+            "principais_atividades": ["java spring", "sap fi", None],
+            "competencia_tecnicas_e_comportamentais": ["java", "sap", "python"],
+            "demais_observacoes": ["", "remoto", "híbrido"],
+        }
+    )
+    prospects = pd.DataFrame(
+        {
+            "cod_vaga": ["2", "1", "2"],
+            "codigo": ["10", "11", "12"],
+            "titulo": ["analista", "dev", None],
+            "comentario": ["aprovado", None, "sem retorno"],
+        }
+    )
+    for coluna in ["nivel_academico", "tipo_contratacao"]:
+        encoder = OneHotEncoder(sparse_output=False, handle_unknown="ignore")
+        encoder.fit(vagas[[coluna]])
+        joblib.dump(encoder, tmp_path / f"{coluna}_encoder.joblib")
+
+    tabela = feature_engineering.gerar_features_vagas(vagas, str(tmp_path))
+    assert tabela.index.tolist() == ["1", "2", "3"]
+    assert "principais_atividades_emb_mean" in tabela.columns
+    assert "comentario_nchar" not in tabela.columns
+
+    caso = prospects.merge(vagas, on="cod_vaga", how="left")
+    completo = feature_engineering.transform_new_data(caso.copy(), str(tmp_path))
+    modelo_falso.codificados.clear()
+    rapido = feature_engineering.transform_new_data(
+        caso.copy(), str(tmp_path), features_vagas=tabela
+    )
+
+    pd.testing.assert_frame_equal(rapido, completo)
+    # Only prospect texts and titles go through the model
+    assert "java spring" not in modelo_falso.codificados
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+
+def modulos_carregados(codigo):
+    """Run the import in a fresh interpreter and list the heavy modules loaded"""
+    processo = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; {codigo}; "
+            "print(sorted(m for m in ('nltk', 'torch', 'sentence_transformers', "
+            "'xgboost', 'mlflow', 'sklearn') if m in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return processo.stdout.strip().splitlines()[-1]
+
+
+def test_data_processing_import_is_lazy():
+    assert modulos_carregados("import mle_datathon.data_processing") == "[]"
+
+
+def test_model_registry_does_not_load_training_dependencies():
+    assert (
+        modulos_carregados("from mle_datathon.model import ModelRegistry")
+        == "['mlflow']"
+    )
+
+
+def test_config_and_stop_words_load_on_first_access():
+    codigo = (
+        "from mle_datathon.data_processing import preprocess_data as p; "
+        "assert 'config' not in vars(p); "
+        "assert 'paths' in p.config; "
+        "assert 'de' in p.stop_words"
+    )
+    carregados = modulos_carregados(codigo)
+    assert "nltk" in carregados
+    assert "torch" not in carregados
@@ -0,0 +1,164 @@
+import json
+import os
+
+import pandas as pd
+from mle_datathon.data_processing import preprocess_data
+from mle_datathon.data_processing.incremental import hashes_registro
+
+
+def prospect(codigo, situacao, data):
+    return {
+        "nome": f"Candidato {codigo}",
+        "codigo": codigo,
+        "situacao_candidado": situacao,
+        "data_candidatura": data,
+        "comentario": f"Comentário {codigo}",
+    }
+
+
+PROSPECTS = {
+    "1": {
+        "titulo": "Dev Java",
+        "prospects": [
+            prospect("10", "Prospect", "01-02-2021"),
+            prospect("11", "Contratado pela Decision", "02-03-2021"),
+        ],
+    },
+    "2": {
+        "titulo": "Analista SAP",
+        "prospects": [prospect("12", "Desistiu", "2021-03-10")],
+    },
+    "3": {"titulo": "Cientista", "prospects": []},
+    "4": {
+        "titulo": "Engenheiro",
+        "prospects": [prospect("13", "Não Aprovado pelo Cliente", "10-11-2021")],
+    },
+}
+
+
+def usar_diretorio(monkeypatch, diretorio, incremental=True, streaming=True):
+    """Point the prospects paths at a temporary directory"""
+    paths = {
+        f"prospects_{camada}": os.path.relpath(
+            os.path.join(diretorio, f"prospects_{camada}.{extensao}"),
+            preprocess_data.local_path,
+        )
+        for camada, extensao in (
+            ("json", "json"),
+            ("bronze", "parquet"),
+            ("silver", "parquet"),
+        )
+    }
+    monkeypatch.setitem(preprocess_data.config, "paths", paths)
+    monkeypatch.setitem(
+        preprocess_data.config,
+        "preprocess",
+        {
+            "streaming": streaming,
+            "incremental": incremental,
+            "compact_dtypes": True,
+        },
+    )
+    return os.path.join(diretorio, "prospects_json.json")
+
+
+def atualizar(path, dados):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False)
+    return preprocess_data.atualizar_camadas(
+        "prospects",
+        preprocess_data.bronze_prospects,
+        preprocess_data.limpeza_prospects,
+    )
+
+
+def test_hashes_registro_one_row_per_prospect():
+    linhas = hashes_registro("1", PROSPECTS["1"], explode_col="prospects")
+    vazio = hashes_registro("3", PROSPECTS["3"], explode_col="prospects")
+
+    assert [chave for chave, _ in linhas] == ["1/10", "1/11"]
+    assert [chave for chave, _ in vazio] == ["3/"]
+
+
+def test_incremental_matches_full_rebuild(tmp_path, monkeypatch):
+    novos = json.loads(json.dumps(PROSPECTS))
+    novos["1"]["prospects"][0]["situacao_candidado"] = "Desistiu"
+    novos["3"]["prospects"].append(prospect("14", "Prospect", "05-06-2021"))
+    del novos["4"]
+    novos["5"] = {
+        "titulo": "Dev Python",
+        "prospects": [prospect("15", "Prospect", "2022-01-31")],
+    }
+
+    # Full rebuild of the new data in a separate directory
+    (tmp_path / "completa").mkdir()
+    path = usar_diretorio(monkeypatch, tmp_path / "completa", incremental=False)
+    esperado = atualizar(path, novos)
+
+    (tmp_path / "incremental").mkdir()
+    path = usar_diretorio(monkeypatch, tmp_path / "incremental")
+    atualizar(path, PROSPECTS)
+
+    limpos = []
+    clean_data = preprocess_data.clean_data
+    monkeypatch.setattr(
+        preprocess_data,
+        "clean_data",
+        lambda df, **kwargs: limpos.append(len(df)) or clean_data(df, **kwargs),
+    )
+    resultado = atualizar(path, novos)
+
+    # Only the changed prospect, the one added to vaga 3 and vaga 5 are cleaned
+    assert limpos == [3]
+    pd.testing.assert_frame_equal(resultado, esperado)
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(tmp_path / "incremental" / "prospects_silver.parquet"),
+        esperado,
+    )
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(tmp_path / "incremental" / "prospects_bronze.parquet"),
+        pd.read_parquet(tmp_path / "completa" / "prospects_bronze.parquet"),
+    )
+
+
+def test_incremental_without_changes_reuses_silver(tmp_path, monkeypatch):
+    path = usar_diretorio(monkeypatch, tmp_path)
+    esperado = atualizar(path, PROSPECTS)
+
+    def falhar(*args, **kwargs):
+        raise AssertionError("clean_data should not run without changes")
+
+    monkeypatch.setattr(preprocess_data, "clean_data", falhar)
+    pd.testing.assert_frame_equal(atualizar(path, PROSPECTS), esperado)
+
+
+def test_incremental_without_streaming_keeps_nested_fields(tmp_path, monkeypatch):
+    # Nested fields that are not normalized, like cargo_atual in applicants.json
+    dados = json.loads(json.dumps(PROSPECTS))
+    for cod_vaga, vaga in dados.items():
+        vaga["tags"] = ["java", f"vaga {cod_vaga}"]
+        vaga["responsavel"] = {"nome": f"Recrutador {cod_vaga}"}
+    novos = json.loads(json.dumps(dados))
+    novos["2"]["tags"].append("sap")
+    novos["2"]["prospects"][0]["situacao_candidado"] = "Prospect"
+    # A new key changes the struct type of the field in the bronze layer
+    novos["4"]["responsavel"]["email"] = "recrutador4@decision.com"
+
+    (tmp_path / "completa").mkdir()
+    path = usar_diretorio(
+        monkeypatch, tmp_path / "completa", incremental=False, streaming=False
+    )
+    esperado = atualizar(path, novos)
+
+    (tmp_path / "incremental").mkdir()
+    path = usar_diretorio(monkeypatch, tmp_path / "incremental", streaming=False)
+    atualizar(path, dados)
+    resultado = atualizar(path, novos)
+
+    # Objects that went through Arrow carry every key of the struct, so the
+    # silver files are compared as stored
+    assert resultado["tags"].map(list).tolist() == esperado["tags"].tolist()
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(tmp_path / "incremental" / "prospects_silver.parquet"),
+        pd.read_parquet(tmp_path / "completa" / "prospects_silver.parquet"),
+    )
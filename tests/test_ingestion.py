@@ -0,0 +1,136 @@
+import json
+import pytest
+import pandas as pd
+import pyarrow as pa
+from mle_datathon.data_processing.ingestion import (
+    iter_json_records,
+    normalizar_registros,
+    stream_json_to_parquet,
+)
+from mle_datathon.data_processing.preprocess_data import convert_json_to_df
+
+
+@pytest.fixture
+def vagas_json(tmp_path):
+    """Create a small raw file in the {id: record} layout"""
+    dados = {
+        str(4530 + i): {
+            "informacoes_basicas": {"titulo_vaga": f"Vaga {i}", "cliente": ""},
+            "perfil_vaga": {"nivel_academico": "Ensino Superior", "pais": "Brasil"},
+            "beneficios": {"valor_venda": f"{i},00"},
+        }
+        for i in range(7)
+    }
+    path = tmp_path / "vagas.json"
+    path.write_text(json.dumps(dados, indent=4, ensure_ascii=False), encoding="utf-8")
+    return path, dados
+
+
+@pytest.fixture
+def prospects_json(tmp_path):
+    dados = {
+        "1": {"titulo": "Dev", "prospects": [{"nome": "A", "codigo": "10"}]},
+        "2": {"titulo": "Data", "prospects": []},
+        "3": {
+            "titulo": "ML",
+            "prospects": [
+                {"nome": "B", "codigo": "11"},
+                {"nome": "C", "codigo": "12", "comentario": "ok"},
+            ],
+        },
+    }
+    path = tmp_path / "prospects.json"
+    path.write_text(json.dumps(dados), encoding="utf-8")
+    return path, dados
+
+
+def test_iter_json_records_small_reads(vagas_json):
+    """Records must be identical even when reads split tokens"""
+    path, dados = vagas_json
+
+    registros = list(iter_json_records(str(path), read_size=7))
+
+    assert [chave for chave, _ in registros] == list(dados.keys())
+    assert dict(registros) == dados
+
+
+def test_iter_json_records_empty_object(tmp_path):
+    path = tmp_path / "vazio.json"
+    path.write_text(" { } ")
+
+    assert list(iter_json_records(str(path))) == []
+
+
+def test_stream_json_to_parquet_matches_convert(vagas_json, tmp_path):
+    path, _ = vagas_json
+    cols = ["informacoes_basicas", "perfil_vaga", "beneficios"]
+    output = tmp_path / "vagas.parquet"
+
+    linhas, colunas = stream_json_to_parquet(
+        str(path), str(output), "cod_vaga", cols_normalize=cols, batch_size=3
+    )
+
+    # Same file the in-memory path writes to the bronze layer
+    convert_json_to_df(str(path), "cod_vaga", cols_normalize=cols).to_parquet(
+        tmp_path / "esperado.parquet", index=False
+    )
+    esperado = pd.read_parquet(tmp_path / "esperado.parquet")
+    resultado = pd.read_parquet(output)
+    assert (linhas, colunas) == esperado.shape
+    pd.testing.assert_frame_equal(resultado, esperado)
+    assert not any(p.name.startswith(".lotes_") for p in tmp_path.iterdir())
+
+
+def test_stream_json_to_parquet_documented_differences(tmp_path):
+    """Nested lists become JSON text and int/str columns become strings"""
+    dados = {
+        "1": {"valor": 1, "tags": ["sap", "fi"]},
+        "2": {"valor": 2, "tags": []},
+        "3": {"valor": "tres", "tags": ["java"]},
+    }
+    path = tmp_path / "mistos.json"
+    path.write_text(json.dumps(dados), encoding="utf-8")
+    output = tmp_path / "mistos.parquet"
+
+    stream_json_to_parquet(str(path), str(output), "id", batch_size=2)
+
+    resultado = pd.read_parquet(output)
+    assert resultado["tags"].tolist() == ['["sap", "fi"]', "[]", '["java"]']
+    assert resultado["valor"].tolist() == ["1", "2", "tres"]
+    # The in-memory path cannot write the mixed column at all
+    with pytest.raises((pa.ArrowInvalid, pa.ArrowTypeError)):
+        convert_json_to_df(str(path), "id").to_parquet(tmp_path / "x.parquet")
+
+
+def test_stream_json_to_parquet_explode(prospects_json, tmp_path):
+    path, _ = prospects_json
+    output = tmp_path / "prospects.parquet"
+
+    stream_json_to_parquet(
+        str(path), str(output), "cod_vaga", explode_col="prospects", batch_size=2
+    )
+
+    esperado = convert_json_to_df(str(path), "cod_vaga", explode_col="prospects")
+    resultado = pd.read_parquet(output)
+    assert resultado["cod_vaga"].tolist() == [1, 2, 3, 3]
+    pd.testing.assert_frame_equal(
+        resultado.astype(object).where(resultado.notna(), None),
+        esperado.astype(object).where(esperado.notna(), None),
+        check_like=True,
+    )
+
+
+def test_normalizar_registros_explode_offsets():
+    """Exploding from list lengths must match DataFrame.explode"""
+    df = pd.DataFrame(
+        {
+            "cod_vaga": [1, 2, 3],
+            "prospects": [[{"nome": "A"}, {"nome": "B"}], [], [{"nome": ""}]],
+        }
+    )
+
+    resultado = normalizar_registros(df, explode_col="prospects")
+
+    assert resultado["cod_vaga"].tolist() == [1, 1, 2, 3]
+    assert resultado["nome"].tolist()[:2] == ["A", "B"]
+    assert resultado["nome"].isna().tolist() == [False, False, True, True]
@@ -0,0 +1,195 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from mle_datathon.data_processing import modelo_embeddings
+from mle_datathon.data_processing.feature_engineering import TextFeatureGenerator
+
+
+def test_model_is_loaded_once_across_threads(monkeypatch, modelo_falso):
+    carregamentos = []
+
+    def carregar(nome, backend, threads=None):
+        carregamentos.append(nome)
+        time.sleep(0.05)  # keep the other threads waiting on the lock
+        return modelo_falso
+
+    monkeypatch.setattr(modelo_embeddings, "_MODELOS", {})
+    monkeypatch.setattr(modelo_embeddings, "_carregar_modelo", carregar)
+
+    modelos = []
+    threads = [
+        threading.Thread(
+            target=lambda: modelos.append(modelo_embeddings.obter_modelo_embeddings())
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert carregamentos == [modelo_embeddings.MODELO_EMBEDDINGS]
+    assert all(modelo is modelo_falso for modelo in modelos)
+    assert TextFeatureGenerator().embedding_model is modelo_falso
+
+    modelo_embeddings.aquecer_modelo_embeddings()
+    assert carregamentos == [modelo_embeddings.MODELO_EMBEDDINGS]
+    assert modelo_falso.codificados == ["aquecimento"]
+
+
+def test_paridade_features_agregadas(modelo_falso):
+    class ModeloRuidoso:
+        def encode(self, textos, **kwargs):
+            return modelo_falso.encode(textos) + 1e-3
+
+    textos = ["dev java", "analista sap", "cientista de dados", "remoto", ""]
+
+    identico = modelo_embeddings.paridade_features_agregadas(
+        textos, modelo_falso, modelo_falso
+    )
+    ruidoso = modelo_embeddings.paridade_features_agregadas(
+        textos, modelo_falso, ModeloRuidoso()
+    )
+
+    assert list(identico.index) == ["emb_mean", "emb_std", "emb_min", "emb_max"]
+    assert (identico["max_dif_abs"] == 0).all()
+    assert ruidoso.loc["emb_mean", "max_dif_abs"] == pytest.approx(1e-3, rel=1e-2)
+    assert (ruidoso["correlacao"] > 0.99).all()
+
+
+def test_onnx_session_uses_worker_threads(tmp_path, monkeypatch):
+    pytest.importorskip("onnxruntime")
+    import sentence_transformers
+
+    carregados = []
+
+    class SentenceTransformerFalso:
+        def __init__(self, caminho, **kwargs):
+            carregados.append(kwargs["model_kwargs"])
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        sentence_transformers, "SentenceTransformer", SentenceTransformerFalso
+    )
+    monkeypatch.setattr(
+        modelo_embeddings,
+        "carregar_config_embeddings",
+        lambda: {"onnx_path": "onnx", "onnx_quantization": "avx2"},
+    )
+    # An already exported model skips the export
+    exportado = tmp_path / "onnx" / "modelo" / "onnx" / "model_qint8_avx2.onnx"
+    exportado.parent.mkdir(parents=True)
+    exportado.touch()
+
+    modelo_embeddings._carregar_onnx_int8("modelo", threads=2)
+    modelo_embeddings._carregar_onnx_int8("modelo")
+
+    assert carregados[0]["session_options"].intra_op_num_threads == 2
+    assert "session_options" not in carregados[1]
+
+
+def test_identificador_modelo_separates_backends():
+    nome = modelo_embeddings.MODELO_EMBEDDINGS
+    assert modelo_embeddings.identificador_modelo(backend="torch") == nome
+    assert modelo_embeddings.identificador_modelo(backend="onnx_int8") == (
+        f"{nome}@onnx_int8"
+    )
+
+
+def test_lotes_por_tokens_respects_budget():
+    comprimentos = np.array([5, 120, 8, 60, 5, 30, 128, 7])
+
+    lotes = modelo_embeddings.lotes_por_tokens(comprimentos, max_tokens_lote=128)
+
+    assert sorted(np.concatenate(lotes).tolist()) == list(range(len(comprimentos)))
+    for lote in lotes:
+        assert len(lote) * comprimentos[lote].max() <= 128
+    # Longest texts go alone, the short ones share a batch
+    assert [lote.tolist() for lote in lotes[:2]] == [[6], [1]]
+    assert sorted(lotes[-1].tolist()) == [0, 2, 4, 7]
+
+
+def test_codificar_por_comprimento_restores_order(modelo_falso):
+    textos = ["um texto bem mais longo que os outros", "curto", "", "médio texto"]
+
+    resultado = modelo_embeddings.codificar_por_comprimento(
+        modelo_falso, textos, max_tokens_lote=12
+    )
+
+    np.testing.assert_array_equal(resultado, modelo_falso.encode(textos))
+
+
+def salvar_modelo_pequeno(diretorio):
+    """Saves a tiny random-weight SentenceTransformer that loads offline"""
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Pooling, Transformer
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import BertConfig, BertModel, PreTrainedTokenizerFast
+
+    palavras = ["[PAD]", "[UNK]", "dev", "java", "sap", "dados", "remoto", "python"]
+    tokenizer = Tokenizer(
+        models.WordLevel({p: i for i, p in enumerate(palavras)}, unk_token="[UNK]")
+    )
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, pad_token="[PAD]", unk_token="[UNK]"
+    ).save_pretrained(diretorio)
+    config = BertConfig(
+        vocab_size=len(palavras),
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+    )
+    BertModel(config).save_pretrained(diretorio)
+    modulos = [Transformer(diretorio, max_seq_length=32), Pooling(16, "mean")]
+    SentenceTransformer(modules=modulos, device="cpu").save(diretorio)
+    return SentenceTransformer(diretorio, device="cpu")
+
+
+def test_pool_embeddings_matches_single_process(tmp_path, monkeypatch):
+    modelo = salvar_modelo_pequeno(str(tmp_path))
+    monkeypatch.setattr(modelo_embeddings, "_MODELOS", {})
+    textos = [
+        " ".join(["dev java", "sap dados", "remoto", "python"][: i % 4 + 1])
+        for i in range(30)
+    ]
+
+    pool = modelo_embeddings.PoolEmbeddings(str(tmp_path), "torch", workers=2)
+    try:
+        por_tokens = pool.codificar(textos, max_tokens_lote=64)
+        fixo = pool.codificar(textos, batch_size=8)
+        unico = pool.codificar(textos[:1])
+    finally:
+        pool.encerrar()
+
+    # Even a single text is encoded by a worker, not by the parent process
+    assert modelo_embeddings._MODELOS == {}
+    esperado = modelo.encode(textos, normalize_embeddings=True)
+    np.testing.assert_allclose(unico, esperado[:1], atol=1e-5)
+    np.testing.assert_allclose(por_tokens, esperado, atol=1e-5)
+    np.testing.assert_allclose(fixo, esperado, atol=1e-5)
+
+
+def test_encerrar_pools_shuts_down_and_forgets_pools(monkeypatch):
+    encerrados = []
+
+    class PoolFalso:
+        def __init__(self, *chave):
+            self.chave = chave
+
+        def encerrar(self):
+            encerrados.append(self.chave)
+
+    monkeypatch.setattr(modelo_embeddings, "PoolEmbeddings", PoolFalso)
+    monkeypatch.setattr(modelo_embeddings, "_POOLS", {})
+    pool = modelo_embeddings.obter_pool_embeddings(2, backend="torch")
+    assert modelo_embeddings.obter_pool_embeddings(2, backend="torch") is pool
+
+    modelo_embeddings.encerrar_pools()
+
+    assert encerrados == [pool.chave]
+    assert modelo_embeddings.obter_pool_embeddings(2, backend="torch") is not pool
@@ -0,0 +1,113 @@
+import json
+
+import pandas as pd
+import polars as pl
+import pytest
+from mle_datathon.data_processing import preprocess_data
+from mle_datathon.data_processing.polars_backend import (
+    _carregar_bronze,
+    clean_data_pl,
+    limpar_anos_pl,
+    limpar_datas_pl,
+    limpar_numeros_pl,
+)
+from mle_datathon.data_processing.preprocess_data import (
+    clean_data,
+    limpar_anos,
+    limpar_datas_coluna,
+    limpar_numeros_coluna,
+)
+
+
+def normalizar(dados):
+    """Polars nulls and pandas NaN/NaT/None all become None"""
+    if isinstance(dados, (pl.Series, pl.DataFrame)):
+        dados = dados.to_pandas()
+    dados = dados.astype(object)
+    return dados.where(dados.notna(), None)
+
+
+def test_limpar_datas_pl_matches_pandas():
+    valores = [
+        "10-11-2021 07:29:49",
+        "01-13-2021",
+        "2021-03-10",
+        "31/12/2023",
+        " 01-01-1920 ",
+        "0000-00-00",
+        "03-2021",
+        "invalid_date",
+        None,
+    ]
+
+    resultado = limpar_datas_pl(pl.Series("data", valores))
+
+    esperado = limpar_datas_coluna(pd.Series(valores, name="data"))
+    pd.testing.assert_series_equal(normalizar(resultado), normalizar(esperado))
+
+
+def test_limpar_numeros_e_anos_pl_match_pandas():
+    numeros = ["1,234.56", "2.000,00", " 10,5 ", "3500", "R$ 1.500", "abc", None]
+    anos = ["2015", " 2001 ", "0", "1899", "2030", "abc", None]
+
+    pd.testing.assert_series_equal(
+        normalizar(limpar_numeros_pl(pl.Series("numero", numeros))),
+        normalizar(limpar_numeros_coluna(pd.Series(numeros, name="numero"))),
+    )
+    pd.testing.assert_series_equal(
+        normalizar(limpar_anos_pl(pl.Series("ano", anos))),
+        normalizar(pd.Series(anos, name="ano").apply(limpar_anos)),
+    )
+
+
+def test_clean_data_pl_matches_clean_data():
+    df = pd.DataFrame(
+        {
+            "text": ["Ação/Gestão", "Dados", None, "Python e SQL"] * 3,
+            "date": ["01-01-2023", "31-12-2023", "0", None] * 3,
+            "empty_date": ["0000-00-00", None, "0", "invalid"] * 3,
+            "year": ["2023", "0", None, "2020"] * 3,
+            "number": ["1,234.56", "2.000,00", None, "10"] * 3,
+            "dominant": ["x"] * 12,
+            "sparse": [None] * 11 + ["y"],
+        }
+    )
+    kwargs = dict(
+        colunas_texto=["text"],
+        colunas_data=["date", "empty_date"],
+        colunas_anos=["year"],
+        colunas_numeros=["number"],
+    )
+
+    resultado = clean_data_pl(pl.from_pandas(df).lazy(), **kwargs)
+
+    esperado = clean_data(df, **kwargs)
+    assert list(resultado.columns) == list(esperado.columns)
+    pd.testing.assert_frame_equal(normalizar(resultado), normalizar(esperado))
+
+
+@pytest.mark.parametrize("coluna", ["missing", "dominant"])
+def test_clean_data_pl_raises_like_clean_data_on_unknown_column(coluna):
+    # A configured column that does not exist or was dropped by the profile
+    df = pd.DataFrame({"text": ["a", "b", None, "c"], "dominant": ["x"] * 4})
+
+    with pytest.raises(KeyError, match=coluna):
+        clean_data(df, colunas_texto=[coluna])
+    with pytest.raises(KeyError, match=coluna):
+        clean_data_pl(pl.from_pandas(df).lazy(), colunas_texto=[coluna])
+
+
+@pytest.mark.parametrize(
+    "streaming, tags", [(False, ["sap", "fi"]), (True, '["sap", "fi"]')]
+)
+def test_carregar_bronze_pl_honors_streaming(tmp_path, monkeypatch, streaming, tags):
+    """The bronze layer is written the same way as in the pandas backend"""
+    path = tmp_path / "vagas.json"
+    path.write_text(json.dumps({"1": {"tags": ["sap", "fi"]}}), encoding="utf-8")
+    monkeypatch.setitem(preprocess_data.config["preprocess"], "streaming", streaming)
+
+    lf = _carregar_bronze(str(path), str(tmp_path / "bronze.parquet"), index_col="id")
+
+    assert lf.collect().to_pandas()["tags"].apply(
+        lambda valor: valor if isinstance(valor, str) else list(valor)
+    ).tolist() == [tags]
@@ -1,5 +1,20 @@
+import json
+import os
+import random
+
 import pandas as pd
-from mle_datathon.data_processing.preprocess_data import clean_data
+from mle_datathon.data_processing import preprocess_data
+from mle_datathon.data_processing.preprocess_data import (
+    clean_data,
+    colunas_remover_modelagem,
+    config,
+    gerar_camada_gold,
+    limpar_datas,
+    limpar_datas_coluna,
+    limpar_numeros,
+    limpar_numeros_coluna,
+    mapping,
+)
 import numpy as np
 from datetime import datetime
 
@@ -85,3 +100,258 @@ def test_clean_data_all_columns():
     assert all(isinstance(d, datetime) for d in result["date"].dropna())
     assert result["year"].tolist() == [2023.0, 2020.0]
     assert result["number"].tolist() == [1234.56, 2000.00]
+
+
+def test_clean_data_memo_matches_direct():
+    # Repetitive columns are cleaned once per distinct value
+    df = pd.DataFrame(
+        {
+            "text": ["Ação/Gestão", "Ação/Gestão", None, "Dados"] * 3,
+            "date": ["01-01-2023", "0000-00-00", None, "31-12-2023"] * 3,
+            "year": ["2023", "0", None, "2020"] * 3,
+            "number": ["1,234.56", "2.000,00", None, "10"] * 3,
+        }
+    )
+    kwargs = dict(
+        colunas_texto=["text"],
+        colunas_data=["date"],
+        colunas_anos=["year"],
+        colunas_numeros=["number"],
+    )
+
+    direto = clean_data(df, memo_min_rows=len(df) + 1, **kwargs)
+    memo = clean_data(df, memo_min_rows=0, **kwargs)
+
+    pd.testing.assert_frame_equal(memo, direto)
+
+
+def test_clean_data_parallel_matches_sequential():
+    # Columns are split in row chunks across processes and reassembled in order
+    df = pd.DataFrame(
+        {
+            "text": ["Ação/Gestão", "Dados", None, "Python e SQL"] * 3,
+            "date": ["01-01-2023", "31-12-2023", "0", "invalid"] * 2
+            + ["0000-00-00", None, "0", "invalid"],
+            "year": ["2023", "0", None, "2020"] * 3,
+            "number": ["1,234.56", "2.000,00", None, "10"] * 3,
+        },
+        index=range(100, 112),
+    )
+    kwargs = dict(
+        colunas_texto=["text"],
+        colunas_data=["date"],
+        colunas_anos=["year"],
+        colunas_numeros=["number"],
+    )
+
+    sequencial = clean_data(df, workers=1, **kwargs)
+    paralelo = clean_data(df, workers=2, chunk_rows=4, **kwargs)
+
+    pd.testing.assert_frame_equal(paralelo, sequencial)
+
+
+def test_limpar_datas_coluna_matches_apply():
+    # Each date shape is parsed in one call, with the same result as per cell
+    serie = pd.Series(
+        [
+            "10-11-2021 07:29:49",
+            "19/01/2020 15:57:60",
+            "19/01/2020 15:57:61",
+            "01-13-2021",
+            "2021-03-10",
+            "2021-03-13",
+            "31/12/2023",
+            " 01-01-1920 ",
+            "0000-00-00",
+            "0",
+            "03-2021",
+            "invalid_date",
+            None,
+        ]
+    )
+
+    pd.testing.assert_series_equal(
+        limpar_datas_coluna(serie), serie.apply(limpar_datas)
+    )
+
+
+def test_limpar_numeros_coluna_matches_apply():
+    # US, Brazilian and plain formats are parsed in bulk, anything else per value
+    serie = pd.Series(
+        [
+            "1,234.56",
+            "2.000,00",
+            " 10,5 ",
+            "3500",
+            "-1.5",
+            "1,234,567",
+            "1.234.567",
+            "R$ 1.500,00",
+            "1e3",
+            "abc",
+            "",
+            None,
+        ],
+        index=[3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5, 8],
+    )
+
+    resultado = limpar_numeros_coluna(serie)
+
+    pd.testing.assert_series_equal(
+        resultado, pd.to_numeric(serie.apply(limpar_numeros), errors="coerce")
+    )
+    assert resultado.iloc[:5].tolist() == [1234.56, 2000.0, 10.5, 3500.0, -1.5]
+
+
+def test_gerar_camada_gold_matches_reread(tmp_path, monkeypatch):
+    monkeypatch.setitem(config["preprocess"], "compact_dtypes", False)
+    df_prospects = pd.DataFrame(
+        {
+            "cod_vaga": [1, 1, 2, 3],
+            "codigo": ["10", "11", "12", "13"],
+            "situacao_candidado": [
+                "contratado decision",
+                "desistiu",
+                "nao aprovado rh",
+                "inscrito",
+            ],
+            "comentario": ["ok", "desconhecido", "ok", "ok"],
+        },
+        index=[4, 2, 7, 1],
+    )
+    df_vagas = pd.DataFrame(
+        {
+            "cod_vaga": [1, 2],
+            "titulo_vaga": ["dev python", "analista sap"],
+            "comentario": ["remoto", "hibrido"],
+            "data_inicial": pd.to_datetime(["2021-01-01", None]),
+        }
+    )
+    consolidado_path = tmp_path / "consolidado.parquet"
+    modelagem_path = tmp_path / "modelagem.parquet"
+
+    gerar_camada_gold(df_prospects, df_vagas, consolidado_path, modelagem_path)
+
+    # Previous flow: write the merged frame, read it back, map and drop columns
+    df = df_prospects.merge(df_vagas, on="cod_vaga", how="left", suffixes=("", "_vaga"))
+    df.to_parquet(tmp_path / "esperado.parquet", index=False)
+    df = pd.read_parquet(tmp_path / "esperado.parquet")
+    df["situacao_candidado"] = df["situacao_candidado"].replace(mapping)
+    df["target"] = (df["situacao_candidado"] == "aprovado").astype(int)
+    esperado = df.drop(
+        columns=[col for col in colunas_remover_modelagem if col in df.columns]
+    )
+
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(consolidado_path),
+        pd.read_parquet(tmp_path / "esperado.parquet"),
+    )
+    pd.testing.assert_frame_equal(pd.read_parquet(modelagem_path), esperado)
+    assert pd.read_parquet(modelagem_path)["target"].tolist() == [1, 0, 0, 0]
+
+
+DATAS = ["10-11-2021 07:29:49", "01-13-2021", "2021-03-10", "31/12/2023", "0"]
+TEXTOS = ["Python e SQL", "Gestão SAP", "Análise de Dados", "Remoto", "Java"]
+
+
+def gerar_jsons(diretorio, n=60, seed=0):
+    """Small raw applicants, vagas and prospects files with varied values"""
+    rnd = random.Random(seed)
+    texto = lambda: rnd.choice(TEXTOS)  # noqa: E731
+    data = lambda: rnd.choice(DATAS)  # noqa: E731
+    applicants = {
+        str(100 + i): {
+            "infos_basicas": {
+                "objetivo_profissional": texto(),
+                "fonte_indicacao": texto(),
+                "data_criacao": data(),
+            },
+            "informacoes_pessoais": {"data_nascimento": data()},
+            "informacoes_profissionais": {
+                "titulo_profissional": texto(),
+                "area_atuacao": texto(),
+                "remuneracao": rnd.choice(["1.500,00", "3500", "R$ 2.000", ""]),
+                "data_atualizacao": data(),
+            },
+            "formacao_e_idiomas": {
+                "nivel_academico": texto(),
+                "cursos": texto(),
+                "ano_conclusao": rnd.choice(["2015", "0", "1999", "2020"]),
+            },
+            "cv_pt": f"{texto()} {texto()}",
+        }
+        for i in range(n)
+    }
+    vagas = {
+        str(10 + i): {
+            "informacoes_basicas": {
+                "titulo_vaga": texto(),
+                "tipo_contratacao": texto(),
+                "limite_esperado_para_contratacao": data(),
+            },
+            "perfil_vaga": {
+                campo: texto()
+                for campo in preprocess_data.limpeza_vagas["colunas_texto"][2:]
+            }
+            | {"data_inicial": data(), "data_final": data()},
+            "beneficios": {"valor_venda": rnd.choice(["100,00", "200", ""])},
+        }
+        for i in range(n // 4)
+    }
+    prospects = {
+        str(10 + i): {
+            "titulo": texto(),
+            "prospects": [
+                {
+                    "codigo": str(100 + rnd.randrange(n)),
+                    "situacao_candidado": rnd.choice(list(mapping)),
+                    "data_candidatura": data(),
+                    "comentario": texto(),
+                }
+                for _ in range(rnd.randint(1, 6))
+            ],
+        }
+        for i in range(n // 4)
+    }
+    for nome, dados in (
+        ("applicants", applicants),
+        ("vagas", vagas),
+        ("prospects", prospects),
+    ):
+        with open(os.path.join(diretorio, f"{nome}.json"), "w") as f:
+            json.dump(dados, f, ensure_ascii=False)
+
+
+def executar_preprocess(diretorio, monkeypatch, table_workers):
+    diretorio.mkdir()
+    gerar_jsons(diretorio)
+    caminhos = {f"{nome}_json": f"{nome}.json" for nome in preprocess_data._TABELAS}
+    for nome in preprocess_data._TABELAS:
+        for camada in ("bronze", "silver"):
+            caminhos[f"{nome}_{camada}"] = f"{nome}_{camada}.parquet"
+    for nome in ("dataset_consolidado", "dataset_modelagem"):
+        caminhos[nome] = f"{nome}.parquet"
+    monkeypatch.setitem(
+        config,
+        "paths",
+        {
+            chave: os.path.relpath(diretorio / arquivo, preprocess_data.local_path)
+            for chave, arquivo in caminhos.items()
+        },
+    )
+    monkeypatch.setitem(config["preprocess"], "backend", "pandas")
+    monkeypatch.setitem(config["preprocess"], "incremental", False)
+    monkeypatch.setitem(config["preprocess"], "table_workers", table_workers)
+    preprocess_data.execute_preprocess()
+    return {chave: diretorio / arquivo for chave, arquivo in caminhos.items()}
+
+
+def test_execute_preprocess_tables_in_parallel_match_sequential(tmp_path, monkeypatch):
+    sequencial = executar_preprocess(tmp_path / "sequencial", monkeypatch, 1)
+    paralelo = executar_preprocess(tmp_path / "paralelo", monkeypatch, 3)
+
+    for chave, caminho in sequencial.items():
+        if caminho.suffix == ".parquet":
+            pd.testing.assert_frame_equal(
+                pd.read_parquet(paralelo[chave]), pd.read_parquet(caminho)
+            )
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from mle_datathon.data_processing.profiling import perfil_colunas
+
+
+def test_perfil_colunas_matches_value_counts():
+    df = pd.DataFrame(
+        {
+            "dominante": ["a"] * 9 + [None],
+            "vazia": [np.nan] * 10,
+            "numero": [1, 2, 2, 3, None, 5, 6, 7, 8, 9],
+        }
+    )
+
+    perfil = perfil_colunas(df)
+
+    for col in df.columns:
+        vc = df[col].value_counts(normalize=True, dropna=True)
+        assert perfil.at[col, "nao_nulos"] == df[col].notna().sum()
+        assert perfil.at[col, "taxa_nulos"] == df[col].isnull().mean()
+        assert perfil.at[col, "cardinalidade"] == df[col].nunique()
+        if vc.empty:
+            assert np.isnan(perfil.at[col, "frequencia_top"])
+        else:
+            assert perfil.at[col, "frequencia_top"] == vc.max()
+    assert perfil.at["numero", "valor_top"] == 2
+    assert (perfil["margem_erro"] == 0).all()
+
+
+def test_perfil_colunas_sample_error_bound():
+    # The sampled top frequency must fall within the reported margin
+    df = pd.DataFrame({"col": ["x"] * 8000 + list(range(2000))})
+
+    perfil = perfil_colunas(df, amostra=1000)
+
+    assert perfil.at["col", "nao_nulos"] == len(df)
+    assert (
+        abs(perfil.at["col", "frequencia_top"] - 0.8) <= perfil.at["col", "margem_erro"]
+    )
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mle_datathon.data_processing.feature_engineering import TextFeatureGenerator
+from mle_datathon.data_processing.store_embeddings import StoreEmbeddings
+
+
+def test_store_reads_back_embeddings_by_id(tmp_path):
+    embeddings = np.arange(12, dtype=np.float32).reshape(3, 4)
+    # Rows 0 and 2 belong to the same vaga and keep the first text
+    ids = pd.Series(["20", "10", "20", "30"])
+    codigos = np.array([0, 1, 2, 1])
+
+    StoreEmbeddings(str(tmp_path)).gravar(
+        "campo", ids, codigos, embeddings, "modelo", "cod_vaga"
+    )
+
+    store = StoreEmbeddings(str(tmp_path))
+    assert store.campos() == ["campo"]
+    assert store.metadados("campo") == {"modelo": "modelo", "entidade": "cod_vaga"}
+    assert isinstance(store.matriz("campo"), np.memmap)
+    np.testing.assert_array_equal(
+        store.obter("campo", ["30", "20", "10"]), embeddings[[1, 0, 1]]
+    )
+    assert store.linhas("campo", ["10", "99"]).tolist() == [0, -1]
+    with pytest.raises(KeyError, match="99"):
+        store.obter("campo", ["10", "99"])
+
+
+def test_store_publishes_vectors_and_index_together(tmp_path):
+    def gravar(valor, ids):
+        embeddings = np.full((len(ids), 2), valor, dtype=np.float32)
+        StoreEmbeddings(str(tmp_path)).gravar(
+            "campo", pd.Series(ids), np.arange(len(ids)), embeddings, "m", "cod_vaga"
+        )
+
+    gravar(1.0, ["10", "20"])
+    leitor = StoreEmbeddings(str(tmp_path))
+    np.testing.assert_array_equal(leitor.obter("campo", ["20"]), [[1.0, 1.0]])
+
+    # A reader that already opened the field keeps a consistent older version
+    gravar(2.0, ["10", "20", "30"])
+    assert leitor.indice("campo").tolist() == ["10", "20"]
+    np.testing.assert_array_equal(leitor.obter("campo", ["10"]), [[1.0, 1.0]])
+    novo = StoreEmbeddings(str(tmp_path))
+    np.testing.assert_array_equal(novo.obter("campo", ["30"]), [[2.0, 2.0]])
+
+    # Only the current and the previous versions stay on disk
+    gravar(3.0, ["10"])
+    assert len(os.listdir(tmp_path / "campo")) == 3  # two versions + pointer
+
+
+def test_text_feature_generator_fields_are_stored_by_entity(tmp_path, modelo_falso):
+    df = pd.DataFrame(
+        {
+            "principais_atividades": ["java spring", "java spring", "sap fi"],
+            "comentario": ["aprovado", None, "sem retorno"],
+            "titulo": ["dev java", "dev", "analista"],
+            "titulo_vaga": ["dev java", "dev java", "analista sap"],
+        }
+    )
+    df_ids = pd.DataFrame({"cod_vaga": [1, 1, 2], "codigo": [7, 8, 7]})
+
+    gerador = TextFeatureGenerator(modelo_falso, registrar_embeddings=True)
+    gerador.transform(df.copy(), ["principais_atividades", "comentario"])
+    gerador.adicionar_similaridade_titulo_vaga(df.copy())
+    store = StoreEmbeddings(str(tmp_path))
+    store.gravar_campos(gerador.embeddings_campos, df_ids, "modelo")
+
+    assert store.campos() == [
+        "comentario",
+        "principais_atividades",
+        "titulo",
+        "titulo_vaga",
+    ]
+    assert store.indice("principais_atividades").tolist() == ["1", "2"]
+    np.testing.assert_allclose(
+        store.obter("titulo_vaga", ["2", "1"]),
+        modelo_falso.encode(["analista sap", "dev java"]),
+    )
+    np.testing.assert_allclose(
+        store.obter("comentario", ["1:8", "2:7"]),
+        modelo_falso.encode(["", "sem retorno"]),
+    )
@@ -0,0 +1,41 @@
+import pandas as pd
+import numpy as np
+from mle_datathon.data_processing.preprocess_data import limpar_texto, stop_words
+from mle_datathon.data_processing.text_cleaning import limpar_textos, remover_acentos
+from unidecode import unidecode
+
+
+def test_remover_acentos_matches_unidecode():
+    textos = ["Ação, gestão e coordenação", "naïve café ½ — ok", "ascii only", ""]
+
+    for texto in textos:
+        assert remover_acentos(texto) == unidecode(texto)
+
+
+def test_limpar_textos_matches_limpar_texto():
+    serie = pd.Series(
+        [
+            "  Experiência em Python/SQL, AWS!  ",
+            "Gestão de PROJETOS\tde dados\n",
+            "",
+            "não há \x00 separador",
+            None,
+            np.nan,
+            123,
+        ]
+    )
+
+    esperado = serie.apply(limpar_texto)
+    for caracteres_lote in (1, 30, 10_000):
+        resultado = limpar_textos(serie, stop_words, caracteres_lote=caracteres_lote)
+        assert resultado.tolist() == esperado.tolist()
+
+
+def test_limpar_textos_keeps_index():
+    serie = pd.Series(["Texto A", None], index=[10, 20], name="cv_pt")
+
+    resultado = limpar_textos(serie, stop_words)
+
+    assert resultado.index.tolist() == [10, 20]
+    assert resultado.name == "cv_pt"
+    assert resultado.iloc[1] is None